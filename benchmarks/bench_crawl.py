@@ -0,0 +1,254 @@
+"""
+Benchmark: crawl throughput against a synthetic local site
+
+Serves a generated site (static, JS-rendered, slow and huge pages, link
+cycles - see synthetic_site.py) on localhost and crawls it with each engine
+in a fresh process, reporting pages/sec, p50/p95 per-page latency, CPU
+seconds and peak RSS. Every run is saved as JSON under benchmarks/results/
+so later runs can be compared against it.
+
+    python benchmarks/bench_crawl.py --pages 200 --max-pages 100
+    python benchmarks/bench_crawl.py --engines auto,quick --compare benchmarks/results/<run>.json
+
+Engines needing Chrome fail (and are reported as such) where it is missing.
+To benchmark a new engine, add a runner to ENGINES.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_site import SiteConfig, SyntheticSite, server_url
+
+
+class PageTimer:
+    """Per-page latency: from the page being picked up to its result"""
+
+    def __init__(self):
+        self.started: Dict[str, float] = {}
+        self.latencies: List[float] = []
+
+    def start(self, url: str):
+        self.started[url] = time.perf_counter()
+
+    def stop(self, url: str):
+        started = self.started.pop(url, None)
+        if started is not None:
+            self.latencies.append(time.perf_counter() - started)
+
+
+def _crawl(base_url: str, max_pages: int, timer: PageTimer, backend: Optional[str] = None,
+           **options) -> dict:
+    from scraper import SmartWebScraper
+
+    scraper = SmartWebScraper(browser_backend=backend)
+    progress = lambda url, *_: timer.start(url)
+    try:
+        pages = 0
+        for page in scraper.iter_scrape_website(base_url, max_pages, progress,
+                                                use_sitemaps=False, checkpoint=False, **options):
+            timer.stop(page.url)
+            pages += 1
+    finally:
+        scraper.browser_pool().shutdown()
+    return {"pages": pages, "stats": scraper.crawl_stats.to_dict()}
+
+
+def run_quick(base_url: str, max_pages: int, timer: PageTimer, site: SyntheticSite) -> dict:
+    """QuickScraper finds no links, so it fetches the site's pages in order"""
+    from scraper import QuickScraper
+
+    scraper = QuickScraper()
+    pages = 0
+    for path in site.paths()[:max_pages]:
+        url = base_url + path
+        timer.start(url)
+        title, text = scraper.scrape(url)
+        timer.stop(url)
+        pages += bool(text)
+    return {"pages": pages}
+
+
+ENGINES: Dict[str, Callable] = {
+    "browser": lambda base, n, timer, site: _crawl(base, n, timer, engine="browser"),
+    "browser-x2": lambda base, n, timer, site: _crawl(base, n, timer, engine="browser", workers=2),
+    "cdp-x4": lambda base, n, timer, site: _crawl(base, n, timer, backend="cdp", engine="browser", workers=4),
+    "auto": lambda base, n, timer, site: _crawl(base, n, timer, engine="auto"),
+    "quick": run_quick,
+}
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+def worker(args) -> dict:
+    """Run one engine in this (fresh) process and return its measurements"""
+    config = SiteConfig(**json.loads(args.site))
+    timer = PageTimer()
+    started = time.perf_counter()
+    result = ENGINES[args.worker](args.base_url, args.max_pages, timer, SyntheticSite(config))
+    seconds = time.perf_counter() - started
+    result.update({
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(result["pages"] / seconds, 2) if seconds else None,
+        "p50_latency": percentile(timer.latencies, 50),
+        "p95_latency": percentile(timer.latencies, 95),
+    })
+    return result
+
+
+def run_engine(engine: str, base_url: str, max_pages: int, config: SiteConfig,
+               concurrency: int) -> dict:
+    """Run an engine in a child process; CPU and peak RSS come from its rusage"""
+    env = dict(os.environ)
+    cache_dir = tempfile.mkdtemp(prefix="bench-")
+    env.update({
+        "HTTP_CACHE": "false",
+        "HTTP_CACHE_DIR": cache_dir,  # fresh fetch verdicts, ledgers and checkpoints
+        "SCRAPE_DELAY_SECONDS": "0",
+        "HOST_MAX_IN_FLIGHT": str(concurrency),
+        "SCRAPE_DO_TOKEN": "",
+        "LOG_LEVEL": "WARNING",
+    })
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", engine, "--base-url", base_url,
+           "--max-pages", str(max_pages), "--site", json.dumps(asdict(config))]
+    with tempfile.TemporaryFile("w+") as errors:
+        proc = subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=errors, text=True)
+        stdout = proc.stdout.read()
+        usage = os.wait4(proc.pid, 0) if hasattr(os, "wait4") else None
+        errors.seek(0)
+        stderr = errors.read()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    if usage:
+        _, status, usage = usage
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        cpu = usage.ru_utime + usage.ru_stime
+        peak_rss_mb = usage.ru_maxrss / 1024  # KB on Linux
+    else:
+        proc.wait()
+        cpu = peak_rss_mb = None
+
+    lines = stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = (stderr.strip().splitlines() or ["no output"])[-1]
+        return {"error": error[:300]}
+    result = json.loads(lines[-1])
+    result["cpu_seconds"] = round(cpu, 2) if cpu is not None else None
+    result["peak_rss_mb"] = round(peak_rss_mb, 1) if peak_rss_mb is not None else None
+    return result
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _fmt(value, spec: str) -> str:
+    if value is None:
+        return "-".rjust(int(spec.split(".")[0]))
+    return format(value, spec)
+
+
+def report(results: Dict[str, dict], previous: Optional[dict] = None):
+    print(f"\n{'engine':<12} {'pages':>5} {'pages/s':>8} {'p50 s':>7} {'p95 s':>7} {'CPU s':>7} {'RSS MB':>7}")
+    for engine, r in results.items():
+        if "error" in r:
+            print(f"{engine:<12} failed: {r['error']}")
+            continue
+        print(f"{engine:<12} {r['pages']:>5} {_fmt(r['pages_per_sec'], '8.2f')} "
+              f"{_fmt(r['p50_latency'], '7.3f')} {_fmt(r['p95_latency'], '7.3f')} "
+              f"{_fmt(r['cpu_seconds'], '7.2f')} {_fmt(r['peak_rss_mb'], '7.1f')}")
+        old = (previous or {}).get("results", {}).get(engine)
+        if old and "error" not in old:
+            deltas = []
+            for key in ("pages_per_sec", "p50_latency", "p95_latency", "cpu_seconds", "peak_rss_mb"):
+                if old.get(key) and r.get(key) is not None:
+                    deltas.append(f"{key} {100 * (r[key] - old[key]) / old[key]:+.0f}%")
+            print(f"{'':<12} vs {previous['run']['id']}: {', '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--engines", default=",".join(ENGINES))
+    parser.add_argument("--max-pages", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4, help="per-host in-flight requests")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--no-save", action="store_true")
+    for name, value in asdict(SiteConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--site", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args)))
+        return
+
+    config = SiteConfig(**{name: getattr(args, name) for name in asdict(SiteConfig())})
+    site = SyntheticSite(config)
+    server = site.serve()
+    base_url = server_url(server)
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = [e for e in engines if e not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)} (have {', '.join(ENGINES)})")
+
+    print(f"Site: {config.pages} pages {site.counts()}, crawling up to {args.max_pages} per engine")
+    results = {}
+    for engine in engines:
+        print(f"  {engine}...", flush=True)
+        results[engine] = run_engine(engine, base_url, args.max_pages, config, args.concurrency)
+    server.shutdown()
+
+    commit = git_commit()
+    run_id = time.strftime("%Y%m%d-%H%M%S") + (f"-{commit}" if commit else "")
+    data = {
+        "run": {"id": run_id, "commit": commit, "python": platform.python_version(),
+                "platform": platform.platform(), "cpus": os.cpu_count()},
+        "site": asdict(config),
+        "max_pages": args.max_pages,
+        "concurrency": args.concurrency,
+        "results": results,
+    }
+
+    previous = None
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        if previous.get("site") != data["site"] or previous.get("max_pages") != args.max_pages:
+            print("Note: compared run used a different site or page limit")
+    report(results, previous)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{run_id}.json")
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"\nSaved {os.path.relpath(path)}")
+
+
+if __name__ == "__main__":
+    main()
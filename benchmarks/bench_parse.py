@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: per-page parse CPU time, before and after single-parse extraction
+
+"before" is the original pipeline (_extract_text and _find_links each building
+their own html.parser tree); "after" is scraper.extraction.parse_html.
+
+    python benchmarks/bench_parse.py [--pages 5] [--paragraphs 4000]
+"""
+
+import os
+import sys
+import time
+import argparse
+from urllib.parse import urljoin, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from scraper import extraction
+from scraper.extraction import parse_html
+
+BASE = "https://example.com"
+
+
+def make_page(paragraphs: int) -> str:
+    """A large marketing-style page: inline scripts, SVG, nav, lots of text and links"""
+    parts = ["<html><head><title>Big page</title>"]
+    parts.append("<script>" + "var x = {'a': 1};" * 5000 + "</script>")
+    parts.append("<style>" + ".c{color:red}" * 2000 + "</style></head><body>")
+    parts.append("<nav>" + "".join(f'<a href="/nav/{i}">Nav {i}</a>' for i in range(200)) + "</nav>")
+    parts.append("<svg>" + '<path d="M0 0 L10 10"/>' * 2000 + "</svg>")
+    for i in range(paragraphs):
+        parts.append(f'<div class="section"><h2>Section {i}</h2><p>Lorem ipsum dolor sit amet '
+                     f'consectetur adipiscing elit {i}. <a href="/page/{i % 500}">Read more</a></p></div>')
+    parts.append("<footer>" + "".join(f'<a href="https://other.com/{i}">x</a>' for i in range(100)) + "</footer>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def before(html: str, url: str, base_domain: str):
+    """The original two-parse html.parser pipeline"""
+    soup = BeautifulSoup(html, "html.parser")
+    title_tag = soup.find("title")
+    title = title_tag.get_text().strip() if title_tag else "Untitled"
+    for tag in soup.find_all(['script', 'style', 'nav', 'header', 'footer',
+                              'noscript', 'iframe', 'svg', 'form']):
+        tag.decompose()
+    body = soup.find('body')
+    text = body.get_text(separator='\n', strip=True) if body else soup.get_text(separator='\n', strip=True)
+    content = '\n'.join(line.strip() for line in text.split('\n') if len(line.strip()) > 5)
+
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for a in soup.find_all('a', href=True):
+        parsed = urlparse(urljoin(url, a['href'].strip()))
+        if parsed.netloc != base_domain:
+            continue
+        clean = f"https://{parsed.netloc}{parsed.path.rstrip('/')}"
+        if clean not in links:
+            links.append(clean)
+    return title, content, links
+
+
+def cpu_time(fn, html: str, pages: int) -> float:
+    start = time.process_time()
+    for _ in range(pages):
+        fn(html, BASE, "example.com")
+    return (time.process_time() - start) / pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--paragraphs", type=int, default=4000)
+    args = parser.parse_args()
+
+    html = make_page(args.paragraphs)
+    print(f"Page size: {len(html) / 1024 / 1024:.2f} MB, {args.pages} pages per variant")
+
+    results = [("before (html.parser x2)", before)]
+    if extraction.HAS_LXML:
+        results.append(("after (lxml, single parse)", parse_html))
+    results.append(("after (bs4 fallback, single parse)", extraction._parse_bs4))
+
+    baseline = None
+    for name, fn in results:
+        seconds = cpu_time(fn, html, args.pages)
+        baseline = baseline or seconds
+        print(f"  {name:<36} {seconds * 1000:8.1f} ms/page  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
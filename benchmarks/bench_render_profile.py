@@ -0,0 +1,66 @@
+"""
+Benchmark: full vs lite render profile on real pages
+
+Loads each URL in a fresh Chrome per profile and reports load time, bytes
+received and requests blocked per page, plus what the lite profile saves.
+
+    python benchmarks/bench_render_profile.py https://example.com https://example.com/pricing
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.driver_pool import new_chrome_driver
+from scraper.readiness import wait_for_page_ready
+from scraper.render_profile import RenderProfile, get_render_profile, drain_network_log, read_network_usage
+
+
+def measure(profile: RenderProfile, urls, rounds: int):
+    driver = new_chrome_driver(profile)
+    results = []
+    try:
+        for _ in range(rounds):
+            for url in urls:
+                driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+                drain_network_log(driver)
+                started = time.time()
+                driver.get(url)
+                wait_for_page_ready(driver)
+                elapsed = time.time() - started
+                usage = read_network_usage(driver)
+                results.append((url, elapsed, usage))
+                driver.get("about:blank")
+    finally:
+        driver.quit()
+    return results
+
+
+def report(name: str, results):
+    n = len(results) or 1
+    seconds = sum(r[1] for r in results) / n
+    kb = sum(r[2].bytes_received for r in results if r[2]) / n / 1024
+    blocked = sum(r[2].blocked for r in results if r[2]) / n
+    print(f"{name:5s}  {seconds:6.2f} s/page  {kb:8.0f} KB/page  {blocked:5.1f} blocked/page")
+    return seconds, kb
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("urls", nargs="+")
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    os.environ["RENDER_PROFILE"] = "lite"
+    lite = get_render_profile()
+
+    full_s, full_kb = report("full", measure(RenderProfile(), args.urls, args.rounds))
+    lite_s, lite_kb = report("lite", measure(lite, args.urls, args.rounds))
+    print(f"saved  {full_s - lite_s:6.2f} s/page  {full_kb - lite_kb:8.0f} KB/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Synthetic website for offline crawl benchmarks
+
+Generates a deterministic site of configurable size - plain static pages,
+pages that only render with JavaScript, slow endpoints, huge pages - whose
+links form cycles (next/previous/home/section links plus random ones), and
+serves it from a local HTTP/1.1 server with keep-alive.
+
+    python benchmarks/synthetic_site.py --pages 500 --port 8000
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from dataclasses import dataclass, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+SECTIONS = ["blog", "docs", "products", "services", "about", "pricing", "news", "guides"]
+
+WORDS = ("crawler render network browser latency request server content page link "
+         "product service pricing team customer support feature release update guide "
+         "account security privacy performance cache memory thread process queue "
+         "domain sitemap search index report market design build deploy scale").split()
+
+
+@dataclass
+class SiteConfig:
+    pages: int = 200
+    js_fraction: float = 0.1
+    slow_fraction: float = 0.05
+    slow_ms: int = 500
+    huge_fraction: float = 0.02
+    huge_kb: int = 2048
+    links_per_page: int = 8
+    words_per_page: int = 400
+    seed: int = 1
+
+
+class SyntheticSite:
+    """Page layout and HTML of a generated site (same config, same site)"""
+
+    def __init__(self, config: SiteConfig = None):
+        self.config = config or SiteConfig()
+        rng = random.Random(self.config.seed)
+        self.kinds: List[str] = []
+        for i in range(self.config.pages):
+            roll = rng.random()
+            if i == 0:
+                kind = "static"
+            elif roll < self.config.js_fraction:
+                kind = "js"
+            elif roll < self.config.js_fraction + self.config.slow_fraction:
+                kind = "slow"
+            elif roll < self.config.js_fraction + self.config.slow_fraction + self.config.huge_fraction:
+                kind = "huge"
+            else:
+                kind = "static"
+            self.kinds.append(kind)
+        self._paths = ["/"] + [f"/{SECTIONS[i % len(SECTIONS)]}/page-{i}"
+                               for i in range(1, self.config.pages)]
+        self._index = {path: i for i, path in enumerate(self._paths)}
+        self._cache: Dict[int, bytes] = {}
+        self._lock = threading.Lock()
+
+    def paths(self) -> List[str]:
+        return list(self._paths)
+
+    def counts(self) -> Dict[str, int]:
+        return {kind: self.kinds.count(kind) for kind in ("static", "js", "slow", "huge")}
+
+    def _links(self, i: int, rng: random.Random) -> List[int]:
+        n = self.config.pages
+        # next / previous / home close cycles; the rest are random cross-links
+        links = [(i + 1) % n, (i - 1) % n, 0]
+        links += [rng.randrange(n) for _ in range(max(0, self.config.links_per_page - 3))]
+        return list(dict.fromkeys(j for j in links if j != i))
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        paragraphs = []
+        while words > 0:
+            count = min(words, rng.randint(30, 80))
+            paragraphs.append("<p>" + " ".join(rng.choice(WORDS) for _ in range(count)).capitalize() + ".</p>")
+            words -= count
+        return "\n".join(paragraphs)
+
+    def _render(self, i: int) -> bytes:
+        rng = random.Random(self.config.seed * 1_000_003 + i)
+        kind = self.kinds[i]
+        title = f"{SECTIONS[i % len(SECTIONS)].capitalize()} page {i}"
+        words = self.config.words_per_page
+        if kind == "huge":
+            words = self.config.huge_kb * 1024 // 7  # ~7 bytes per word with markup
+        nav = " ".join(f'<a href="{self._paths[j]}">{SECTIONS[j % len(SECTIONS)]} {j}</a>'
+                       for j in self._links(i, rng))
+        main = f"<h1>{title}</h1>\n{self._text(rng, words)}\n<div class=\"related\">{nav}</div>"
+
+        if kind == "js":
+            # Content and links only exist after the script runs
+            payload = json.dumps(main).replace("</", "<\\/")
+            body = (f'<!DOCTYPE html><html><head><title>{title}</title>'
+                    f'<script src="/static/js/main.0a1b2c3d.js"></script></head><body>'
+                    f'<noscript>You need to enable JavaScript to run this app.</noscript>'
+                    f'<div id="root"></div>'
+                    f'<script>document.getElementById("root").innerHTML = {payload};</script>'
+                    f'</body></html>')
+        else:
+            body = (f'<!DOCTYPE html><html><head><title>{title}</title></head><body>'
+                    f'<nav><a href="/">Home</a></nav><main>{main}</main>'
+                    f'<footer>Synthetic site</footer></body></html>')
+        return body.encode("utf-8")
+
+    def page(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        """(status, headers, body) for a request path"""
+        path = path.split("?", 1)[0].split("#", 1)[0]
+        if path == "/robots.txt":
+            return 200, {"Content-Type": "text/plain"}, b"User-agent: *\nAllow: /\n"
+        if path.endswith(".js"):
+            return 200, {"Content-Type": "application/javascript"}, b""
+        i = self._index.get(path.rstrip("/") or "/")
+        if i is None:
+            return 404, {"Content-Type": "text/html"}, b"<html><body>Not found</body></html>"
+        with self._lock:
+            body = self._cache.get(i)
+        if body is None:
+            body = self._render(i)
+            with self._lock:
+                self._cache[i] = body
+        if self.kinds[i] == "slow":
+            time.sleep(self.config.slow_ms / 1000)
+        return 200, {"Content-Type": "text/html; charset=utf-8"}, body
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """Start serving in a background thread; the URL is server_url(server)"""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                status, headers, body = site.page(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8000)
+    for name, value in asdict(SiteConfig()).items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    config = SiteConfig(**{name: getattr(args, name) for name in asdict(SiteConfig())})
+    site = SyntheticSite(config)
+    server = site.serve(port=args.port)
+    print(f"Serving {config.pages} pages {site.counts()} at {server_url(server)} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
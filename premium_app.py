@@ -2,6 +2,7 @@ import streamlit as st
 import time
 import json
 import os
+import logging
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -9,9 +10,13 @@ load_dotenv()
 if os.path.exists('.env.example'):
     load_dotenv('.env.example')
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                    format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
 st.set_page_config(page_title="WebScraper AI Premium", layout="wide")
 
-from scraper import SmartWebScraper, ScrapedPage, AIChat, is_groq_configured
+from scraper import SmartWebScraper, ScrapedPage, AIChat, is_groq_configured, MAX_CONTEXT_CHARS
 
 # PREMIUM UI WITH APPLE + LINEAR + STRIPE AESTHETIC
 st.markdown("""
@@ -621,9 +626,13 @@ if st.button("🚀 Start Intelligent Extraction", use_container_width=True):
                     st.session_state.urls.append(curr)
                     update_progress(curr, count+1, max_p)
                 
-                pages = scraper.scrape_website(url, max_pages, on_prog)
-                st.session_state.pages = pages
-                st.session_state.content = scraper.get_all_content()
+                # Keep pages as they arrive, so a failed crawl keeps its results
+                st.session_state.pages = {}
+                for page in scraper.iter_scrape_website(url, max_pages, on_prog):
+                    st.session_state.pages[page.url] = page
+                pages = st.session_state.pages
+                # Only what the chat can use; the pages themselves stay in the page store
+                st.session_state.content = scraper.get_all_content(max_chars=MAX_CONTEXT_CHARS)
                 st.session_state.ai = AIChat(st.session_state.content) if groq_ok else None
                 progress_area.empty()
                 st.success(f"✅ Successfully extracted {len(pages)} pages")
@@ -669,9 +678,9 @@ if st.button("🚀 Start Intelligent Extraction", use_container_width=True):
         else:  # Quick Scan
             with st.spinner("⚡ Scanning..."):
                 try:
-                    import requests
+                    from scraper.http_cache import cached_get
                     from bs4 import BeautifulSoup
-                    r = requests.get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0 (compatible; WebScraperAI/1.0)'})
+                    r = cached_get(url, timeout=10, headers={'User-Agent': 'Mozilla/5.0 (compatible; WebScraperAI/1.0)'})
                     soup = BeautifulSoup(r.text, 'html.parser')
                     for t in soup(['script', 'style']):
                         t.decompose()
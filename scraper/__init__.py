@@ -8,6 +8,39 @@ from .web_scraper import (
     ScrapedPage,
 )
 
+from .async_engine import AsyncCrawlEngine
+from .fetch_strategy import FetchVerdicts, get_fetch_verdicts, needs_javascript
+from .browser_extract import RenderedPage, extract_in_browser
+from .extract_pool import ExtractionPool, get_extraction_pool
+from .driver_pool import DriverPool, get_driver_pool, get_browser_pool
+from .cdp_backend import CDPPool, CDPTab, get_cdp_pool
+from .render_profile import RenderProfile, get_render_profile
+from .stats import CrawlStats
+from .politeness import PolitenessScheduler, get_scheduler
+from .urls import canonicalize_url, SeenURLs, BloomFilter
+from .http_cache import HttpCache, get_http_cache, cached_get
+from .http_client import get_http_client, http_get
+from .retry import (
+    RetryPolicy,
+    CircuitBreaker,
+    CircuitOpen,
+    RetryableStatus,
+    get_retry_policy,
+    get_circuit_breaker,
+)
+from .proxy_fetch import ProxyFetcher, ProxyRun, QuotaLedger, QuotaExceeded, get_proxy_fetcher
+from .incremental import CrawlState, CrawlDiff
+from .sitemap import SitemapReader
+from .checkpoint import CrawlCheckpoint, list_checkpoints
+from .page_store import PageStore, StoredPage
+from .coordinator import (
+    CrawlCoordinator,
+    CrawlWorker,
+    FrontierBackend,
+    SQLiteFrontierBackend,
+    run_local_workers,
+)
+
 from .ai_parser import (
     AIParser,
     AIChat,
@@ -15,6 +48,7 @@ from .ai_parser import (
     SuperMemory,
     is_groq_configured,
     is_supermemory_configured,
+    MAX_CONTEXT_CHARS,
 )
 
 from .exporter import (
@@ -27,12 +61,63 @@ __all__ = [
     "SmartWebScraper",
     "QuickScraper",
     "ScrapedPage",
+    "AsyncCrawlEngine",
+    "FetchVerdicts",
+    "get_fetch_verdicts",
+    "needs_javascript",
+    "RenderedPage",
+    "extract_in_browser",
+    "ExtractionPool",
+    "get_extraction_pool",
+    "DriverPool",
+    "get_driver_pool",
+    "get_browser_pool",
+    "CDPPool",
+    "CDPTab",
+    "get_cdp_pool",
+    "RenderProfile",
+    "get_render_profile",
+    "CrawlStats",
+    "PolitenessScheduler",
+    "get_scheduler",
+    "canonicalize_url",
+    "SeenURLs",
+    "BloomFilter",
+    "HttpCache",
+    "get_http_cache",
+    "cached_get",
+    "get_http_client",
+    "http_get",
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitOpen",
+    "RetryableStatus",
+    "get_retry_policy",
+    "get_circuit_breaker",
+    "ProxyFetcher",
+    "ProxyRun",
+    "QuotaLedger",
+    "QuotaExceeded",
+    "get_proxy_fetcher",
+    "CrawlState",
+    "CrawlDiff",
+    "SitemapReader",
+    "CrawlCheckpoint",
+    "list_checkpoints",
+    "PageStore",
+    "StoredPage",
+    "CrawlCoordinator",
+    "CrawlWorker",
+    "FrontierBackend",
+    "SQLiteFrontierBackend",
+    "run_local_workers",
     "AIParser",
     "AIChat",
     "GroqProvider",
     "SuperMemory",
     "is_groq_configured",
     "is_supermemory_configured",
+    "MAX_CONTEXT_CHARS",
     "DataExporter",
     "export_to_json",
     "export_to_csv",
@@ -81,10 +81,15 @@ class SuperMemory:
         self.memories = []
 
 
+# Chat only ever sends this much scraped content to the model
+MAX_CONTEXT_CHARS = 30000
+
+
 class AIChat:
     def __init__(self, content: str = ""):
         self.provider = GroqProvider()
         self.memory = SuperMemory()
+        content = content[:MAX_CONTEXT_CHARS]
         self.content = content
         self.history: List[Dict] = []
         
@@ -92,6 +97,7 @@ class AIChat:
             self.memory.add(content)
     
     def set_context(self, content: str):
+        content = content[:MAX_CONTEXT_CHARS]
         self.content = content
         self.memory.add(content)
     
@@ -103,7 +109,7 @@ class AIChat:
 Answer questions based on this data. Be accurate and helpful.
 
 SCRAPED DATA:
-{self.content[:30000]}
+{self.content}
 
 Instructions:
 - Answer based on the data above
@@ -0,0 +1,262 @@
+"""
+Async HTTP-first crawl engine
+
+Fetches pages concurrently over a pooled async HTTP client and only hands
+pages to Selenium when the plain HTML needs JavaScript to render. What each
+domain needed is remembered (see fetch_strategy), so domains known to be
+client-side apps skip the HTTP attempt.
+"""
+
+import logging
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterator, Optional, Callable
+from urllib.parse import urlparse
+
+import httpx
+
+from .extraction import body_word_count
+from .fetch_strategy import get_fetch_verdicts, js_signals, says_about_domain
+from .frontier import CrawlFrontier
+from .http_cache import get_http_cache, storable
+from .http_client import build_async_client
+from .politeness import get_scheduler
+from .retry import CircuitOpen, RetryableStatus, RETRY_STATUS, retry_call_async
+from .urls import url_host
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Status codes worth retrying in a real browser (bot walls, rate limits)
+BROWSER_RETRY_STATUS = {403, 429, 503}
+
+
+class AsyncCrawlEngine:
+    """Concurrent HTTP crawler that falls back to the browser per page"""
+
+    def __init__(self, scraper, concurrency: int = 10, per_host_limit: int = 4,
+                 timeout: float = 15.0):
+        self.scraper = scraper
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.timeout = timeout
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._browser_lock = threading.Lock()
+        self.browser_renders = 0
+        self.scheduler = get_scheduler()
+        self.cache = get_http_cache()
+        self.verdicts = get_fetch_verdicts()
+
+    def crawl(self, start_url: str, max_pages: int = 10,
+              progress_callback: Callable = None) -> Dict:
+        """Run the crawl to completion and return scraped pages by URL"""
+        for _ in self.iter_pages(start_url, max_pages, progress_callback):
+            pass
+        return self.scraper.scraped_pages
+
+    def iter_pages(self, start_url: str, max_pages: int = 10,
+                   progress_callback: Callable = None) -> Iterator:
+        """Synchronous generator over iter_crawl, driving a private event loop"""
+        loop = asyncio.new_event_loop()
+        pages = self.iter_crawl(start_url, max_pages, progress_callback)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            executor = None
+            run = loop.run_until_complete
+        else:
+            # Already inside an event loop (e.g. notebooks) - step on a helper thread
+            executor = ThreadPoolExecutor(max_workers=1)
+            run = lambda coro: executor.submit(loop.run_until_complete, coro).result()
+
+        try:
+            while True:
+                try:
+                    page = run(pages.__anext__())
+                except StopAsyncIteration:
+                    break
+                yield page
+        finally:
+            run(pages.aclose())
+            run(loop.shutdown_default_executor())
+            loop.close()
+            if executor:
+                executor.shutdown()
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    def _render(self, url: str) -> Optional[str]:
+        """Load a page through the scraper's browser (one at a time)"""
+        with self._browser_lock:
+            if not self.scraper.driver:
+                self.scraper.driver = self.scraper._create_driver()
+            self.browser_renders += 1
+            with self.scheduler.slot(url):
+                return self.scraper._load_page(url)
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> tuple:
+        """Fetch a page over HTTP; returns (html, fall_back_to_browser)"""
+        entry = self.cache.get(url) if self.cache else None
+        if entry and self.cache.is_fresh(entry):
+            self.cache.hits += 1
+            logger.debug("Cache hit: %s", url)
+            return entry.body, False
+
+        async def attempt() -> httpx.Response:
+            async with self._host_limit(url):
+                await self.scheduler.acquire_async(url)
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url, headers=entry.conditional_headers() if entry else None)
+                except httpx.HTTPError:
+                    self.scheduler.release(url)
+                    raise
+                self.scheduler.release(url, response.status_code,
+                                       response.headers.get("retry-after"))
+                self.scraper.crawl_stats.record_span("fetch", time.perf_counter() - started)
+            if response.status_code in RETRY_STATUS:
+                raise RetryableStatus(response.status_code, response.headers.get("retry-after"))
+            return response
+
+        try:
+            response = await retry_call_async(url, attempt, stats=self.scraper.crawl_stats)
+        except CircuitOpen as e:
+            self.scraper.crawl_stats.record_error("circuit_open")
+            logger.warning("%s - skipping %s", e, url)
+            return None, False
+        except RetryableStatus as e:
+            logger.warning("HTTP %s for %s", e.status, url)
+            return None, e.status in BROWSER_RETRY_STATUS
+        except httpx.HTTPError as e:
+            logger.warning("HTTP error for %s: %s", url, e)
+            return None, True
+
+        if entry and response.status_code == 304:
+            self.cache.revalidated += 1
+            self.cache.touch(url, headers=response.headers)
+            logger.debug("Not modified: %s", url)
+            return entry.body, False
+
+        if response.status_code != 200:
+            logger.warning("HTTP %s for %s", response.status_code, url)
+            return None, response.status_code in BROWSER_RETRY_STATUS
+
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type and "xml" not in content_type:
+            logger.info("Not HTML (%s) - skipping %s", content_type, url)
+            return None, False
+
+        if self.cache:
+            self.cache.misses += 1
+            if storable(response.headers):
+                self.cache.put(url, response.text, dict(response.headers))
+        return response.text, False
+
+    async def _process(self, client: httpx.AsyncClient, url: str) -> tuple:
+        domain = url_host(url)
+        if self.verdicts.use_browser(domain):
+            logger.debug("%s needs JavaScript - rendering: %s", domain, url)
+            html, use_browser = None, True
+        else:
+            html, use_browser = await self._fetch(client, url)
+
+        if html:
+            scraper = self.scraper
+            if scraper._is_unchanged(url, html):
+                # Kept from this same HTML last time, so it didn't need the browser
+                return await asyncio.to_thread(scraper._build_page, url, html)
+            # Parse without side effects first: nothing is recorded (incremental
+            # state, verdicts) until it is settled which HTML the page is kept from.
+            # Extraction is CPU-bound; keep it off the event loop.
+            spans = {}
+            parsed = await asyncio.to_thread(scraper._parse, html, url, spans)
+            title, content, anchors, canonical = parsed
+            duplicate = scraper._duplicate_of(url, canonical)
+            if duplicate:
+                logger.info("%s is a duplicate of %s - skipping", url, duplicate)
+                return None, []
+            signals = js_signals(html, body_word_count(content))
+            needed_js = bool(signals)
+            if says_about_domain(signals):
+                self.verdicts.record(domain, needed_js)
+            if not needed_js:
+                return await asyncio.to_thread(scraper._build_page, url, html, (*parsed, spans))
+            logger.info("Needs JavaScript - rendering: %s", url)
+            use_browser = True
+
+        if not use_browser:
+            return None, []
+
+        html = await asyncio.to_thread(self._render, url)
+        if not html:
+            logger.warning("Failed to load %s - skipping", url)
+            return None, []
+        return await asyncio.to_thread(self.scraper._build_page, url, html)
+
+    async def iter_crawl(self, start_url: str, max_pages: int = 10,
+                         progress_callback: Callable = None) -> AsyncIterator:
+        """Crawl, yielding each ScrapedPage as soon as it is extracted"""
+        scraper = self.scraper
+        frontier = scraper._start_crawl(start_url, max_pages)
+
+        logger.info("Starting async scrape of %s (max pages: %d, concurrency: %d)",
+                    scraper.base_domain, max_pages, self.concurrency)
+
+        pending = {}
+
+        try:
+            async with build_async_client(self.concurrency, DEFAULT_HEADERS,
+                                          timeout=self.timeout) as client:
+                while True:
+                    # Fill free slots from the frontier
+                    while len(pending) < self.concurrency:
+                        url = frontier.pop()
+                        if not url:
+                            break
+
+                        logger.info("[%d/%d] %s", frontier.page_count, max_pages, url)
+                        if progress_callback:
+                            progress_callback(url, frontier.page_count - 1, len(frontier), max_pages)
+
+                        task = asyncio.create_task(self._process(client, url))
+                        pending[task] = url
+
+                    if not pending:
+                        break
+
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        url = pending.pop(task)
+                        frontier.done(url)
+                        try:
+                            page, links = task.result()
+                        except Exception as e:
+                            logger.warning("Error processing %s: %s", url, e)
+                            continue
+                        if not page:
+                            continue
+                        # Writes the page store and checkpoint: keep disk I/O off the loop
+                        yield await asyncio.to_thread(scraper._store_page, url, page, links,
+                                                      frontier)
+        finally:
+            # Stopped early: drop work that is still running
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            scraper._close_driver()
+
+        scraper._finish_crawl()
+        logger.info("Async scrape complete: %d pages (%d rendered in browser)",
+                    len(scraper.scraped_pages), self.browser_renders)
+        logger.info("Stats: %s", scraper.crawl_stats.summary())
@@ -0,0 +1,101 @@
+"""
+In-browser extraction
+
+Runs one script in the loaded page that collects the title, the visible
+text of the body (minus the same non-content elements parse_html drops)
+and the page's same-site links, and returns only that. Heavy pages no
+longer ship megabytes of page_source (inline scripts, SVG, JSON state)
+over the WebDriver connection to be parsed again in Python.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional, Tuple
+
+from .extraction import SKIP_TAGS
+
+logger = logging.getLogger(__name__)
+
+# arguments[0]: tag names to skip (lower case), arguments[1]: host links must be on
+EXTRACT_SCRIPT = r"""
+const skip = new Set(arguments[0]);
+const host = (arguments[1] || location.host).toLowerCase();
+const root = document.body || document.documentElement;
+const parts = [];
+if (root) {
+    const walker = document.createTreeWalker(root, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT, {
+        acceptNode(node) {
+            if (node.nodeType === Node.ELEMENT_NODE) {
+                return skip.has(node.localName) ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_SKIP;
+            }
+            return NodeFilter.FILTER_ACCEPT;
+        }
+    });
+    for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+        const text = node.nodeValue.trim();
+        if (text) parts.push(text);
+    }
+}
+const links = [];
+const seen = new Set();
+for (const a of document.querySelectorAll("a[href]")) {
+    const raw = a.getAttribute("href").trim();
+    if (!raw || /^(#|javascript:|mailto:|tel:)/i.test(raw)) continue;
+    if (!/^https?:$/.test(a.protocol) || a.host.toLowerCase() !== host) continue;
+    const href = a.href.split("#")[0];
+    if (seen.has(href)) continue;
+    seen.add(href);
+    links.push([href, (a.textContent || "").replace(/\s+/g, " ").trim().slice(0, 100)]);
+}
+const canonical = document.querySelector('link[rel~="canonical" i][href]');
+const title = document.querySelector("title");
+return {
+    title: title ? title.textContent.trim() : null,
+    text: parts.join("\n"),
+    links: links,
+    canonical: canonical ? canonical.href : null
+};
+"""
+
+
+@dataclass
+class RenderedPage:
+    """What EXTRACT_SCRIPT returns: a loaded page without its HTML"""
+    url: str
+    title: Optional[str]
+    text: str
+    links: List[Tuple[str, str]] = field(default_factory=list)
+    canonical: Optional[str] = None
+
+    @property
+    def size(self) -> int:
+        """Characters transferred (text plus links), the counterpart of len(html)"""
+        return len(self.text) + sum(len(href) + len(text) for href, text in self.links)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, data: str) -> "RenderedPage":
+        page = cls(**json.loads(data))
+        page.links = [tuple(link) for link in page.links]
+        return page
+
+
+def extract_in_browser(driver, url: str, host: Optional[str] = None) -> Optional[RenderedPage]:
+    """Run EXTRACT_SCRIPT in the driver's current page (None if it fails)"""
+    try:
+        result = driver.execute_script(EXTRACT_SCRIPT, SKIP_TAGS, host)
+    except Exception as e:
+        logger.debug("In-browser extraction failed for %s: %s", url, e)
+        return None
+    if not isinstance(result, dict) or not isinstance(result.get("text"), str):
+        return None
+    return RenderedPage(
+        url=url,
+        title=result.get("title"),
+        text=result["text"],
+        links=[tuple(link) for link in result.get("links") or []],
+        canonical=result.get("canonical"),
+    )
@@ -0,0 +1,605 @@
+"""
+Direct Chrome DevTools Protocol backend
+
+Drives headless Chrome over one persistent DevTools websocket per browser
+instead of chromedriver. Every WebDriver command is an HTTP round trip to
+chromedriver and on to Chrome; here commands go straight to the browser,
+page loads are detected from Page/Network events instead of polling, and
+one Chrome process serves several tabs (each in its own browser context,
+so cookies don't leak between borrowers).
+
+A CDPTab covers the part of the WebDriver interface SmartWebScraper uses
+(get, execute_script, page_source, execute_cdp_cmd), so extraction code
+runs unchanged on either backend. Select it with BROWSER_BACKEND=cdp.
+"""
+
+import json
+import logging
+import os
+import time
+import shutil
+import atexit
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import websocket
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+
+from .driver_pool import DEFAULT_USER_AGENT, build_chrome_options
+from .readiness import DEFAULT_MAX_WAIT, DEFAULT_QUIET_MS
+from .render_profile import NetworkUsage, RenderProfile, get_render_profile
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARIES = ["chromium", "chromium-browser", "google-chrome", "google-chrome-stable", "chrome"]
+
+
+class CDPError(WebDriverException):
+    """A DevTools command failed or the browser went away"""
+
+
+def find_chrome() -> Optional[str]:
+    """Chrome binary from CHROME_BINARY, else the first one on PATH"""
+    binary = os.getenv("CHROME_BINARY")
+    if binary:
+        return binary
+    if os.path.exists("/usr/bin/chromium"):
+        return "/usr/bin/chromium"
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+class _Call:
+    """A command waiting for its response"""
+
+    def __init__(self, method: str):
+        self.method = method
+        self.done = threading.Event()
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+
+    def wait(self, timeout: float) -> dict:
+        if not self.done.wait(timeout):
+            raise TimeoutException(f"No reply to {self.method} after {timeout:.0f}s")
+        if self.error is not None:
+            raise CDPError(f"{self.method}: {self.error}")
+        return self.result
+
+
+class CDPBrowser:
+    """One Chrome process and its DevTools websocket
+
+    Commands for every tab share the socket (flattened sessions); a reader
+    thread matches replies to callers and hands events to the tab they
+    belong to.
+    """
+
+    def __init__(self, profile: Optional[RenderProfile] = None,
+                 binary: Optional[str] = None, start_timeout: float = 20):
+        self.profile = profile or get_render_profile()
+        binary = binary or find_chrome()
+        if not binary:
+            raise WebDriverException("Chrome not found (set CHROME_BINARY)")
+        self._profile_dir = tempfile.mkdtemp(prefix="cdp-chrome-")
+        args = [a for a in build_chrome_options(self.profile).arguments
+                if not a.startswith("--remote-debugging")]
+        self.process = subprocess.Popen(
+            [binary, *args, "--remote-debugging-port=0", f"--user-data-dir={self._profile_dir}",
+             "--no-first-run", "--no-default-browser-check", "about:blank"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            self._ws = websocket.create_connection(self._endpoint(start_timeout),
+                                                   suppress_origin=True, enable_multithread=True)
+        except Exception:
+            self._kill()
+            raise
+
+        self._calls: Dict[int, _Call] = {}
+        self._tabs: Dict[str, "CDPTab"] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.closed = False
+        self.opening = 0
+        self.tabs_opened = 0
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def _endpoint(self, timeout: float) -> str:
+        """Chrome writes its port and browser websocket path to DevToolsActivePort"""
+        path = os.path.join(self._profile_dir, "DevToolsActivePort")
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise WebDriverException(f"Chrome exited on start (code {self.process.returncode})")
+            try:
+                with open(path) as f:
+                    port, ws_path = f.read().split()[:2]
+                return f"ws://127.0.0.1:{port}{ws_path}"
+            except (OSError, ValueError):
+                time.sleep(0.05)
+        raise TimeoutException(f"Chrome did not open its DevTools port within {timeout:.0f}s")
+
+    def post(self, method: str, params: Optional[dict] = None,
+             session_id: Optional[str] = None) -> _Call:
+        """Send a command without waiting; call .wait() on the result for the reply
+
+        Posting several commands before waiting pipelines them over the socket.
+        """
+        call = _Call(method)
+        with self._lock:
+            if self.closed:
+                raise CDPError(f"{method}: browser is closed")
+            self._next_id += 1
+            message = {"id": self._next_id, "method": method, "params": params or {}}
+            if session_id:
+                message["sessionId"] = session_id
+            self._calls[self._next_id] = call
+        try:
+            self._ws.send(json.dumps(message))
+        except Exception as e:
+            self._fail_all(str(e))
+        return call
+
+    def send(self, method: str, params: Optional[dict] = None,
+             session_id: Optional[str] = None, timeout: float = 30) -> dict:
+        return self.post(method, params, session_id).wait(timeout)
+
+    def _read_loop(self):
+        try:
+            while True:
+                message = json.loads(self._ws.recv())
+                if "id" in message:
+                    with self._lock:
+                        call = self._calls.pop(message["id"], None)
+                    if call:
+                        call.error = message["error"].get("message") if "error" in message else None
+                        call.result = message.get("result", {})
+                        call.done.set()
+                else:
+                    tab = self._tabs.get(message.get("sessionId"))
+                    if tab:
+                        tab._on_event(message.get("method"), message.get("params", {}))
+        except Exception as e:
+            if not self.closed:
+                logger.warning("DevTools connection lost: %s", e)
+            self._fail_all("connection closed")
+
+    def _fail_all(self, error: str):
+        with self._lock:
+            self.closed = True
+            calls, self._calls = self._calls, {}
+        for call in calls.values():
+            call.error = error
+            call.done.set()
+        for tab in list(self._tabs.values()):
+            with tab._cond:
+                tab._cond.notify_all()
+
+    def new_tab(self, user_agent: Optional[str] = None) -> "CDPTab":
+        """Open a tab in a fresh browser context and attach to it"""
+        context = self.send("Target.createBrowserContext", {"disposeOnDetach": True})["browserContextId"]
+        target = self.send("Target.createTarget", {"url": "about:blank",
+                                                   "browserContextId": context})["targetId"]
+        session = self.send("Target.attachToTarget", {"targetId": target, "flatten": True})["sessionId"]
+        tab = CDPTab(self, target, session, context)
+        with self._lock:
+            self._tabs[session] = tab
+            self.tabs_opened += 1
+        try:
+            tab._setup(user_agent)
+        except BaseException:
+            tab.close()  # unregisters the session and closes the target
+            raise
+        return tab
+
+    def _forget(self, tab: "CDPTab"):
+        with self._lock:
+            self._tabs.pop(tab.session_id, None)
+
+    @property
+    def tab_count(self) -> int:
+        """Open tabs, counting ones being opened"""
+        return len(self._tabs) + self.opening
+
+    def _kill(self):
+        try:
+            self.process.terminate()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+        shutil.rmtree(self._profile_dir, ignore_errors=True)
+
+    def quit(self):
+        if not self.closed:
+            try:
+                self.send("Browser.close", timeout=5)
+            except Exception:
+                pass
+        self.closed = True
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+        self._kill()
+
+
+class CDPTab:
+    """One tab, driven like a WebDriver through its DevTools session
+
+    Network and Page events are tracked as they arrive: get() returns on the
+    load event, wait_until_idle() when no request has been in flight for
+    quiet_ms, and network_usage() sums the page's traffic without reading a
+    performance log.
+    """
+
+    def __init__(self, browser: CDPBrowser, target_id: str, session_id: str, context_id: str):
+        self.browser = browser
+        self.target_id = target_id
+        self.session_id = session_id
+        self.context_id = context_id
+        self.page_load_timeout = float(os.getenv("PAGE_LOAD_TIMEOUT", "30"))
+        self.user_agent_overridden = False
+        self.pages_served = 0
+        self.created_at = time.time()
+        self.last_used = time.time()
+        self._cond = threading.Condition()
+        self._in_flight = set()
+        self._last_net = time.monotonic()
+        self._loaded = False
+        self._usage = NetworkUsage()
+
+    def _setup(self, user_agent: Optional[str]):
+        # Pipelined: one wait for all of them instead of a round trip each
+        calls = [self.post("Page.enable"), self.post("Network.enable")]
+        blocked = self.browser.profile.blocked_urls()
+        if blocked:
+            calls.append(self.post("Network.setBlockedURLs", {"urls": blocked}))
+        if user_agent:
+            calls.append(self.post("Network.setUserAgentOverride", {"userAgent": user_agent}))
+        for call in calls:
+            call.wait(30)
+        self.user_agent_overridden = bool(user_agent)
+
+    def post(self, method: str, params: Optional[dict] = None) -> _Call:
+        return self.browser.post(method, params, self.session_id)
+
+    def execute_cdp_cmd(self, cmd: str, params: Optional[dict] = None) -> dict:
+        return self.post(cmd, params).wait(30)
+
+    def _on_event(self, method: str, params: dict):
+        with self._cond:
+            usage = self._usage
+            if method == "Network.requestWillBeSent":
+                if params.get("requestId") not in self._in_flight:
+                    usage.requests += 1
+                self._in_flight.add(params.get("requestId"))
+            elif method == "Network.loadingFinished":
+                usage.bytes_received += int(params.get("encodedDataLength", 0))
+                self._in_flight.discard(params.get("requestId"))
+            elif method == "Network.loadingFailed":
+                usage.blocked += bool(params.get("blockedReason"))
+                self._in_flight.discard(params.get("requestId"))
+            elif (method == "Network.responseReceived" and params.get("type") == "Document"
+                    and usage.document_status is None):
+                response = params.get("response", {})
+                usage.document_status = int(response.get("status") or 0) or None
+                headers = {k.lower(): v for k, v in response.get("headers", {}).items()}
+                usage.retry_after = headers.get("retry-after")
+            elif method == "Page.loadEventFired":
+                self._loaded = True
+            else:
+                return
+            self._last_net = time.monotonic()
+            self._cond.notify_all()
+
+    def get(self, url: str):
+        """Navigate and return once the load event fires"""
+        with self._cond:
+            self._in_flight.clear()
+            self._loaded = False
+            self._usage = NetworkUsage()
+            self._last_net = time.monotonic()
+        result = self.execute_cdp_cmd("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise WebDriverException(f"unknown error: {result['errorText']}")
+        if not result.get("loaderId"):
+            return  # same-document navigation, nothing to load
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._loaded or self.browser.closed,
+                                       self.page_load_timeout):
+                raise TimeoutException(f"Page load timed out after {self.page_load_timeout:.0f}s: {url}")
+        if self.browser.closed:
+            raise CDPError("browser is closed")
+
+    def wait_until_idle(self, max_wait: float = DEFAULT_MAX_WAIT,
+                        quiet_ms: float = DEFAULT_QUIET_MS) -> float:
+        """Scroll to the bottom (lazy content) and wait for the network to go quiet
+
+        Returns seconds waited. Unlike wait_for_page_ready this blocks on
+        events rather than polling the page.
+        """
+        started = time.monotonic()
+        deadline = started + max_wait
+        quiet = quiet_ms / 1000
+        try:
+            self.post("Runtime.evaluate", {"expression": "document.body && "
+                      "window.scrollTo(0, document.body.scrollHeight)"})
+        except CDPError:
+            pass
+        with self._cond:
+            while not self.browser.closed:
+                now = time.monotonic()
+                idle_for = now - self._last_net
+                if not self._in_flight and idle_for >= quiet:
+                    break
+                if now >= deadline:
+                    break
+                self._cond.wait(min(deadline - now, max(quiet - idle_for, 0.01)))
+        return time.monotonic() - started
+
+    def network_usage(self) -> NetworkUsage:
+        with self._cond:
+            usage = self._usage
+            return NetworkUsage(usage.bytes_received, usage.requests, usage.blocked,
+                                usage.document_status, usage.retry_after)
+
+    def execute_script(self, script: str, *args):
+        """Run a WebDriver-style script body (arguments[n], return) in the page"""
+        expression = f"(function() {{{script}\n}}).apply(null, {json.dumps(args)})"
+        result = self.execute_cdp_cmd("Runtime.evaluate", {
+            "expression": expression, "returnByValue": True, "awaitPromise": True})
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            message = details.get("exception", {}).get("description") or details.get("text")
+            raise JavascriptException(f"javascript error: {message}")
+        return result.get("result", {}).get("value")
+
+    @property
+    def page_source(self) -> str:
+        return self.execute_script("return document.documentElement ? "
+                                   "document.documentElement.outerHTML : ''")
+
+    def reset(self):
+        """Clear state between borrowers (cookies, user agent, current page)"""
+        calls = [self.post("Network.clearBrowserCookies")]
+        if self.user_agent_overridden:
+            calls.append(self.post("Network.setUserAgentOverride", {"userAgent": DEFAULT_USER_AGENT}))
+            self.user_agent_overridden = False
+        for call in calls:
+            call.wait(10)
+        self.get("about:blank")
+
+    def close(self):
+        self.browser._forget(self)
+        try:
+            self.browser.send("Target.closeTarget", {"targetId": self.target_id}, timeout=10)
+            self.browser.send("Target.disposeBrowserContext", {"browserContextId": self.context_id},
+                              timeout=10)
+        except Exception:
+            pass
+
+    def quit(self):
+        self.close()
+
+
+class CDPPool:
+    """Thread-safe pool of CDP tabs spread over a few Chrome processes
+
+    Same interface as DriverPool, but lends out tabs: up to
+    `tabs_per_browser` per Chrome, `max_browsers` Chromes in all. Tabs
+    are recycled after max_pages_per_driver pages and closed after
+    idle_timeout seconds unused; a Chrome with no tabs left is quit.
+    """
+
+    def __init__(self, max_browsers: int = 2, tabs_per_browser: int = 4,
+                 idle_timeout: float = 300, max_pages_per_driver: int = 100,
+                 acquire_timeout: float = 120):
+        self.max_browsers = max(1, max_browsers)
+        self.tabs_per_browser = max(1, tabs_per_browser)
+        self.max_size = self.max_browsers * self.tabs_per_browser
+        self.idle_timeout = idle_timeout
+        self.max_pages_per_driver = max_pages_per_driver
+        self.acquire_timeout = acquire_timeout
+
+        self._browsers: List[CDPBrowser] = []
+        self._idle: List[CDPTab] = []
+        self._in_use: Dict[int, CDPTab] = {}
+        self._starting = 0
+        self._cond = threading.Condition()
+        self._launch_lock = threading.Lock()
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "discarded": 0, "reaped": 0,
+                      "browsers": 0}
+
+        if self.idle_timeout:
+            threading.Thread(target=self._reap_loop, daemon=True).start()
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._starting
+
+    def _take_dead(self) -> List[CDPBrowser]:
+        """Drop Chromes whose DevTools connection died; the caller quits them
+        (outside the lock) so their processes and profiles don't leak"""
+        dead = [b for b in self._browsers if b.closed]
+        if dead:
+            self._browsers = [b for b in self._browsers if not b.closed]
+        return dead
+
+    def _browser_with_room(self) -> Optional[CDPBrowser]:
+        """A live Chrome with a free tab slot, or None if a new one is needed"""
+        for browser in self._browsers:
+            if browser.tab_count < self.tabs_per_browser:
+                return browser
+        return None
+
+    def _open_tab(self, user_agent: Optional[str]) -> CDPTab:
+        # Launches are serialized (a waiting caller then finds room in the
+        # new Chrome) but don't hold up borrowers of idle tabs
+        with self._launch_lock:
+            with self._cond:
+                dead = self._take_dead()
+                browser = self._browser_with_room()
+                if browser:
+                    browser.opening += 1
+            for gone in dead:
+                gone.quit()
+            if browser is None:
+                browser = CDPBrowser()
+                with self._cond:
+                    self._browsers.append(browser)
+                    browser.opening += 1
+                    self.stats["browsers"] += 1
+        with self._cond:
+            self.stats["created"] += 1
+        try:
+            return browser.new_tab(user_agent)
+        finally:
+            with self._cond:
+                browser.opening -= 1
+
+    def acquire(self, user_agent: Optional[str] = None, timeout: Optional[float] = None) -> CDPTab:
+        """Borrow a tab, opening one if the pool has room"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Browser pool is shut down")
+                if self._idle:
+                    tab = self._idle.pop()
+                    if tab.browser.closed:
+                        self.stats["discarded"] += 1
+                        continue
+                    self.stats["reused"] += 1
+                    break
+                if self.size < self.max_size:
+                    self._starting += 1
+                    tab = None
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser tab free after {timeout:.0f}s (max {self.max_size})")
+                self._cond.wait(remaining)
+
+        if tab is None:
+            try:
+                tab = self._open_tab(user_agent)
+            finally:
+                with self._cond:
+                    self._starting -= 1
+                    self._cond.notify()
+        elif user_agent:
+            try:
+                tab.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+                tab.user_agent_overridden = True
+            except Exception:
+                pass
+
+        tab.last_used = time.time()
+        with self._cond:
+            self._in_use[id(tab)] = tab
+        return tab
+
+    def release(self, tab: CDPTab, pages: int = 1):
+        """Return a borrowed tab; broken or worn-out tabs are closed"""
+        with self._cond:
+            tab = self._in_use.pop(id(tab), None)
+        if tab is None:
+            return
+
+        tab.pages_served += pages
+        tab.last_used = time.time()
+        keep = not self._closed and self._reset(tab)
+        if keep and tab.pages_served >= self.max_pages_per_driver:
+            self.stats["recycled"] += 1
+            keep = False
+
+        with self._cond:
+            if keep:
+                self._idle.append(tab)
+            self._cond.notify()
+        if not keep:
+            self._close(tab)
+
+    def _reset(self, tab: CDPTab) -> bool:
+        try:
+            tab.reset()
+            return True
+        except Exception as e:
+            logger.warning("Discarding unhealthy browser tab: %s", e)
+            self.stats["discarded"] += 1
+            return False
+
+    def _close(self, tab: CDPTab):
+        tab.close()
+        browser = tab.browser
+        with self._cond:
+            empty = browser.tab_count == 0
+            if empty and browser in self._browsers:
+                self._browsers.remove(browser)
+        if empty:
+            browser.quit()
+
+    @contextmanager
+    def driver(self, user_agent: Optional[str] = None):
+        """Borrow a tab for the duration of a with-block"""
+        tab = self.acquire(user_agent=user_agent)
+        try:
+            yield tab
+        finally:
+            self.release(tab)
+
+    def reap_idle(self):
+        """Close tabs idle longer than idle_timeout, and quit dead Chromes"""
+        now = time.time()
+        with self._cond:
+            expired = [t for t in self._idle if now - t.last_used > self.idle_timeout]
+            self._idle = [t for t in self._idle if t not in expired]
+            dead = self._take_dead()
+        for browser in dead:
+            browser.quit()
+        for tab in expired:
+            self.stats["reaped"] += 1
+            self._close(tab)
+
+    def _reap_loop(self):
+        interval = max(5.0, self.idle_timeout / 2)
+        while not self._closed:
+            time.sleep(interval)
+            self.reap_idle()
+
+    def shutdown(self):
+        """Quit every Chrome and refuse new borrows"""
+        with self._cond:
+            self._closed = True
+            browsers, self._browsers = self._browsers, []
+            self._idle = []
+            self._cond.notify_all()
+        for browser in browsers:
+            browser.quit()
+
+
+_pool: Optional[CDPPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_cdp_pool() -> CDPPool:
+    """Process-wide CDP tab pool, configured from the environment"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = CDPPool(
+                max_browsers=int(os.getenv("CDP_MAX_BROWSERS", "1")),
+                tabs_per_browser=int(os.getenv("CDP_TABS_PER_BROWSER", "4")),
+                idle_timeout=float(os.getenv("DRIVER_IDLE_TIMEOUT", "300")),
+                max_pages_per_driver=int(os.getenv("DRIVER_MAX_PAGES", "100")),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
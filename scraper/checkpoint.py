@@ -0,0 +1,219 @@
+"""
+Crawl checkpoints
+
+Saves a crawl's settings, every scraped page (as soon as it is scraped) and
+periodic snapshots of the frontier to a local SQLite file, so a crawl
+interrupted by a Streamlit restart or a Chrome crash can be continued with
+SmartWebScraper.resume(crawl_id) instead of starting over. A finished crawl
+keeps only its summary row, and crawls untouched for CHECKPOINT_RETENTION_DAYS
+are dropped, so the file doesn't grow with every crawl.
+"""
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from .frontier import CrawlFrontier
+
+
+def _default_path() -> str:
+    return os.path.join(os.getenv("HTTP_CACHE_DIR", ".cache"), "checkpoints.sqlite3")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript("""
+        CREATE TABLE IF NOT EXISTS crawls (
+            crawl_id TEXT PRIMARY KEY,
+            settings TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            frontier TEXT
+        );
+        CREATE TABLE IF NOT EXISTS pages (
+            crawl_id TEXT NOT NULL,
+            url TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            page TEXT NOT NULL,
+            links TEXT NOT NULL,
+            PRIMARY KEY (crawl_id, url)
+        );
+    """)
+    return db
+
+
+class CrawlCheckpoint:
+    """Checkpoint store for one crawl
+
+    Pages are written as they are scraped; the frontier (queue, visited set,
+    in-flight URLs) every `every_pages` pages or `every_seconds` seconds,
+    whichever comes first. Pages are buffered and written in batches of
+    `commit_pages` (and at every snapshot or flush()); pages lost in a crash
+    before their batch was written were claimed after the last snapshot,
+    so they are crawled again. On restore, in-flight URLs without a saved page
+    are queued again and the links of pages saved after the last snapshot
+    are re-added, so no discovered work is lost. Once the visited set has
+    switched to a Bloom filter only scraped pages are restored as visited.
+    """
+
+    def __init__(self, crawl_id: str, path: Optional[str] = None,
+                 every_pages: int = 25, every_seconds: float = 30, commit_pages: int = 10):
+        self.crawl_id = crawl_id
+        self.path = path or _default_path()
+        self.every_pages = every_pages
+        self.every_seconds = every_seconds
+        self.commit_pages = max(1, commit_pages)
+        self._db = _connect(self.path)
+        self._lock = threading.Lock()
+        self._since_save = 0
+        self._buffer: List[tuple] = []
+        self._last_save = time.time()
+
+    @classmethod
+    def create(cls, settings: dict, domain: str = "", **kwargs) -> "CrawlCheckpoint":
+        """Start checkpointing a new crawl"""
+        crawl_id = f"{domain or 'crawl'}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        checkpoint = cls(crawl_id, **kwargs)
+        prune_checkpoints(float(os.getenv("CHECKPOINT_RETENTION_DAYS", "7")) * 86400, db=checkpoint._db)
+        now = time.time()
+        with checkpoint._lock:
+            checkpoint._db.execute(
+                "INSERT INTO crawls (crawl_id, settings, status, created_at, updated_at) "
+                "VALUES (?, ?, 'running', ?, ?)",
+                (crawl_id, json.dumps(settings), now, now))
+            checkpoint._db.commit()
+        return checkpoint
+
+    @classmethod
+    def open(cls, crawl_id: str, **kwargs) -> "CrawlCheckpoint":
+        """Reopen an existing crawl's checkpoint (KeyError if unknown)"""
+        checkpoint = cls(crawl_id, **kwargs)
+        if checkpoint.settings is None:
+            raise KeyError(f"No checkpoint for crawl {crawl_id}")
+        return checkpoint
+
+    @property
+    def settings(self) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT settings FROM crawls WHERE crawl_id = ?",
+                                   (self.crawl_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update_settings(self, **changes):
+        settings = {**(self.settings or {}), **changes}
+        with self._lock:
+            self._db.execute("UPDATE crawls SET settings = ?, status = 'running', updated_at = ? "
+                             "WHERE crawl_id = ?", (json.dumps(settings), time.time(), self.crawl_id))
+            self._db.commit()
+
+    def record_page(self, url: str, page: dict, links: list, depth: int = 0):
+        """Persist a scraped page and the links it found"""
+        with self._lock:
+            self._buffer.append((self.crawl_id, url, depth, json.dumps(page, ensure_ascii=False),
+                                 json.dumps(links, ensure_ascii=False)))
+            self._since_save += 1
+            if len(self._buffer) >= self.commit_pages:
+                self._write_pages()
+                self._db.commit()
+
+    def _write_pages(self):
+        """Write buffered pages (caller holds the lock and commits)"""
+        if self._buffer:
+            self._db.executemany("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)", self._buffer)
+            self._buffer = []
+
+    def flush(self):
+        """Write buffered pages now (e.g. when a crawl stops early)"""
+        with self._lock:
+            self._write_pages()
+            self._db.commit()
+
+    def maybe_save(self, frontier: CrawlFrontier):
+        """Snapshot the frontier if enough pages or time have passed"""
+        if (self._since_save >= self.every_pages
+                or time.time() - self._last_save >= self.every_seconds):
+            self.save(frontier)
+
+    def save(self, frontier: CrawlFrontier, status: str = "running"):
+        snapshot = frontier.snapshot()
+        with self._lock:
+            self._write_pages()
+            self._db.execute(
+                "UPDATE crawls SET frontier = ?, status = ?, updated_at = ? WHERE crawl_id = ?",
+                (json.dumps(snapshot), status, time.time(), self.crawl_id))
+            self._db.commit()
+            self._since_save = 0
+            self._last_save = time.time()
+
+    def finish(self, frontier: CrawlFrontier):
+        """Mark the crawl complete and drop its pages and frontier (nothing to resume)"""
+        with self._lock:
+            self._db.execute("DELETE FROM pages WHERE crawl_id = ?", (self.crawl_id,))
+            self._db.execute("UPDATE crawls SET frontier = NULL, status = 'complete', updated_at = ? "
+                             "WHERE crawl_id = ?", (time.time(), self.crawl_id))
+            self._db.commit()
+            self._buffer = []
+
+    def restore(self, frontier: CrawlFrontier) -> Dict[str, dict]:
+        """Load the saved state into an empty frontier; returns {url: page dict}"""
+        with self._lock:
+            row = self._db.execute("SELECT frontier FROM crawls WHERE crawl_id = ?",
+                                   (self.crawl_id,)).fetchone()
+            rows = self._db.execute("SELECT url, depth, page, links FROM pages WHERE crawl_id = ?",
+                                    (self.crawl_id,)).fetchall()
+        snapshot = json.loads(row[0]) if row and row[0] else {}
+        pages = {url: json.loads(page) for url, _, page, _ in rows}
+
+        requeued = [tuple(item) for item in snapshot.get("in_flight", []) if item[0] not in pages]
+        retry = {item[0] for item in requeued}
+        visited = [url for url in snapshot.get("visited", []) if url not in retry]
+        frontier.restore(
+            [tuple(item) for item in snapshot.get("queued", [])] + requeued,
+            visited + list(pages),
+            max(snapshot.get("page_count", 0) - len(requeued), len(pages)),
+        )
+        # Pages saved after the last snapshot may have found links it lacks
+        for url, depth, _, links in rows:
+            frontier.depths[url] = depth
+            frontier.add_many([tuple(link) for link in json.loads(links)], parent=url)
+        return pages
+
+
+def prune_checkpoints(max_age: float, path: Optional[str] = None,
+                      db: Optional[sqlite3.Connection] = None) -> int:
+    """Delete crawls (finished or abandoned) not updated for max_age seconds"""
+    own = db is None
+    db = db or _connect(path or _default_path())
+    cutoff = time.time() - max_age
+    db.execute("DELETE FROM pages WHERE crawl_id IN "
+               "(SELECT crawl_id FROM crawls WHERE updated_at < ?)", (cutoff,))
+    deleted = db.execute("DELETE FROM crawls WHERE updated_at < ?", (cutoff,)).rowcount
+    db.commit()
+    if own:
+        db.close()
+    return deleted
+
+
+def list_checkpoints(status: Optional[str] = "running", path: Optional[str] = None) -> List[dict]:
+    """Saved crawls, newest first (by default only unfinished, resumable ones)"""
+    db = _connect(path or _default_path())
+    query = ("SELECT crawl_id, settings, status, "
+             "(SELECT COUNT(*) FROM pages WHERE pages.crawl_id = crawls.crawl_id), "
+             "updated_at FROM crawls")
+    params = ()
+    if status:
+        query += " WHERE status = ?"
+        params = (status,)
+    rows = db.execute(query + " ORDER BY updated_at DESC", params).fetchall()
+    db.close()
+    return [{"crawl_id": crawl_id, "settings": json.loads(settings), "status": status,
+             "pages": pages, "updated_at": updated_at}
+            for crawl_id, settings, status, pages, updated_at in rows]
@@ -0,0 +1,420 @@
+"""
+Distributed crawl coordination
+
+Splits one crawl across worker processes (and, with a networked backend,
+machines). The frontier and visited set live in a FrontierBackend instead of
+a single SmartWebScraper:
+
+- workers claim batches of URLs under a time-limited lease and renew it with
+  heartbeats while they work
+- leases that stop being renewed (crashed worker, dead Chrome) expire and the
+  URLs go back to the queue, up to MAX_ATTEMPTS tries
+- finished pages are written back and aggregated into ScrapedPage records
+
+SQLiteFrontierBackend coordinates processes sharing one disk. Anything that
+implements the FrontierBackend methods (e.g. on Redis or Postgres) can be
+plugged in for multi-machine crawls.
+"""
+
+import logging
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+import multiprocessing
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .politeness import get_scheduler
+from .urls import canonicalize_url
+from .web_scraper import SmartWebScraper, ScrapedPage, link_priority
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+
+
+class FrontierBackend(ABC):
+    """Shared frontier storage used by CrawlCoordinator"""
+
+    @abstractmethod
+    def create_crawl(self, crawl_id: str, settings: dict):
+        ...
+
+    @abstractmethod
+    def settings(self, crawl_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def add(self, crawl_id: str, urls: Iterable[Tuple[str, float, int]]) -> int:
+        """Queue (url, priority, depth) entries never seen before; returns how many"""
+
+    @abstractmethod
+    def claim(self, crawl_id: str, worker_id: str, count: int,
+              lease_seconds: float) -> List[Tuple[str, int]]:
+        """Lease up to `count` URLs (best first, within the page budget) as (url, depth)"""
+
+    @abstractmethod
+    def heartbeat(self, crawl_id: str, worker_id: str, urls: Iterable[str],
+                  lease_seconds: float) -> int:
+        """Extend the worker's leases; returns how many are still held"""
+
+    @abstractmethod
+    def complete(self, crawl_id: str, worker_id: str, url: str, page: Optional[dict]) -> bool:
+        """Finish a URL the worker still holds an unexpired lease on, storing its
+        page (None if it failed or was skipped); False if the lease was lost"""
+
+    @abstractmethod
+    def release(self, crawl_id: str, worker_id: str, urls: Iterable[str]):
+        """Give back leases without completing them (worker shutting down)"""
+
+    @abstractmethod
+    def status(self, crawl_id: str) -> dict:
+        """Counts of queued, leased, expired, done and failed URLs, and pages"""
+
+    @abstractmethod
+    def pages(self, crawl_id: str) -> Iterable[dict]:
+        ...
+
+
+class SQLiteFrontierBackend(FrontierBackend):
+    """FrontierBackend in a local SQLite file, shared by processes on one machine"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.getenv("HTTP_CACHE_DIR", ".cache"), "coordinator.sqlite3")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS crawls (
+                crawl_id TEXT PRIMARY KEY,
+                settings TEXT NOT NULL,
+                max_pages INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                crawl_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                priority REAL NOT NULL,
+                depth INTEGER NOT NULL,
+                state TEXT NOT NULL DEFAULT 'queued',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (crawl_id, url)
+            );
+            CREATE INDEX IF NOT EXISTS urls_queue ON urls (crawl_id, state, priority);
+            CREATE TABLE IF NOT EXISTS results (
+                crawl_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                page TEXT NOT NULL,
+                PRIMARY KEY (crawl_id, url)
+            );
+        """)
+
+    def _write(self, fn):
+        """Run fn(db) in one IMMEDIATE transaction (serialised across processes)"""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(self._db)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def create_crawl(self, crawl_id: str, settings: dict):
+        self._write(lambda db: db.execute(
+            "INSERT INTO crawls VALUES (?, ?, ?, ?)",
+            (crawl_id, json.dumps(settings), int(settings.get("max_pages", 0)), time.time())))
+
+    def settings(self, crawl_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT settings FROM crawls WHERE crawl_id = ?",
+                                   (crawl_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def add(self, crawl_id: str, urls: Iterable[Tuple[str, float, int]]) -> int:
+        rows = [(crawl_id, url, priority, depth) for url, priority, depth in urls]
+        if not rows:
+            return 0
+
+        def insert(db):
+            before = db.total_changes
+            db.executemany("INSERT OR IGNORE INTO urls (crawl_id, url, priority, depth) "
+                           "VALUES (?, ?, ?, ?)", rows)
+            return db.total_changes - before
+        return self._write(insert)
+
+    def claim(self, crawl_id: str, worker_id: str, count: int,
+              lease_seconds: float) -> List[Tuple[str, int]]:
+        def claim(db):
+            now = time.time()
+            # Expired leases first: they already count against the budget
+            expired = db.execute(
+                "SELECT url, depth, attempts FROM urls WHERE crawl_id = ? AND state = 'leased' "
+                "AND lease_until < ? ORDER BY priority DESC LIMIT ?",
+                (crawl_id, now, count)).fetchall()
+            retry = [(url, depth) for url, depth, attempts in expired if attempts < MAX_ATTEMPTS]
+            db.executemany("UPDATE urls SET state = 'failed' WHERE crawl_id = ? AND url = ?",
+                           [(crawl_id, url) for url, _, attempts in expired if attempts >= MAX_ATTEMPTS])
+
+            max_pages = db.execute("SELECT max_pages FROM crawls WHERE crawl_id = ?",
+                                   (crawl_id,)).fetchone()[0]
+            used = db.execute("SELECT COUNT(*) FROM urls WHERE crawl_id = ? AND state != 'queued'",
+                              (crawl_id,)).fetchone()[0]
+            budget = min(count - len(retry), max_pages - used)
+            fresh = db.execute(
+                "SELECT url, depth FROM urls WHERE crawl_id = ? AND state = 'queued' "
+                "ORDER BY priority DESC LIMIT ?", (crawl_id, max(0, budget))).fetchall()
+
+            claimed = retry + fresh
+            db.executemany(
+                "UPDATE urls SET state = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE crawl_id = ? AND url = ?",
+                [(worker_id, now + lease_seconds, crawl_id, url) for url, _ in claimed])
+            return claimed
+        return self._write(claim)
+
+    def heartbeat(self, crawl_id: str, worker_id: str, urls: Iterable[str],
+                  lease_seconds: float) -> int:
+        until = time.time() + lease_seconds
+
+        def renew(db):
+            before = db.total_changes
+            db.executemany("UPDATE urls SET lease_until = ? WHERE crawl_id = ? AND url = ? "
+                           "AND worker = ? AND state = 'leased'",
+                           [(until, crawl_id, url, worker_id) for url in urls])
+            return db.total_changes - before
+        return self._write(renew)
+
+    def complete(self, crawl_id: str, worker_id: str, url: str, page: Optional[dict]) -> bool:
+        def finish(db):
+            # A lease that expired may already be someone else's: drop this result
+            held = db.execute(
+                "UPDATE urls SET state = 'done', lease_until = NULL WHERE crawl_id = ? AND url = ? "
+                "AND worker = ? AND state = 'leased' AND lease_until > ?",
+                (crawl_id, url, worker_id, time.time())).rowcount
+            if held and page is not None:
+                db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                           (crawl_id, url, json.dumps(page, ensure_ascii=False)))
+            return bool(held)
+        return self._write(finish)
+
+    def release(self, crawl_id: str, worker_id: str, urls: Iterable[str]):
+        self._write(lambda db: db.executemany(
+            "UPDATE urls SET state = 'queued', worker = NULL, lease_until = NULL, "
+            "attempts = attempts - 1 WHERE crawl_id = ? AND url = ? AND worker = ? AND state = 'leased'",
+            [(crawl_id, url, worker_id) for url in urls]))
+
+    def status(self, crawl_id: str) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute(
+                "SELECT state, COUNT(*) FROM urls WHERE crawl_id = ? GROUP BY state",
+                (crawl_id,)).fetchall())
+            expired = self._db.execute(
+                "SELECT COUNT(*) FROM urls WHERE crawl_id = ? AND state = 'leased' AND lease_until < ?",
+                (crawl_id, time.time())).fetchone()[0]
+            pages = self._db.execute("SELECT COUNT(*) FROM results WHERE crawl_id = ?",
+                                     (crawl_id,)).fetchone()[0]
+            row = self._db.execute("SELECT max_pages FROM crawls WHERE crawl_id = ?",
+                                   (crawl_id,)).fetchone()
+        status = {state: counts.get(state, 0) for state in ("queued", "leased", "done", "failed")}
+        status.update(expired=expired, pages=pages, max_pages=row[0] if row else 0)
+        return status
+
+    def pages(self, crawl_id: str) -> Iterable[dict]:
+        with self._lock:
+            rows = self._db.execute("SELECT page FROM results WHERE crawl_id = ?",
+                                    (crawl_id,)).fetchall()
+        return [json.loads(page) for (page,) in rows]
+
+
+class CrawlCoordinator:
+    """One distributed crawl: seeding, link scheduling, status and results"""
+
+    def __init__(self, backend: FrontierBackend, crawl_id: str):
+        self.backend = backend
+        self.crawl_id = crawl_id
+        self._settings: Optional[dict] = None
+
+    @classmethod
+    def start(cls, start_url: str, max_pages: int = 100,
+              backend: Optional[FrontierBackend] = None, **settings) -> "CrawlCoordinator":
+        """Register a new crawl and queue the site's homepage"""
+        backend = backend or SQLiteFrontierBackend()
+        if "://" not in start_url:
+            start_url = f"https://{start_url}"
+        start_url = canonicalize_url(start_url)
+        scheme, rest = start_url.split("://", 1)
+        base_domain = rest.split("/", 1)[0]
+        crawl_id = f"{base_domain}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+        backend.create_crawl(crawl_id, {"start_url": start_url, "max_pages": max_pages,
+                                        "base_domain": base_domain, **settings})
+        coordinator = cls(backend, crawl_id)
+        coordinator.add_links([f"{scheme}://{base_domain}/"], depth=0)
+        return coordinator
+
+    @property
+    def settings(self) -> dict:
+        if self._settings is None:
+            self._settings = self.backend.settings(self.crawl_id) or {}
+        return self._settings
+
+    def add_links(self, links: Iterable, depth: int) -> int:
+        """Queue links (URLs or (url, anchor_text)) found at `depth`"""
+        entries = []
+        for link in links:
+            url, anchor_text = link if isinstance(link, (tuple, list)) else (link, "")
+            entries.append((url, link_priority(url, anchor_text, depth), depth))
+        return self.backend.add(self.crawl_id, entries)
+
+    def status(self) -> dict:
+        return self.backend.status(self.crawl_id)
+
+    def finished(self) -> bool:
+        """Nothing queued within the budget and nothing leased"""
+        status = self.status()
+        budget_left = status["max_pages"] - (status["leased"] + status["done"] + status["failed"])
+        return status["leased"] == 0 and (status["queued"] == 0 or budget_left <= 0)
+
+    def aggregate(self) -> Dict[str, ScrapedPage]:
+        """Every page scraped by any worker, as ScrapedPage records"""
+        from .page_store import new_page_store
+        pages = new_page_store()
+        for page in self.backend.pages(self.crawl_id):
+            pages[page["url"]] = ScrapedPage(**page)
+        return pages
+
+
+class CrawlWorker:
+    """Claims URLs from a coordinator and scrapes them with a pooled browser"""
+
+    def __init__(self, coordinator: CrawlCoordinator, worker_id: Optional[str] = None,
+                 batch_size: int = 1, lease_seconds: float = 120, poll_interval: float = 0.5):
+        self.coordinator = coordinator
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:4]}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.pages_scraped = 0
+        self._held: Dict[str, int] = {}
+        self._held_lock = threading.Lock()
+        self._stop = threading.Event()
+
+        self.scraper = SmartWebScraper()
+        self.scraper.base_domain = coordinator.settings.get("base_domain", "")
+        self.scraper.max_links_per_page = coordinator.settings.get("max_links_per_page")
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._held_lock:
+                urls = list(self._held)
+            if urls:
+                self.coordinator.backend.heartbeat(self.coordinator.crawl_id, self.worker_id,
+                                                   urls, self.lease_seconds)
+
+    def _scrape(self, url: str, depth: int, driver) -> Optional[ScrapedPage]:
+        with get_scheduler().slot(url):
+            html = self.scraper._load_page(url, driver=driver)
+        if not html:
+            logger.warning("Failed to load %s - skipping", url)
+            return None
+        page, links = self.scraper._build_page(url, html)
+        if page:
+            self.coordinator.add_links(links, depth + 1)
+        return page
+
+    def run(self, max_idle: Optional[float] = None) -> int:
+        """Work until the crawl is finished; returns the number of pages scraped"""
+        backend, crawl_id = self.coordinator.backend, self.coordinator.crawl_id
+        pool = self.scraper.browser_pool()
+        driver = pool.acquire()
+        # Started after acquire() so a failed browser start leaves no heartbeat behind
+        self._stop.clear()
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+        idle_since = None
+        try:
+            while True:
+                claimed = backend.claim(crawl_id, self.worker_id, self.batch_size, self.lease_seconds)
+                if not claimed:
+                    if self.coordinator.finished():
+                        break
+                    idle_since = idle_since or time.time()
+                    if max_idle is not None and time.time() - idle_since > max_idle:
+                        break
+                    time.sleep(self.poll_interval)  # others may still add links
+                    continue
+                idle_since = None
+
+                with self._held_lock:
+                    self._held.update(claimed)
+                for url, depth in claimed:
+                    logger.info("[%s] %s", self.worker_id, url)
+                    page = None
+                    try:
+                        page = self._scrape(url, depth, driver)
+                    except Exception as e:
+                        logger.warning("Worker error on %s: %s", url, e)
+                    if backend.complete(crawl_id, self.worker_id, url, page.__dict__ if page else None):
+                        self.pages_scraped += bool(page)
+                    else:
+                        logger.warning("[%s] Lease on %s expired - result dropped", self.worker_id, url)
+                    with self._held_lock:
+                        self._held.pop(url, None)
+        finally:
+            self._stop.set()
+            with self._held_lock:
+                unfinished, self._held = list(self._held), {}
+            if unfinished:
+                backend.release(crawl_id, self.worker_id, unfinished)
+            pool.release(driver, pages=max(1, self.pages_scraped))
+        return self.pages_scraped
+
+
+def _worker_main(db_path: str, crawl_id: str, options: dict):
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(),
+                        format="%(asctime)s %(levelname)s %(processName)s %(name)s: %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    backend = SQLiteFrontierBackend(db_path)
+    CrawlWorker(CrawlCoordinator(backend, crawl_id), **options).run()
+
+
+def run_local_workers(coordinator: CrawlCoordinator, processes: int = 2,
+                      **worker_options) -> Dict[str, ScrapedPage]:
+    """Run `processes` worker processes on this machine and aggregate the results
+
+    Each process has its own browser pool and politeness scheduler, so set
+    SCRAPE_DELAY_SECONDS / HOST_MAX_IN_FLIGHT per process accordingly.
+
+    Workers are started with spawn, which re-imports the calling script in
+    every worker: a script calling this must do so under
+    `if __name__ == "__main__":`, or each worker would start the crawl again.
+    """
+    backend = coordinator.backend
+    if not isinstance(backend, SQLiteFrontierBackend):
+        raise TypeError("run_local_workers needs a SQLiteFrontierBackend")
+    if multiprocessing.parent_process() is not None:
+        raise RuntimeError("run_local_workers() called from a worker process - call it "
+                           "under `if __name__ == \"__main__\":` in the script that starts the crawl")
+    # spawn: forked children would inherit the parent's browsers and threads
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_worker_main,
+                               args=(backend.path, coordinator.crawl_id, worker_options))
+               for _ in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    failed = [process.exitcode for process in workers if process.exitcode]
+    if failed:
+        logger.error("%d of %d worker processes failed (exit codes %s)", len(failed), processes, failed)
+    return coordinator.aggregate()
@@ -0,0 +1,275 @@
+"""
+Shared headless Chrome driver pool
+
+Starting Chrome costs 1-3 s, so drivers are kept warm and lent out to
+SmartWebScraper, FacebookScraper and TwitterScraper instead of being
+started and quit for every scrape.
+"""
+
+import logging
+import os
+import time
+import atexit
+import threading
+from typing import Dict, List, Optional
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from .readiness import install_readiness_hook
+from .render_profile import RenderProfile, get_render_profile, drain_network_log
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def build_chrome_options(profile: Optional[RenderProfile] = None) -> Options:
+    """Chrome options shared by every pooled driver"""
+    profile = profile or get_render_profile()
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument(f"user-agent={DEFAULT_USER_AGENT}")
+
+    prefs = profile.chrome_prefs()
+    if prefs:
+        options.add_experimental_option("prefs", prefs)
+    # Network events for per-page bytes / blocked request stats
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    # Proxy support (if configured)
+    proxy_server = os.getenv("PROXY_SERVER")
+    if proxy_server:
+        options.add_argument(f"--proxy-server={proxy_server}")
+        logger.info("Using proxy: %s", proxy_server)
+
+    # For Streamlit Cloud compatibility
+    chromium_path = "/usr/bin/chromium"
+    if os.path.exists(chromium_path):
+        options.binary_location = chromium_path
+
+    return options
+
+
+def new_chrome_driver(profile: Optional[RenderProfile] = None):
+    """Start a new headless Chrome with the configured render profile"""
+    profile = profile or get_render_profile()
+    driver = webdriver.Chrome(options=build_chrome_options(profile))
+    driver.set_page_load_timeout(float(os.getenv("PAGE_LOAD_TIMEOUT", "30")))
+    install_readiness_hook(driver)
+    profile.apply(driver)
+    return driver
+
+
+class _PooledDriver:
+    """Bookkeeping for one pooled browser"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.time()
+        self.last_used = time.time()
+        self.pages_served = 0
+        self.user_agent_overridden = False
+
+
+class DriverPool:
+    """Thread-safe pool of warm Chrome drivers
+
+    Drivers are health-checked when returned, recycled after
+    max_pages_per_driver pages and closed after idle_timeout seconds
+    unused (never below min_size).
+    """
+
+    def __init__(self, min_size: int = 0, max_size: int = 4,
+                 idle_timeout: float = 300, max_pages_per_driver: int = 100,
+                 acquire_timeout: float = 120):
+        self.min_size = max(0, min_size)
+        self.max_size = max(1, max_size, self.min_size)
+        self.idle_timeout = idle_timeout
+        self.max_pages_per_driver = max_pages_per_driver
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: List[_PooledDriver] = []
+        self._in_use: Dict[int, _PooledDriver] = {}
+        self._starting = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "discarded": 0, "reaped": 0}
+
+        for _ in range(self.min_size):
+            self._idle.append(self._start())
+
+        if self.idle_timeout:
+            reaper = threading.Thread(target=self._reap_loop, daemon=True)
+            reaper.start()
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._starting
+
+    def _start(self) -> _PooledDriver:
+        self.stats["created"] += 1
+        return _PooledDriver(new_chrome_driver())
+
+    def _quit(self, entry: _PooledDriver):
+        try:
+            entry.driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, user_agent: Optional[str] = None, timeout: Optional[float] = None):
+        """Borrow a driver, starting one if the pool has room"""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Driver pool is shut down")
+                if self._idle:
+                    entry = self._idle.pop()
+                    self.stats["reused"] += 1
+                    break
+                if self.size < self.max_size:
+                    self._starting += 1
+                    entry = None
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError(f"No browser free after {timeout:.0f}s (max {self.max_size})")
+                self._cond.wait(remaining)
+
+        if entry is None:
+            # Start Chrome outside the lock so other borrowers aren't blocked
+            try:
+                entry = self._start()
+            finally:
+                with self._cond:
+                    self._starting -= 1
+                    self._cond.notify()
+
+        if user_agent:
+            try:
+                entry.driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": user_agent})
+                entry.user_agent_overridden = True
+            except Exception:
+                pass
+
+        entry.last_used = time.time()
+        with self._cond:
+            self._in_use[id(entry.driver)] = entry
+        return entry.driver
+
+    def release(self, driver, pages: int = 1):
+        """Return a borrowed driver; unhealthy or worn-out drivers are quit"""
+        with self._cond:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            return
+
+        entry.pages_served += pages
+        entry.last_used = time.time()
+        keep = not self._closed and self._reset(entry)
+
+        if keep and entry.pages_served >= self.max_pages_per_driver:
+            self.stats["recycled"] += 1
+            keep = False
+
+        with self._cond:
+            if keep:
+                self._idle.append(entry)
+            self._cond.notify()
+
+        if not keep:
+            self._quit(entry)
+
+    def _reset(self, entry: _PooledDriver) -> bool:
+        """Health check and clear state between borrowers"""
+        try:
+            driver = entry.driver
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            if entry.user_agent_overridden:
+                driver.execute_cdp_cmd("Network.setUserAgentOverride", {"userAgent": DEFAULT_USER_AGENT})
+                entry.user_agent_overridden = False
+            driver.get("about:blank")
+            drain_network_log(driver)
+            return True
+        except Exception as e:
+            logger.warning("Discarding unhealthy browser: %s", e)
+            self.stats["discarded"] += 1
+            return False
+
+    @contextmanager
+    def driver(self, user_agent: Optional[str] = None):
+        """Borrow a driver for the duration of a with-block"""
+        driver = self.acquire(user_agent=user_agent)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def reap_idle(self):
+        """Quit drivers idle longer than idle_timeout, keeping min_size"""
+        now = time.time()
+        expired = []
+        with self._cond:
+            keep = []
+            for entry in self._idle:
+                surplus = len(self._idle) - len(expired) > self.min_size
+                if surplus and now - entry.last_used > self.idle_timeout:
+                    expired.append(entry)
+                else:
+                    keep.append(entry)
+            self._idle = keep
+        for entry in expired:
+            self.stats["reaped"] += 1
+            self._quit(entry)
+
+    def _reap_loop(self):
+        interval = max(5.0, self.idle_timeout / 2)
+        while not self._closed:
+            time.sleep(interval)
+            self.reap_idle()
+
+    def shutdown(self):
+        """Quit every idle driver and refuse new borrows"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._quit(entry)
+
+
+_pool: Optional[DriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool() -> DriverPool:
+    """Process-wide driver pool, configured from the environment"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(
+                min_size=int(os.getenv("DRIVER_POOL_MIN", "0")),
+                max_size=int(os.getenv("DRIVER_POOL_MAX", "4")),
+                idle_timeout=float(os.getenv("DRIVER_IDLE_TIMEOUT", "300")),
+                max_pages_per_driver=int(os.getenv("DRIVER_MAX_PAGES", "100")),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def get_browser_pool(backend: Optional[str] = None):
+    """Pool for BROWSER_BACKEND: Selenium drivers ("selenium") or DevTools tabs ("cdp")"""
+    backend = (backend or os.getenv("BROWSER_BACKEND", "selenium")).lower()
+    if backend == "cdp":
+        from .cdp_backend import get_cdp_pool
+        return get_cdp_pool()
+    return get_driver_pool()
@@ -0,0 +1,124 @@
+"""
+Process-pool extraction stage
+
+BeautifulSoup parsing is CPU-bound and holds the GIL, so done in-process it
+runs one page at a time alongside fetching. ExtractionPool sends raw HTML
+to worker processes and returns (title, content, links, canonical), so
+parsing uses every core and overlaps with the crawl's I/O. At most
+`max_pending` pages are queued for extraction; submitters block beyond
+that, so a fast fetcher can't pile up HTML in memory.
+"""
+
+import logging
+import os
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from .extraction import parse_html
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_job(html: str, url: str, base_domain: str) -> tuple:
+    """Runs in a worker process: parse_html plus its stage timings"""
+    spans = {}
+    return parse_html(html, url, base_domain, spans=spans), spans
+
+
+class ExtractionPool:
+    """Worker processes running parse_html, with bounded backlog"""
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None):
+        self.workers = max(1, workers or (os.cpu_count() or 2) - 1)
+        self.max_pending = max(1, max_pending or self.workers * 2)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+        self.submitted = 0
+        self.fallbacks = 0
+        self.blocked_seconds = 0.0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn: the crawl process runs browser and reader threads, so no fork
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, html: str, url: str, base_domain: str) -> Future:
+        """Queue a page for extraction, waiting while max_pending pages are queued
+
+        The future's result is ((title, content, links, canonical), spans).
+        """
+        started = time.perf_counter()
+        self._slots.acquire()
+        with self._lock:
+            self.blocked_seconds += time.perf_counter() - started
+            self.submitted += 1
+            executor = self._executor
+        try:
+            future = executor.submit(_parse_job, html, url, base_domain)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def parse(self, html: str, url: str, base_domain: str, spans: Optional[dict] = None) -> tuple:
+        """parse_html in a worker process (in this one if the pool broke)"""
+        try:
+            result, job_spans = self.submit(html, url, base_domain).result()
+        except (BrokenProcessPool, OSError) as e:
+            # OSError: a worker process couldn't be started
+            logger.warning("Extraction worker died (%s) - restarting pool", e)
+            self._restart()
+            with self._lock:
+                self.fallbacks += 1
+            return parse_html(html, url, base_domain, spans=spans)
+        if spans is not None:
+            for stage, seconds in job_spans.items():
+                spans[stage] = spans.get(stage, 0.0) + seconds
+        return result
+
+    def _restart(self):
+        with self._lock:
+            broken, self._executor = self._executor, self._new_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "max_pending": self.max_pending,
+                    "submitted": self.submitted, "fallbacks": self.fallbacks,
+                    "blocked_seconds": round(self.blocked_seconds, 3)}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool: Optional[ExtractionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> Optional[ExtractionPool]:
+    """Process-wide extraction pool, or None if EXTRACTION_WORKERS=0 (or on one core)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = int(os.getenv("EXTRACTION_WORKERS", "-1"))
+            if workers < 0:
+                workers = (os.cpu_count() or 1) - 1  # leave a core for the crawl itself
+            if workers == 0:
+                return None
+            try:
+                _pool = ExtractionPool(
+                    workers=workers,
+                    max_pending=int(os.getenv("EXTRACTION_MAX_PENDING", "0")) or None,
+                )
+            except (OSError, ImportError, NotImplementedError) as e:
+                # e.g. no working multiprocessing semaphores on this system
+                logger.warning("Extraction pool unavailable (%s) - parsing in-process", e)
+                return None
+            atexit.register(_pool.shutdown)
+        return _pool
@@ -0,0 +1,223 @@
+"""
+Single-parse HTML extraction
+
+Parses each page once and pulls title, readable text and links out of the
+same tree. Uses lxml (C-backed) when available, BeautifulSoup otherwise.
+"""
+
+import time
+from urllib.parse import urlsplit
+from typing import Dict, Optional, Tuple
+
+try:
+    import lxml.html
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+from bs4 import BeautifulSoup
+
+from .urls import canonicalize_url
+
+# Elements that never hold page content
+SKIP_TAGS = ['script', 'style', 'nav', 'header', 'footer',
+             'noscript', 'iframe', 'svg', 'form']
+
+SKIP_SCHEMES = ('#', 'javascript:', 'mailto:', 'tel:')
+SKIP_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg',
+                   '.css', '.js', '.zip', '.mp4', '.mp3')
+
+
+class _Spans:
+    """Accumulates stage durations into a dict (no-op without one)"""
+
+    def __init__(self, spans: Optional[Dict[str, float]]):
+        self.spans = spans
+        self.last = time.perf_counter() if spans is not None else 0.0
+
+    def mark(self, stage: str):
+        if self.spans is not None:
+            now = time.perf_counter()
+            self.spans[stage] = self.spans.get(stage, 0.0) + now - self.last
+            self.last = now
+
+
+_NO_SPANS = _Spans(None)
+
+
+def _clean_text(text: str) -> str:
+    """Keep lines long enough to carry content"""
+    lines = []
+    for line in text.split('\n'):
+        line = line.strip()
+        if len(line) > 5:
+            lines.append(line)
+    return '\n'.join(lines)
+
+
+def _add_link(anchors: Dict[str, str], href: str, anchor_text: str,
+              current_url: str, base_domain: str):
+    href = href.strip()
+    if not href or href.startswith(SKIP_SCHEMES):
+        return
+
+    # Make absolute and canonical
+    try:
+        clean = canonicalize_url(href, base=current_url)
+    except ValueError:
+        return  # unparseable, e.g. a broken IPv6 literal
+    parsed = urlsplit(clean)
+    if parsed.scheme not in ('http', 'https'):
+        return
+
+    # Same domain only
+    if parsed.netloc != base_domain:
+        return
+
+    # Skip files
+    if parsed.path.lower().endswith(SKIP_EXTENSIONS):
+        return
+
+    if clean not in anchors:
+        anchors[clean] = anchor_text[:100]
+
+
+def _canonical_link(href: Optional[str], current_url: str, base_domain: str) -> Optional[str]:
+    """The page's rel=canonical URL, if it points at the same site"""
+    if not href or not href.strip():
+        return None
+    try:
+        canonical = canonicalize_url(href, base=current_url)
+    except ValueError:
+        return None
+    return canonical if urlsplit(canonical).netloc == base_domain else None
+
+
+def _parse_lxml(html: str, url: str, base_domain: str,
+                spans: _Spans = _NO_SPANS) -> Tuple[str, str, Dict[str, str], Optional[str]]:
+    try:
+        doc = lxml.html.document_fromstring(html)
+    except ValueError:
+        # Unicode strings with an XML encoding declaration must be bytes
+        doc = lxml.html.document_fromstring(html.encode("utf-8"))
+
+    title = doc.findtext('.//title')
+    title = title.strip() if title is not None else "Untitled"
+
+    canonical = None
+    for link in doc.iter('link'):
+        if 'canonical' in (link.get('rel') or '').lower().split():
+            canonical = _canonical_link(link.get('href'), url, base_domain)
+            break
+    spans.mark("parse")
+
+    # Links first: nav/header/footer links are dropped from the text below
+    anchors: Dict[str, str] = {}
+    for a in doc.iter('a'):
+        href = a.get('href')
+        if href is not None:
+            text = " ".join(a.text_content().split())
+            _add_link(anchors, href, text, url, base_domain)
+    spans.mark("links")
+
+    # drop_tree keeps the element's tail text, like BeautifulSoup's decompose
+    unwanted = list(doc.iter(*SKIP_TAGS, etree.Comment, etree.ProcessingInstruction))
+    for el in unwanted:
+        if el.getparent() is not None:
+            el.drop_tree()
+
+    body = doc.find('body')
+    root = body if body is not None else doc
+    text = '\n'.join(s.strip() for s in root.itertext() if s.strip())
+    text = _clean_text(text)
+    spans.mark("extract")
+
+    return title, text, anchors, canonical
+
+
+def _parse_bs4(html: str, url: str, base_domain: str,
+               spans: _Spans = _NO_SPANS) -> Tuple[str, str, Dict[str, str], Optional[str]]:
+    soup = BeautifulSoup(html, "html.parser")
+
+    title_tag = soup.find("title")
+    title = title_tag.get_text().strip() if title_tag else "Untitled"
+
+    canonical = None
+    for link in soup.find_all('link', rel=True):
+        if 'canonical' in (r.lower() for r in link['rel']):
+            canonical = _canonical_link(link.get('href'), url, base_domain)
+            break
+    spans.mark("parse")
+
+    anchors: Dict[str, str] = {}
+    for a in soup.find_all('a', href=True):
+        _add_link(anchors, a['href'], a.get_text(" ", strip=True), url, base_domain)
+    spans.mark("links")
+
+    for tag in soup.find_all(SKIP_TAGS):
+        tag.decompose()
+
+    body = soup.find('body')
+    root = body if body else soup
+    text = _clean_text(root.get_text(separator='\n', strip=True))
+    spans.mark("extract")
+
+    return title, text, anchors, canonical
+
+
+def parse_html(html: str, url: str, base_domain: str,
+               spans: Optional[Dict[str, float]] = None) -> Tuple[str, str, Dict[str, str], Optional[str]]:
+    """Parse a page once and return (title, content, {link_url: anchor_text}, canonical)
+
+    content is prefixed with the page title and URL, as the AI context expects.
+    Links are same-site canonical URLs in document order; canonical is the
+    page's same-site rel=canonical URL, or None. If `spans` is a dict, the
+    seconds spent parsing, collecting links and extracting text are added
+    to its "parse", "links" and "extract" keys.
+    """
+    timer = _Spans(spans)
+    result = None
+    if HAS_LXML:
+        try:
+            result = _parse_lxml(html, url, base_domain, timer)
+        except (etree.ParserError, etree.XMLSyntaxError):
+            pass
+    if result is None:
+        result = _parse_bs4(html, url, base_domain, timer)
+
+    title, content, anchors, canonical = result
+    title, content = _finish(title, content, url)
+    return title, content, anchors, canonical
+
+
+def _finish(title: str, content: str, url: str) -> Tuple[str, str]:
+    title = title[:100]  # Limit length
+    return title, f"=== {title} ===\nURL: {url}\n\n{content}"
+
+
+def body_word_count(content: str) -> int:
+    """Words in page content, not counting the title/URL header _finish adds"""
+    _, header_end, rest = content.partition("\nURL: ")
+    if header_end:
+        content = rest.partition("\n\n")[2]
+    return len(content.split())
+
+
+def parse_rendered(page, url: str, base_domain: str,
+                   spans: Optional[Dict[str, float]] = None) -> Tuple[str, str, Dict[str, str], Optional[str]]:
+    """parse_html for a browser_extract.RenderedPage (text and links already collected)
+
+    Links and text go through the same filtering as parse_html, so both
+    paths produce the same page for the same DOM.
+    """
+    timer = _Spans(spans)
+    anchors: Dict[str, str] = {}
+    for href, text in page.links:
+        _add_link(anchors, href, text, url, base_domain)
+    canonical = _canonical_link(page.canonical, url, base_domain)
+    timer.mark("links")
+    content = _clean_text(page.text)
+    timer.mark("extract")
+    title, content = _finish(page.title.strip() if page.title is not None else "Untitled", content, url)
+    return title, content, anchors, canonical
@@ -0,0 +1,182 @@
+"""
+Adaptive fetch strategy
+
+Decides per page whether plain HTTP was enough or the page needs a real
+browser, and remembers the answer per domain in a local SQLite file. Sites
+that render server-side are then crawled over HTTP only; sites that turn
+out to be client-side apps go straight to Selenium on later pages and
+later crawls, skipping the wasted HTTP fetch.
+"""
+
+import os
+import re
+import time
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import List, Optional
+
+# Empty mount points of client-side rendered apps
+SPA_ROOT = re.compile(
+    r'<div[^>]+id=["\'](root|app|__next|__nuxt|___gatsby|svelte|ember-app)["\'][^>]*>\s*</div>'
+    r'|<app-root[^>]*>\s*</app-root>',
+    re.IGNORECASE,
+)
+
+# "Please enable JavaScript" notices, usually inside <noscript>
+NOSCRIPT_NOTICE = re.compile(
+    r'<noscript[^>]*>[^<]{0,300}?(enable javascript|javascript is (required|disabled)'
+    r'|requires javascript|turn on javascript|javascript enabled)'
+    r'|enable javascript to (run|view|use)|javascript is required',
+    re.IGNORECASE,
+)
+
+# Framework bundles and hydration payloads
+FRAMEWORK_BUNDLE = re.compile(
+    r'/_next/static/|/_nuxt/|window\.__NUXT__|__NEXT_DATA__|ng-version='
+    r'|/static/js/main\.[0-9a-f]+\.js|data-reactroot|/assets/index-[\w-]+\.js'
+    r'|webpack-runtime|/build/bundle\.js|/app\.[0-9a-f]+\.js',
+    re.IGNORECASE,
+)
+
+
+def js_signals(html: str, word_count: int, min_words: int = 50) -> List[str]:
+    """Reasons to think a page needs JavaScript to show its content (empty if none)
+
+    word_count is the page's body text, without the title/URL header. Thin
+    text alone is enough. Markers of a client-side app only count when
+    the text is also short, since server-rendered pages of those frameworks
+    carry the same bundles alongside their full content.
+    """
+    if word_count >= min_words * 4:
+        return []
+    markers = []
+    if SPA_ROOT.search(html):
+        markers.append("spa-root")
+    if NOSCRIPT_NOTICE.search(html):
+        markers.append("noscript")
+    if markers and FRAMEWORK_BUNDLE.search(html):
+        markers.append("framework-bundle")
+    return (["thin-text"] if word_count < min_words else []) + markers
+
+
+def needs_javascript(html: str, word_count: int, min_words: int = 50) -> bool:
+    """Guess whether a page only renders its content with JavaScript"""
+    return bool(js_signals(html, word_count, min_words))
+
+
+def says_about_domain(signals: List[str]) -> bool:
+    """Should a page with these js_signals count towards its domain's verdict?
+
+    A thin page with no client-side app markers may just be a short static
+    page, so it is rendered to be safe but tells nothing about the site.
+    """
+    return signals != ["thin-text"]
+
+
+@dataclass
+class DomainVerdict:
+    domain: str
+    http_pages: int
+    js_pages: int
+    updated_at: float
+
+    @property
+    def needs_browser(self) -> bool:
+        return self.js_pages > self.http_pages
+
+
+class FetchVerdicts:
+    """Persistent per-domain record of whether pages needed the browser
+
+    record() is called for every page whose HTML was checked. A domain is
+    treated as browser-only once most of its checked pages needed
+    JavaScript. Verdicts older than `ttl` seconds are forgotten, and every
+    `probe_every`-th page of a browser-only domain is still tried over HTTP
+    first, so a site that moves to server rendering is noticed.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = 7 * 86400,
+                 probe_every: int = 10):
+        self.path = path or os.path.join(os.getenv("HTTP_CACHE_DIR", ".cache"), "fetch_verdicts.sqlite3")
+        self.ttl = ttl
+        self.probe_every = max(1, probe_every)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS domains (
+                domain TEXT PRIMARY KEY,
+                http_pages INTEGER NOT NULL,
+                js_pages INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._skipped = {}
+        self.http_pages = 0
+        self.browser_pages = 0
+
+    def get(self, domain: str) -> Optional[DomainVerdict]:
+        with self._lock:
+            row = self._db.execute("SELECT domain, http_pages, js_pages, updated_at FROM domains "
+                                   "WHERE domain = ?", (domain,)).fetchone()
+        if not row:
+            return None
+        verdict = DomainVerdict(*row)
+        if time.time() - verdict.updated_at > self.ttl:
+            self.forget(domain)
+            return None
+        return verdict
+
+    def use_browser(self, domain: str) -> bool:
+        """Skip the HTTP attempt and render straight away?"""
+        verdict = self.get(domain)
+        if not verdict or not verdict.needs_browser:
+            return False
+        with self._lock:
+            skipped = self._skipped.get(domain, 0) + 1
+            self._skipped[domain] = skipped % self.probe_every
+        return skipped % self.probe_every != 0
+
+    def record(self, domain: str, needed_js: bool):
+        """Count a checked page of `domain` as needing the browser or not"""
+        with self._lock:
+            if needed_js:
+                self.browser_pages += 1
+            else:
+                self.http_pages += 1
+            self._db.execute(
+                "INSERT INTO domains VALUES (?, ?, ?, ?) ON CONFLICT(domain) DO UPDATE SET "
+                "http_pages = http_pages + excluded.http_pages, "
+                "js_pages = js_pages + excluded.js_pages, updated_at = excluded.updated_at",
+                (domain, int(not needed_js), int(needed_js), time.time()))
+            self._db.commit()
+
+    def forget(self, domain: str):
+        with self._lock:
+            self._db.execute("DELETE FROM domains WHERE domain = ?", (domain,))
+            self._db.commit()
+            self._skipped.pop(domain, None)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM domains")
+            self._db.commit()
+            self._skipped.clear()
+
+
+_verdicts: Optional[FetchVerdicts] = None
+_verdicts_lock = threading.Lock()
+
+
+def get_fetch_verdicts() -> FetchVerdicts:
+    """Process-wide verdict store, configured from the environment"""
+    global _verdicts
+    with _verdicts_lock:
+        if _verdicts is None:
+            _verdicts = FetchVerdicts(
+                ttl=float(os.getenv("FETCH_VERDICT_TTL_DAYS", "7")) * 86400,
+                probe_every=int(os.getenv("FETCH_PROBE_EVERY", "10")),
+            )
+        return _verdicts
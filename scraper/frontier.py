@@ -0,0 +1,148 @@
+"""
+Crawl frontier shared by the crawl engines
+"""
+
+import heapq
+import itertools
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .urls import SeenURLs
+
+
+class CrawlFrontier:
+    """Thread-safe, deduplicated best-first URL queue with a page budget
+
+    URLs are popped highest priority first (O(log n) push/pop), as scored by
+    score_fn(url, anchor_text, depth); without a score_fn the order is FIFO.
+    Each URL is handed out at most once, and rediscovering a queued URL
+    through a better link raises its priority. The visited set switches to a
+    Bloom filter on very large crawls (see SeenURLs).
+
+    next() blocks while other workers still have pages in flight, since they
+    may discover more links, and returns None once the crawl is over.
+    """
+
+    def __init__(self, max_pages: int,
+                 score_fn: Optional[Callable[[str, str, int], float]] = None):
+        self.max_pages = max_pages
+        self.score_fn = score_fn
+        self.visited = SeenURLs()
+        self.depths: Dict[str, int] = {}
+        self.page_count = 0
+        self._heap = []
+        self._priority: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._claimed: Dict[str, float] = {}
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._priority)
+
+    def add(self, url: str, anchor_text: str = "", depth: int = 0,
+            boost: float = 0.0) -> bool:
+        """Queue a URL, or raise its priority if it is already queued"""
+        priority = self.score_fn(url, anchor_text, depth) if self.score_fn else 0.0
+        priority += boost
+        with self._cond:
+            if url in self.visited:
+                return False
+            queued = self._priority.get(url)
+            if queued is not None and queued >= priority:
+                return False
+            # Older heap entries for the URL are skipped when popped
+            self._priority[url] = priority
+            self.depths[url] = min(depth, self.depths.get(url, depth))
+            heapq.heappush(self._heap, (-priority, next(self._seq), url))
+            self._cond.notify()
+            return queued is None
+
+    def add_many(self, links: Iterable, parent: Optional[str] = None) -> int:
+        """Queue links found on `parent`; items are URLs or (url, anchor_text)"""
+        depth = self.depths.get(parent, 0) + 1 if parent else 0
+        added = 0
+        for link in links:
+            url, anchor_text = link if isinstance(link, tuple) else (link, "")
+            added += self.add(url, anchor_text, depth)
+        return added
+
+    def mark_seen(self, url: str):
+        """Never hand out `url` (e.g. it is the rel=canonical of a fetched page)"""
+        with self._cond:
+            self.visited.add(url)
+            self._priority.pop(url, None)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.page_count >= self.max_pages
+
+    def pop(self) -> Optional[str]:
+        """Claim the best URL without waiting; None if nothing is ready"""
+        with self._cond:
+            return self._claim()
+
+    def next(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Claim the best URL, waiting for in-flight pages to add links"""
+        with self._cond:
+            while True:
+                if self.exhausted:
+                    return None
+                if self._priority:
+                    return self._claim()
+                if self._in_flight == 0:
+                    return None
+                if not self._cond.wait(timeout):
+                    return None
+
+    def _claim(self) -> Optional[str]:
+        if self.exhausted:
+            return None
+        while self._heap:
+            neg_priority, _, url = heapq.heappop(self._heap)
+            if self._priority.get(url) != -neg_priority:
+                continue  # stale entry
+            del self._priority[url]
+            self._claimed[url] = -neg_priority
+            self.visited.add(url)
+            self.page_count += 1
+            self._in_flight += 1
+            return url
+        return None
+
+    def done(self, url: str):
+        """Mark a claimed URL as finished (successfully or not)"""
+        with self._cond:
+            self._in_flight -= 1
+            self._claimed.pop(url, None)
+            self._cond.notify_all()
+
+    def stop(self):
+        """Hand out no more URLs (pages already claimed still finish)"""
+        with self._cond:
+            self.max_pages = self.page_count
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict:
+        """Consistent copy of the queue, visited set and in-flight URLs"""
+        with self._cond:
+            return {
+                "queued": [(url, p, self.depths.get(url, 0)) for url, p in self._priority.items()],
+                "in_flight": [(url, p, self.depths.get(url, 0)) for url, p in self._claimed.items()],
+                "visited": list(self.visited),
+                "page_count": self.page_count,
+            }
+
+    def restore(self, queued: List[Tuple[str, float, int]], visited: Iterable[str],
+                page_count: int):
+        """Reload a snapshot (in-flight URLs should be passed back as queued)"""
+        with self._cond:
+            self.visited.update(visited)
+            self.page_count = page_count
+            for url, priority, depth in queued:
+                if url in self.visited:
+                    continue
+                self._priority[url] = priority
+                self.depths[url] = depth
+                heapq.heappush(self._heap, (-priority, next(self._seq), url))
+            self._cond.notify_all()
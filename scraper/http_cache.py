@@ -0,0 +1,311 @@
+"""
+Persistent HTTP response cache
+
+Stores HTML page bodies with their ETag/Last-Modified validators in a
+local SQLite file keyed by canonical URL. Cache-Control is honored: no-store
+and private responses are not stored, and max-age (or Expires) sets how long
+an entry is served without a request. Entries without explicit freshness
+are revalidated with If-None-Match/If-Modified-Since, so an unchanged page
+costs a 304 instead of a full download (or a Scrape.do credit); the TTL only
+applies to entries with neither (rendered and proxied pages). Least
+recently used entries are evicted once the cache passes its size limit.
+"""
+
+import os
+import time
+import zlib
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+
+import httpx
+
+from .http_client import http_get
+from .urls import canonicalize_url
+
+
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+
+
+def cache_control(headers: Mapping[str, str]) -> Dict[str, Optional[str]]:
+    """Cache-Control directives, lowercased ({"max-age": "60", "no-cache": None})"""
+    directives = {}
+    for part in (headers.get("cache-control") or "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+def storable(headers: Mapping[str, str], status: int = 200) -> bool:
+    """Whether a response may be cached: a 200 HTML page without no-store/private"""
+    content_type = (headers.get("content-type") or "").split(";")[0].strip().lower()
+    directives = cache_control(headers)
+    return (status == 200 and content_type in HTML_TYPES
+            and "no-store" not in directives and "private" not in directives)
+
+
+def freshness_lifetime(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds a response stays fresh per Cache-Control/Expires, None if unstated"""
+    directives = cache_control(headers)
+    if "no-cache" in directives:
+        return 0.0
+    if "max-age" in directives:
+        try:
+            return max(0.0, float(directives["max-age"]))
+        except (TypeError, ValueError):
+            return 0.0
+    expires = headers.get("expires")
+    if expires:
+        try:
+            date = headers.get("date")
+            now = parsedate_to_datetime(date).timestamp() if date else time.time()
+            return max(0.0, parsedate_to_datetime(expires).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0.0  # invalid Expires means already expired
+    return None
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+    status: int = 200
+    max_age: Optional[float] = None
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class CachedResponse:
+    """The parts of a response callers use (mirrors requests.Response)"""
+    url: str
+    status_code: int
+    text: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    from_cache: bool = False
+
+
+class HttpCache:
+    """SQLite-backed response cache with TTL and size-based LRU eviction
+
+    Entries are namespaced by `kind` ("http" for raw responses, "rendered"
+    for browser HTML, "proxy" for Scrape.do responses) since the same URL
+    yields different HTML through each.
+    """
+
+    def __init__(self, path: str = ".cache/http_cache.sqlite3", ttl: float = 86400,
+                 max_bytes: int = 200 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                status INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL,
+                max_age REAL
+            )
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(responses)")}
+        if "max_age" not in columns:  # cache files from before Cache-Control support
+            self._db.execute("ALTER TABLE responses ADD COLUMN max_age REAL")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)")
+        self._db.commit()
+
+    @staticmethod
+    def _key(url: str, kind: str) -> str:
+        return f"{kind}:{canonicalize_url(url)}"
+
+    def get(self, url: str, kind: str = "http") -> Optional[CacheEntry]:
+        key = self._key(url, kind)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, body, etag, last_modified, fetched_at, status, max_age "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if not row:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        url, body, etag, last_modified, fetched_at, status, max_age = row
+        return CacheEntry(url, zlib.decompress(body).decode("utf-8"), etag, last_modified,
+                          fetched_at, status, max_age)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Servable without a request: within max-age, or the TTL if the
+        origin gave neither freshness nor validators"""
+        if entry.max_age is not None:
+            return entry.age() < entry.max_age
+        if entry.etag or entry.last_modified:
+            return False
+        return entry.age() < self.ttl
+
+    def put(self, url: str, body: str, headers: Optional[Dict[str, str]] = None,
+            kind: str = "http", status: int = 200):
+        """Store a body with the validators and freshness from its headers
+
+        Callers check storable() for raw HTTP responses first.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        data = zlib.compress(body.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, etag, last_modified, status, "
+                "fetched_at, accessed_at, size, max_age) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self._key(url, kind), url, data, headers.get("etag"),
+                 headers.get("last-modified"), status, now, now, len(data),
+                 freshness_lifetime(headers)),
+            )
+            self._db.commit()
+            self._evict()
+
+    def touch(self, url: str, kind: str = "http", headers: Optional[Mapping[str, str]] = None):
+        """Mark an entry as just revalidated (after a 304, whose headers may
+        update its freshness)"""
+        now = time.time()
+        max_age = freshness_lifetime({k.lower(): v for k, v in headers.items()}) if headers else None
+        with self._lock:
+            self._db.execute("UPDATE responses SET fetched_at = ?, accessed_at = ?, "
+                             "max_age = COALESCE(?, max_age) WHERE key = ?",
+                             (now, now, max_age, self._key(url, kind)))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until 90% of the limit
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        keys = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            keys.append((key,))
+            freed += size
+            if freed >= target:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", keys)
+        self._db.commit()
+
+    def revalidate(self, entry: CacheEntry, kind: str = "http",
+                   headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> bool:
+        """Ask the origin whether a stale entry is still current (304)"""
+        conditional = entry.conditional_headers()
+        if not conditional:
+            return False
+        try:
+            response = http_get(entry.url, timeout=timeout,
+                                headers={**(headers or {}), **conditional})
+        except httpx.HTTPError:
+            return False
+        if response.status_code != 304:
+            return False
+        self.revalidated += 1
+        self.touch(entry.url, kind, response.headers)
+        return True
+
+    def lookup(self, url: str, kind: str = "http",
+               headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Cached body if fresh or successfully revalidated, else None"""
+        entry = self.get(url, kind)
+        if entry and self.is_fresh(entry):
+            self.hits += 1
+            return entry.body
+        if entry and self.revalidate(entry, kind, headers):
+            return entry.body
+        self.misses += 1
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"entries": entries, "bytes": size, "hits": self.hits,
+                "revalidated": self.revalidated, "misses": self.misses}
+
+
+_cache: Optional[HttpCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Process-wide cache configured from the environment (None if disabled)"""
+    global _cache
+    if os.getenv("HTTP_CACHE", "true").lower() == "false":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            cache_dir = os.getenv("HTTP_CACHE_DIR", ".cache")
+            _cache = HttpCache(
+                path=os.path.join(cache_dir, "http_cache.sqlite3"),
+                ttl=float(os.getenv("HTTP_CACHE_TTL", "86400")),
+                max_bytes=int(float(os.getenv("HTTP_CACHE_MAX_MB", "200")) * 1024 * 1024),
+            )
+        return _cache
+
+
+def cached_get(url: str, headers: Optional[Dict[str, str]] = None,
+               timeout: float = 10) -> CachedResponse:
+    """GET through the cache: fresh hit, 304 revalidation, or full fetch
+
+    Only HTML responses that Cache-Control allows (storable()) are stored.
+    """
+    cache = get_http_cache()
+    entry = cache.get(url) if cache else None
+
+    if entry and cache.is_fresh(entry):
+        cache.hits += 1
+        return CachedResponse(url, entry.status, entry.body, from_cache=True)
+
+    request_headers = dict(headers or {})
+    if entry:
+        request_headers.update(entry.conditional_headers())
+
+    response = http_get(url, timeout=timeout, headers=request_headers)
+
+    if entry and response.status_code == 304:
+        cache.revalidated += 1
+        cache.touch(url, headers=response.headers)
+        return CachedResponse(url, entry.status, entry.body, dict(response.headers), from_cache=True)
+
+    if cache:
+        cache.misses += 1
+        if storable(response.headers, response.status_code):
+            cache.put(url, response.text, dict(response.headers))
+
+    return CachedResponse(url, response.status_code, response.text, dict(response.headers))
@@ -0,0 +1,243 @@
+"""
+Shared HTTP client for every non-browser fetch
+
+One pooled httpx client per process instead of a new TCP/TLS connection per
+requests.get: keep-alive connections per host, gzip/deflate (and brotli when
+installed) negotiation, HTTP/2 when the h2 package is installed, tuned
+timeouts and a small DNS cache. Robots.txt, sitemaps, the HTTP cache,
+QuickScraper, Quick Scan and the Scrape.do proxy all fetch through it.
+"""
+
+import os
+import time
+import socket
+import atexit
+import ipaddress
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import anyio
+import httpx
+import httpcore
+
+try:
+    import h2  # noqa: F401
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+def http_timeout(read: Optional[float] = None) -> httpx.Timeout:
+    """Connect fast, allow slow pages (HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT)"""
+    connect = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+    read = read if read is not None else float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+    return httpx.Timeout(read, connect=connect, pool=connect)
+
+
+def http_limits(max_connections: Optional[int] = None) -> httpx.Limits:
+    max_connections = max_connections or int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30")),
+    )
+
+
+def http2_enabled() -> bool:
+    """HTTP2=true and the h2 package is installed"""
+    return HAS_HTTP2 and os.getenv("HTTP2", "true").lower() != "false"
+
+
+class DNSCache:
+    """Bounded TTL cache of resolved addresses for the shared HTTP clients
+
+    httpx resolves hosts for every new connection; caching answers saves a
+    lookup per connection on crawls that open many. Entries expire after
+    `ttl` seconds and the least recently used are evicted past
+    `max_entries`. Failed lookups are not cached. Only connections made
+    through the clients below use it - socket.getaddrinfo is left alone.
+    """
+
+    def __init__(self, ttl: float = 300, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def cached(self, host: str, port: int) -> Optional[List[str]]:
+        """Addresses for (host, port) if cached and fresh"""
+        key = (host, port)
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is None:
+                return None
+            if hit[0] <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return hit[1]
+
+    def lookup(self, host: str, port: int) -> List[str]:
+        """Addresses for (host, port), resolving on a miss"""
+        addresses = self.cached(host, port)
+        if addresses is not None:
+            return addresses
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._cache[(host, port)] = (time.monotonic() + self.ttl, addresses)
+            self._cache.move_to_end((host, port))
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return addresses
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._cache.pop((host, port), None)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
+
+
+class _CachedDNSBackend(httpcore.NetworkBackend):
+    """Network backend that connects to cached addresses (tried in order)"""
+
+    def __init__(self, backend: httpcore.NetworkBackend, cache: DNSCache):
+        self._backend = backend
+        self._cache = cache
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if _is_ip(host):
+            return self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        try:
+            addresses = self._cache.lookup(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(str(e)) from e
+        for i, address in enumerate(addresses):
+            try:
+                return self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError:
+                if i == len(addresses) - 1:
+                    self._cache.forget(host, port)  # maybe stale; resolve again next time
+                    raise
+
+    def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    def sleep(self, seconds: float):
+        self._backend.sleep(seconds)
+
+
+class _AsyncCachedDNSBackend(httpcore.AsyncNetworkBackend):
+    """_CachedDNSBackend for async clients (misses resolve in a worker thread)"""
+
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, cache: DNSCache):
+        self._backend = backend
+        self._cache = cache
+
+    async def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        if _is_ip(host):
+            return await self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        addresses = self._cache.cached(host, port)
+        if addresses is None:
+            try:
+                addresses = await anyio.to_thread.run_sync(self._cache.lookup, host, port)
+            except OSError as e:
+                raise httpcore.ConnectError(str(e)) from e
+        for i, address in enumerate(addresses):
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address,
+                                                       socket_options)
+            except httpcore.ConnectError:
+                if i == len(addresses) - 1:
+                    self._cache.forget(host, port)
+                    raise
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float):
+        await self._backend.sleep(seconds)
+
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+_dns_cache: Optional[DNSCache] = None
+_dns_lock = threading.Lock()
+
+
+def get_dns_cache() -> Optional[DNSCache]:
+    """DNS cache shared by the HTTP clients (HTTP_DNS_CACHE_TTL seconds, 0 = off)"""
+    global _dns_cache
+    with _dns_lock:
+        ttl = float(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+        if ttl > 0 and _dns_cache is None:
+            _dns_cache = DNSCache(ttl, int(os.getenv("HTTP_DNS_CACHE_SIZE", "1024")))
+        return _dns_cache
+
+
+def _cache_dns(client):
+    """Resolve the client's direct connections through the DNS cache
+
+    httpx has no network_backend option, so this wraps the backend of the
+    client's default transport (proxy mounts are left as they are).
+    """
+    cache = get_dns_cache()
+    pool = getattr(client._transport, "_pool", None)
+    if cache is None or pool is None:
+        return client
+    backend = _AsyncCachedDNSBackend if isinstance(client, httpx.AsyncClient) else _CachedDNSBackend
+    pool._network_backend = backend(pool._network_backend, cache)
+    return client
+
+
+def get_http_client() -> httpx.Client:
+    """Process-wide pooled client, configured from the environment"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _cache_dns(httpx.Client(
+                http2=http2_enabled(),
+                limits=http_limits(),
+                timeout=http_timeout(),
+                follow_redirects=True,
+                headers={"User-Agent": DEFAULT_USER_AGENT},
+            ))
+            atexit.register(_client.close)
+        return _client
+
+
+def build_async_client(max_connections: int, headers: Optional[Dict[str, str]] = None,
+                       timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """Async client with the same HTTP/2, timeout, keep-alive and DNS settings"""
+    return _cache_dns(httpx.AsyncClient(
+        http2=http2_enabled(),
+        limits=http_limits(max_connections),
+        timeout=http_timeout(timeout),
+        follow_redirects=True,
+        headers=headers,
+    ))
+
+
+def http_get(url: str, headers: Optional[Dict[str, str]] = None,
+             timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+    """GET through the shared client (timeout overrides the read timeout)"""
+    return get_http_client().get(url, headers=headers,
+                                 timeout=http_timeout(timeout) if timeout else httpx.USE_CLIENT_DEFAULT,
+                                 **kwargs)
@@ -0,0 +1,121 @@
+"""
+Incremental recrawl support
+
+Keeps a content fingerprint and the page's metadata (not its text or
+links) for every URL of the last crawl of a site, so the state stays small
+however large the site. On the next crawl, each page's fingerprint tells
+whether it was added, changed or unchanged, and the crawl reports which
+pages were removed.
+"""
+
+import logging
+import os
+import re
+import json
+import hashlib
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Parts of the HTML that change on every request without changing content
+_VOLATILE = re.compile(
+    r"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->"
+    r"|\s(?:nonce|data-csrf|csrf-token|data-request-id)=\"[^\"]*\"",
+    re.IGNORECASE | re.DOTALL,
+)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def content_fingerprint(html: str) -> str:
+    """Hash of the page's HTML minus scripts, styles, comments and nonces"""
+    stable = _WHITESPACE.sub(" ", _VOLATILE.sub("", html))
+    return hashlib.sha256(stable.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CrawlDiff:
+    """What changed since the previous crawl of a site"""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def summary(self) -> str:
+        return (f"{len(self.added)} added, {len(self.changed)} changed, "
+                f"{len(self.removed)} removed, {len(self.unchanged)} unchanged")
+
+
+def _metadata(page: dict) -> dict:
+    return {key: value for key, value in page.items() if key != "content"}
+
+
+class CrawlState:
+    """Last crawl's fingerprints and page metadata for one site, stored as JSON"""
+
+    def __init__(self, domain: str, state_dir: Optional[str] = None):
+        state_dir = state_dir or os.path.join(os.getenv("HTTP_CACHE_DIR", ".cache"), "crawl_state")
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in domain)
+        self.path = os.path.join(state_dir, f"{safe_name}.json")
+        self.previous: Dict[str, dict] = {}
+        self.current: Dict[str, dict] = {}
+        self.diff = CrawlDiff()
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    pages = json.load(f).get("pages", {})
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable crawl state %s: %s", self.path, e)
+                return
+            # State written by older versions also held each page's text and links
+            self.previous = {url: {"fingerprint": record["fingerprint"],
+                                   "page": _metadata(record.get("page", {}))}
+                             for url, record in pages.items()}
+
+    def is_unchanged(self, url: str, fingerprint: str) -> bool:
+        """Whether the URL's content matches the last crawl (without recording anything)"""
+        record = self.previous.get(url)
+        return bool(record) and record["fingerprint"] == fingerprint
+
+    def record(self, url: str, fingerprint: str, page: dict):
+        """Note a page scraped this crawl as added, changed or unchanged"""
+        previous = self.previous.get(url)
+        self.current[url] = {"fingerprint": fingerprint, "page": _metadata(page)}
+        if not previous:
+            self.diff.added.append(url)
+        elif previous["fingerprint"] == fingerprint:
+            self.diff.unchanged.append(url)
+        else:
+            self.diff.changed.append(url)
+
+    def finish(self, attempted, complete: bool) -> CrawlDiff:
+        """Work out removed pages and save the new state
+
+        A previous page counts as removed if this crawl tried to load it and
+        got nothing, or if the crawl covered the whole site without finding
+        it. Pages the page budget never reached are carried over as-is.
+        """
+        for url, record in self.previous.items():
+            if url in self.current:
+                continue
+            if url in attempted or complete:
+                self.diff.removed.append(url)
+            else:
+                self.current[url] = record
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"pages": self.current}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        return self.diff
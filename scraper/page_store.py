@@ -0,0 +1,149 @@
+"""
+Disk-backed page storage
+
+Keeps only page metadata in RAM and appends each page's text, zlib
+compressed, to segment files on disk. Content is read back (and
+decompressed) only when a page's .content is accessed, so memory use stays
+flat as crawls grow and many Streamlit sessions can share a small container.
+"""
+
+import os
+import zlib
+import shutil
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .web_scraper import ScrapedPage
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+class StoredPage(ScrapedPage):
+    """ScrapedPage whose content lives in a PageStore segment
+
+    Behaves like a ScrapedPage (including dataclasses.asdict); reading
+    .content loads it from disk, assigning it appends a new record.
+    """
+
+    def __init__(self, store: "PageStore", page: ScrapedPage, location: Tuple[int, int, int]):
+        self.__dict__.update({k: v for k, v in page.__dict__.items() if k != "content"})
+        self._store = store
+        self._location = location
+
+    @property
+    def content(self) -> str:
+        return self._store.read(self._location)
+
+    @content.setter
+    def content(self, value: str):
+        self._location = self._store.write(value)
+
+
+def _cleanup(directory: str, handles: List[int]):
+    for fd in handles:
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class PageStore(MutableMapping):
+    """url -> ScrapedPage mapping that spills page content to disk
+
+    Values are StoredPage objects (metadata only). Segment files live in a
+    private temporary directory, removed with close() or when the store is
+    garbage collected. A few recently read pages are cached decompressed.
+    """
+
+    def __init__(self, directory: Optional[str] = None, segment_bytes: int = SEGMENT_BYTES,
+                 cache_pages: int = 16):
+        base = directory or os.getenv("PAGE_STORE_DIR") or None
+        if base:
+            os.makedirs(base, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="pages-", dir=base)
+        self.segment_bytes = segment_bytes
+        self.cache_pages = cache_pages
+        self._pages: Dict[str, StoredPage] = {}
+        self._fds: List[int] = []
+        self._segment_size = 0
+        self._cache: "OrderedDict[Tuple[int, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _cleanup, self.directory, self._fds)
+
+    def _open_segment(self):
+        path = os.path.join(self.directory, f"segment-{len(self._fds):04d}.z")
+        self._fds.append(os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600))
+        self._segment_size = 0
+
+    def write(self, content: str) -> Tuple[int, int, int]:
+        """Append compressed content; returns its (segment, offset, length)"""
+        data = zlib.compress(content.encode("utf-8"), 6)
+        with self._lock:
+            if not self._fds or self._segment_size + len(data) > self.segment_bytes:
+                self._open_segment()
+            segment, offset = len(self._fds) - 1, self._segment_size
+            os.write(self._fds[segment], data)
+            self._segment_size += len(data)
+        return segment, offset, len(data)
+
+    def read(self, location: Tuple[int, int, int]) -> str:
+        with self._lock:
+            cached = self._cache.get(location)
+            if cached is not None:
+                self._cache.move_to_end(location)
+                return cached
+        segment, offset, length = location
+        content = zlib.decompress(os.pread(self._fds[segment], length, offset)).decode("utf-8")
+        with self._lock:
+            self._cache[location] = content
+            if len(self._cache) > self.cache_pages:
+                self._cache.popitem(last=False)
+        return content
+
+    def __setitem__(self, url: str, page: ScrapedPage):
+        if not (isinstance(page, StoredPage) and page._store is self):
+            page = StoredPage(self, page, self.write(page.content))
+        self._pages[url] = page
+
+    def add(self, page: ScrapedPage) -> StoredPage:
+        """Store a page under its URL and return the stored (metadata-only) page"""
+        self[page.url] = page
+        return self._pages[page.url]
+
+    def __getitem__(self, url: str) -> StoredPage:
+        return self._pages[url]
+
+    def __delitem__(self, url: str):
+        # Space in the segment is reclaimed when the store is closed
+        del self._pages[url]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._pages))
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, url) -> bool:
+        return url in self._pages
+
+    def disk_bytes(self) -> int:
+        with self._lock:
+            return sum(os.fstat(fd).st_size for fd in self._fds)
+
+    def close(self):
+        """Delete the segment files (stored pages can no longer load content)"""
+        self._pages.clear()
+        self._cache.clear()
+        self._finalizer()
+
+
+def new_page_store():
+    """Page storage configured by PAGE_STORE: "disk" (default) or "memory" (plain dict)"""
+    if os.getenv("PAGE_STORE", "disk").lower() == "memory":
+        return {}
+    return PageStore()
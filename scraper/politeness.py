@@ -0,0 +1,268 @@
+"""
+Per-host politeness scheduler
+
+Each host gets a token bucket and a cap on in-flight requests instead of a
+global sleep between pages, so crawls of different hosts (or concurrent
+crawls of one host) run as fast as each origin allows. robots.txt
+Crawl-delay and Retry-After responses slow a host down further.
+"""
+
+import logging
+import os
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from .http_client import http_get
+
+logger = logging.getLogger(__name__)
+
+ROBOTS_USER_AGENT = "Mozilla/5.0 (compatible; WebScraperAI/1.0)"
+
+# Statuses that mean "slow down" even without a Retry-After header
+THROTTLE_STATUS = {429, 503}
+DEFAULT_THROTTLE_SECONDS = 5.0
+MAX_RETRY_AFTER_SECONDS = 300.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RobotsCache:
+    """Fetches and caches robots.txt per host"""
+
+    def __init__(self, user_agent: str = ROBOTS_USER_AGENT, timeout: float = 5.0):
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self._parsers: Dict[str, Optional[RobotFileParser]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[RobotFileParser]:
+        """Parsed robots.txt for the URL's host, or None if unavailable"""
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme or 'https'}://{parsed.netloc}"
+
+        with self._lock:
+            if origin in self._parsers:
+                return self._parsers[origin]
+            host_lock = self._locks.setdefault(origin, threading.Lock())
+
+        with host_lock:
+            if origin in self._parsers:
+                return self._parsers[origin]
+            parser = self._fetch(origin)
+            with self._lock:
+                self._parsers[origin] = parser
+            return parser
+
+    def _fetch(self, origin: str) -> Optional[RobotFileParser]:
+        try:
+            response = http_get(f"{origin}/robots.txt", timeout=self.timeout,
+                                headers={"User-Agent": self.user_agent})
+        except Exception:
+            return None
+        if response.status_code in (401, 403):
+            # Access to robots.txt itself is denied: assume the whole site is
+            parser = RobotFileParser()
+            parser.disallow_all = True
+            return parser
+        if response.status_code != 200:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        return parser
+
+    def can_fetch(self, url: str) -> bool:
+        """Whether robots.txt allows fetching the URL (True if there is none)"""
+        parser = self.get(url)
+        return parser.can_fetch(self.user_agent, url) if parser else True
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        parser = self.get(url)
+        if not parser:
+            return None
+        delay = parser.crawl_delay(self.user_agent)
+        return float(delay) if delay else None
+
+
+class _HostState:
+    """Token bucket plus in-flight counter for one host"""
+
+    def __init__(self, rate: float, capacity: float, max_in_flight: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.updated = time.monotonic()
+
+    def try_acquire(self, now: float) -> float:
+        """Take a slot and return 0, or return how long to wait"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.in_flight >= self.max_in_flight:
+            return 0.05
+
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.in_flight += 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class _Slot:
+    """A held request slot; the response recorded on it is passed to release()"""
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.retry_after: Optional[str] = None
+
+    def record(self, status: Optional[int], retry_after: Optional[str] = None):
+        self.status = status
+        self.retry_after = retry_after
+
+
+class PolitenessScheduler:
+    """Per-host rate limiting shared by every crawl in the process
+
+    A host gets max_in_flight concurrent requests and, on average, one request
+    per `delay` seconds per slot. A robots.txt Crawl-delay turns that into one
+    request at a time, at most one per Crawl-delay seconds.
+    """
+
+    def __init__(self, delay: float = 1.0, max_in_flight: int = 4,
+                 respect_robots: bool = True):
+        self.delay = max(0.0, delay)
+        self.max_in_flight = max(1, max_in_flight)
+        self.respect_robots = respect_robots
+        self.robots = RobotsCache()
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _new_state(self, url: str) -> _HostState:
+        crawl_delay = self.robots.crawl_delay(url) if self.respect_robots else None
+        if crawl_delay:
+            logger.info("robots.txt Crawl-delay for %s: %ss", urlparse(url).netloc, crawl_delay)
+            return _HostState(rate=1.0 / crawl_delay, capacity=1, max_in_flight=1)
+        rate = self.max_in_flight / self.delay if self.delay else 1e9
+        return _HostState(rate=rate, capacity=self.max_in_flight,
+                          max_in_flight=self.max_in_flight)
+
+    def _state(self, url: str) -> _HostState:
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+        if state is None:
+            # robots.txt is fetched outside the scheduler lock
+            state = self._new_state(url)
+            with self._lock:
+                state = self._hosts.setdefault(host, state)
+        return state
+
+    def _try_acquire(self, state: _HostState) -> float:
+        with self._lock:
+            return state.try_acquire(time.monotonic())
+
+    def acquire(self, url: str):
+        """Block until a request to the URL's host is allowed"""
+        state = self._state(url)
+        while True:
+            wait = self._try_acquire(state)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, url: str):
+        """Await until a request to the URL's host is allowed"""
+        host = urlparse(url).netloc
+        with self._lock:
+            state = self._hosts.get(host)
+        if state is None:
+            state = await asyncio.to_thread(self._state, url)
+        while True:
+            wait = self._try_acquire(state)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def release(self, url: str, status: Optional[int] = None,
+                retry_after: Optional[str] = None):
+        """Free the slot; throttling responses pause the whole host"""
+        state = self._state(url)
+        pause = parse_retry_after(retry_after)
+        if pause is None and status in THROTTLE_STATUS:
+            pause = DEFAULT_THROTTLE_SECONDS
+
+        with self._lock:
+            state.in_flight = max(0, state.in_flight - 1)
+            if pause:
+                pause = min(pause, MAX_RETRY_AFTER_SECONDS)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + pause)
+
+        if pause:
+            logger.info("Backing off %s for %.0fs", urlparse(url).netloc, pause)
+
+    def allowed(self, url: str) -> bool:
+        """robots.txt check, unless robots handling is switched off"""
+        return not self.respect_robots or self.robots.can_fetch(url)
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold a request slot for the URL's host for a with-block
+
+        Yields a _Slot; the status and Retry-After recorded on it (directly,
+        or with record_response() further down the call stack) are passed
+        to release(), so throttled pages slow the host down.
+        """
+        self.acquire(url)
+        held = _Slot()
+        outer = getattr(self._local, "slot", None)
+        self._local.slot = held
+        try:
+            yield held
+        finally:
+            self._local.slot = outer
+            self.release(url, held.status, held.retry_after)
+
+    def record_response(self, status: Optional[int], retry_after: Optional[str] = None):
+        """Record a response on the slot this thread holds (if any)"""
+        held = getattr(self._local, "slot", None)
+        if held is not None:
+            held.record(status, retry_after)
+
+
+_scheduler: Optional[PolitenessScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> PolitenessScheduler:
+    """Process-wide scheduler, configured from the environment"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PolitenessScheduler(
+                delay=float(os.getenv("SCRAPE_DELAY_SECONDS", "1")),
+                max_in_flight=int(os.getenv("HOST_MAX_IN_FLIGHT", "4")),
+                respect_robots=os.getenv("RESPECT_ROBOTS", "true").lower() != "false",
+            )
+        return _scheduler
@@ -0,0 +1,311 @@
+"""
+Scrape.do proxy fetching with quota accounting
+
+Every Scrape.do call is reserved in a persistent ledger before it is sent,
+so the monthly quota (1,000 requests on the free tier) and an optional
+per-run budget are enforced across threads, processes and restarts. Calls
+run concurrently up to a configured limit. Past a budget, calls are either
+refused or queued in the ledger to be retried once budget is available.
+
+The fetcher is shared by the whole process; each crawl fetches through its
+own ProxyRun (from start_run()), so concurrent crawls keep separate run
+budgets and stats.
+
+SCRAPE_DO_BASE_URL points the fetcher at a local stub server for testing.
+"""
+
+import logging
+import os
+import time
+import uuid
+import sqlite3
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+import httpx
+
+from .http_client import http_get
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = "http://api.scrape.do"
+
+
+def _month(ts: Optional[float] = None) -> str:
+    return datetime.fromtimestamp(ts or time.time(), tz=timezone.utc).strftime("%Y-%m")
+
+
+class QuotaExceeded(Exception):
+    """A Scrape.do call would go past the monthly quota or the run budget"""
+
+
+class QuotaLedger:
+    """Persistent record of Scrape.do calls (SQLite, shared between processes)
+
+    A call is reserved (status NULL) before it is sent, then finished with
+    its HTTP status. Every reserved call counts against the quota, which
+    errs on the side of not overspending.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(os.getenv("HTTP_CACHE_DIR", ".cache"), "scrape_do_ledger.sqlite3")
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS calls (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                month TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                status INTEGER,
+                seconds REAL
+            );
+            CREATE INDEX IF NOT EXISTS calls_month ON calls (month);
+            CREATE TABLE IF NOT EXISTS deferred (
+                url TEXT PRIMARY KEY,
+                deferred_at REAL NOT NULL,
+                reason TEXT NOT NULL
+            );
+        """)
+
+    def reserve(self, url: str, run_id: str, monthly_quota: int,
+                run_budget: Optional[int]) -> int:
+        """Record a call about to be made; raises QuotaExceeded if over budget"""
+        month = _month()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                used = self._db.execute("SELECT COUNT(*) FROM calls WHERE month = ?",
+                                        (month,)).fetchone()[0]
+                if used >= monthly_quota:
+                    raise QuotaExceeded(f"Scrape.do monthly quota used up ({used}/{monthly_quota})")
+                if run_budget is not None:
+                    run_used = self._db.execute("SELECT COUNT(*) FROM calls WHERE run_id = ?",
+                                                (run_id,)).fetchone()[0]
+                    if run_used >= run_budget:
+                        raise QuotaExceeded(f"Scrape.do run budget used up ({run_used}/{run_budget})")
+                call_id = self._db.execute(
+                    "INSERT INTO calls (month, run_id, url, started_at) VALUES (?, ?, ?, ?)",
+                    (month, run_id, url, time.time())).lastrowid
+                self._db.execute("COMMIT")
+                return call_id
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def finish(self, call_id: int, status: int, seconds: float):
+        with self._lock:
+            self._db.execute("UPDATE calls SET status = ?, seconds = ? WHERE id = ?",
+                             (status, seconds, call_id))
+
+    def defer(self, url: str, reason: str):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO deferred VALUES (?, ?, ?)",
+                             (url, time.time(), reason))
+
+    def deferred(self) -> List[str]:
+        with self._lock:
+            return [url for (url,) in self._db.execute(
+                "SELECT url FROM deferred ORDER BY deferred_at")]
+
+    def undefer(self, url: str):
+        with self._lock:
+            self._db.execute("DELETE FROM deferred WHERE url = ?", (url,))
+
+    def month_used(self, month: Optional[str] = None) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM calls WHERE month = ?",
+                                    (month or _month(),)).fetchone()[0]
+
+    def run_summary(self, run_id: str) -> dict:
+        with self._lock:
+            calls, ok, seconds = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = 200), 0), COALESCE(SUM(seconds), 0) "
+                "FROM calls WHERE run_id = ?", (run_id,)).fetchone()
+        return {"calls": calls, "succeeded": ok, "seconds": round(seconds, 2)}
+
+
+class ProxyRun:
+    """One run (crawl) of a ProxyFetcher: its per-run budget and refusal count"""
+
+    def __init__(self, fetcher: "ProxyFetcher"):
+        self.fetcher = fetcher
+        self.run_id = uuid.uuid4().hex
+        self.refused = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return self.fetcher.available
+
+    def _refuse(self):
+        with self._lock:
+            self.refused += 1
+
+    def fetch(self, url: str) -> Optional[str]:
+        return self.fetcher.fetch(url, run=self)
+
+    def fetch_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        return self.fetcher.fetch_many(urls, run=self)
+
+    def retry_deferred(self) -> Dict[str, Optional[str]]:
+        return self.fetcher.retry_deferred(run=self)
+
+    def stats(self) -> dict:
+        return self.fetcher.stats(run=self)
+
+
+class ProxyFetcher:
+    """Concurrent, budgeted Scrape.do client
+
+    At most `max_concurrent` calls are in flight at once, from any thread.
+    on_budget="refuse" returns None past a budget; "queue" also records the
+    URL in the ledger so retry_deferred() can fetch it once budget frees up
+    (next month, or with a bigger run budget).
+
+    Calls without a `run` count against a default run for the fetcher.
+    """
+
+    def __init__(self, token: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrent: int = 5, monthly_quota: int = 1000,
+                 run_budget: Optional[int] = None, on_budget: str = "refuse",
+                 timeout: float = 60, ledger: Optional[QuotaLedger] = None):
+        self.token = token
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.max_concurrent = max(1, max_concurrent)
+        self.monthly_quota = monthly_quota
+        self.run_budget = run_budget
+        self.on_budget = on_budget
+        self.timeout = timeout
+        self.ledger = ledger or QuotaLedger()
+        self.default_run = ProxyRun(self)
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return bool(self.token)
+
+    @property
+    def run_id(self) -> str:
+        return self.default_run.run_id
+
+    @property
+    def refused(self) -> int:
+        return self.default_run.refused
+
+    def start_run(self) -> ProxyRun:
+        """A new run (crawl) with its own per-run budget and stats"""
+        return ProxyRun(self)
+
+    def fetch(self, url: str, run: Optional[ProxyRun] = None) -> Optional[str]:
+        """HTML of `url` through Scrape.do, or None (failed, no token, over budget)"""
+        return self._fetch(url, defer=self.on_budget == "queue", run=run or self.default_run)
+
+    def _fetch(self, url: str, defer: bool, run: ProxyRun) -> Optional[str]:
+        if not self.token:
+            return None
+        try:
+            call_id = self.ledger.reserve(url, run.run_id, self.monthly_quota, self.run_budget)
+        except QuotaExceeded as e:
+            run._refuse()
+            if defer:
+                self.ledger.defer(url, str(e))
+                logger.warning("%s - queued %s for later", e, url)
+            else:
+                logger.warning("%s - skipping %s", e, url)
+            return None
+
+        status = 0
+        started = time.time()
+        with self._slots:
+            try:
+                logger.debug("Loading with Scrape.do proxy: %s", url)
+                response = http_get(self.base_url, params={"token": self.token, "url": url},
+                                    timeout=self.timeout)
+                status = response.status_code
+            except httpx.HTTPError as e:
+                logger.warning("Proxy error for %s: %s", url, e)
+            finally:
+                self.ledger.finish(call_id, status, time.time() - started)
+
+        if status != 200:
+            if status:
+                logger.warning("Proxy failed with status %s for %s", status, url)
+            return None
+        logger.debug("Got HTML via proxy: %d chars", len(response.text))
+        return response.text
+
+    def submit(self, url: str, run: Optional[ProxyRun] = None) -> Future:
+        """Fetch in the background; the future resolves to fetch()'s result"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                    thread_name_prefix="scrape-do")
+        return self._executor.submit(self.fetch, url, run)
+
+    def fetch_many(self, urls: Iterable[str], run: Optional[ProxyRun] = None) -> Dict[str, Optional[str]]:
+        """Fetch several URLs concurrently (up to max_concurrent at a time)"""
+        futures = {url: self.submit(url, run) for url in dict.fromkeys(urls)}
+        return {url: future.result() for url, future in futures.items()}
+
+    def retry_deferred(self, run: Optional[ProxyRun] = None) -> Dict[str, Optional[str]]:
+        """Fetch queued URLs while budget allows
+
+        A URL leaves the queue only once it was fetched; refused or failed
+        ones stay queued.
+        """
+        run = run or self.default_run
+        results = {}
+        for url in self.ledger.deferred():
+            refused = run.refused
+            results[url] = html = self._fetch(url, defer=True, run=run)
+            if html is not None:
+                self.ledger.undefer(url)
+            if run.refused > refused:
+                break  # still over budget
+        return results
+
+    def stats(self, run: Optional[ProxyRun] = None) -> dict:
+        run = run or self.default_run
+        month_used = self.ledger.month_used()
+        summary = self.ledger.run_summary(run.run_id)
+        return {
+            "run_calls": summary["calls"],
+            "run_succeeded": summary["succeeded"],
+            "run_seconds": summary["seconds"],
+            "run_budget_left": None if self.run_budget is None else max(0, self.run_budget - summary["calls"]),
+            "refused": run.refused,
+            "deferred": len(self.ledger.deferred()),
+            "month_used": month_used,
+            "month_left": max(0, self.monthly_quota - month_used),
+            "monthly_quota": self.monthly_quota,
+        }
+
+
+_fetcher: Optional[ProxyFetcher] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_proxy_fetcher() -> ProxyFetcher:
+    """Process-wide Scrape.do fetcher, configured from the environment"""
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            run_budget = os.getenv("SCRAPE_DO_RUN_BUDGET")
+            _fetcher = ProxyFetcher(
+                token=os.getenv("SCRAPE_DO_TOKEN"),
+                base_url=os.getenv("SCRAPE_DO_BASE_URL", DEFAULT_BASE_URL),
+                max_concurrent=int(os.getenv("SCRAPE_DO_CONCURRENCY", "5")),
+                monthly_quota=int(os.getenv("SCRAPE_DO_MONTHLY_QUOTA", "1000")),
+                run_budget=int(run_budget) if run_budget else None,
+                on_budget=os.getenv("SCRAPE_DO_ON_BUDGET", "refuse"),
+            )
+        return _fetcher
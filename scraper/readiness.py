@@ -0,0 +1,121 @@
+"""
+Adaptive page-readiness detection
+
+Replaces fixed sleeps after driver.get() with a poll that returns as soon
+as the page has finished loading, the network is idle, the DOM has stopped
+changing and lazy-loaded content has stopped growing the page.
+"""
+
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Installed on every new document (via CDP) so pending XHR/fetch requests and
+# DOM mutations are tracked from the very first script on the page.
+READINESS_HOOK_JS = """
+(() => {
+  if (window.__scrReady) return;
+  const s = window.__scrReady = {pending: 0, lastNet: performance.now(), lastMutation: performance.now()};
+  const start = () => { s.pending++; s.lastNet = performance.now(); };
+  const end = () => { s.pending = Math.max(0, s.pending - 1); s.lastNet = performance.now(); };
+  const origFetch = window.fetch;
+  if (origFetch) {
+    window.fetch = function() {
+      start();
+      return origFetch.apply(this, arguments).finally(end);
+    };
+  }
+  const origSend = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function() {
+    start();
+    this.addEventListener('loadend', end, {once: true});
+    return origSend.apply(this, arguments);
+  };
+  const observe = () => new MutationObserver(() => { s.lastMutation = performance.now(); })
+    .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+  if (document.documentElement) observe();
+  else document.addEventListener('DOMContentLoaded', observe, {once: true});
+})();
+"""
+
+# One round trip per poll. Without the hook (e.g. the CDP call failed), network
+# activity falls back to the count of resource timing entries.
+PROBE_JS = """
+const s = window.__scrReady;
+const body = document.body;
+const resources = performance.getEntriesByType('resource').length;
+if (arguments[0] && body) window.scrollTo(0, body.scrollHeight);
+return {
+  state: document.readyState,
+  hooked: !!s,
+  pending: s ? s.pending : 0,
+  lastNet: s ? s.lastNet : -1,
+  lastMutation: s ? s.lastMutation : -1,
+  now: performance.now(),
+  resources: resources,
+  height: body ? body.scrollHeight : 0
+};
+"""
+
+DEFAULT_MAX_WAIT = float(os.getenv("READY_MAX_WAIT", "8"))
+DEFAULT_QUIET_MS = float(os.getenv("READY_QUIET_MS", "300"))
+
+
+def install_readiness_hook(driver) -> bool:
+    """Register the tracking hook for every document the driver opens"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument",
+                               {"source": READINESS_HOOK_JS})
+        return True
+    except Exception as e:
+        logger.debug("Readiness hook unavailable: %s", e)
+        return False
+
+
+def wait_for_page_ready(driver, max_wait: float = DEFAULT_MAX_WAIT,
+                        quiet_ms: float = DEFAULT_QUIET_MS,
+                        poll_interval: float = 0.1) -> float:
+    """Block until the page is ready or max_wait elapses; returns seconds waited
+
+    Ready means: document.readyState is "complete", no XHR/fetch is pending,
+    and neither the network, the DOM nor the scroll height has changed for
+    quiet_ms. The page is scrolled to the bottom while waiting to trigger
+    lazy loading, then back to the top.
+    """
+    started = time.time()
+    deadline = started + max_wait
+    last_height = -1
+    last_resources = -1
+    stable_since = None
+
+    try:
+        while time.time() < deadline:
+            probe = driver.execute_script(PROBE_JS, True)
+            now = probe["now"]
+
+            if probe["resources"] != last_resources or probe["height"] != last_height:
+                stable_since = now
+                last_resources = probe["resources"]
+                last_height = probe["height"]
+
+            quiet = now - stable_since >= quiet_ms
+            if probe["hooked"]:
+                quiet = (quiet and probe["pending"] == 0
+                         and now - probe["lastNet"] >= quiet_ms
+                         and now - probe["lastMutation"] >= quiet_ms)
+
+            if probe["state"] == "complete" and quiet:
+                break
+
+            time.sleep(poll_interval)
+    except Exception as e:
+        logger.debug("Readiness check failed: %s", e)
+    finally:
+        try:
+            driver.execute_script("window.scrollTo(0, 0);")
+        except Exception:
+            pass
+
+    return time.time() - started
@@ -0,0 +1,164 @@
+"""
+Browser rendering profiles
+
+We only keep text from page_source, so images, fonts, video and tracking
+scripts are wasted bandwidth, time and Chrome memory. The "lite" profile
+blocks them through the DevTools protocol (Network.setBlockedURLs) and
+Chrome's image content setting; "full" loads everything as before.
+
+Network usage per page (bytes received, requests, requests blocked) is read
+from Chrome's performance log, so crawl stats can show what the profile saves.
+"""
+
+import logging
+import os
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Wildcard URL patterns per resource type. setBlockedURLs matches the whole
+# URL, so each extension is listed bare and with a query string.
+_EXTENSIONS = {
+    "image": ["png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp", "tiff"],
+    "font": ["woff", "woff2", "ttf", "otf", "eot"],
+    "media": ["mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "mov", "m3u8", "mpd", "ts"],
+    "stylesheet": ["css"],
+}
+RESOURCE_TYPE_PATTERNS = {
+    kind: [p for ext in exts for p in (f"*.{ext}", f"*.{ext}?*")]
+    for kind, exts in _EXTENSIONS.items()
+}
+RESOURCE_TYPE_PATTERNS["media"] += ["*youtube.com/embed/*", "*player.vimeo.com/*", "*wistia.com/*"]
+
+# Analytics, ads and session recording - never needed to render content
+TRACKER_PATTERNS = [
+    "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*",
+    "*googlesyndication.com/*", "*googleadservices.com/*", "*adservice.google.com/*",
+    "*connect.facebook.net/*", "*facebook.com/tr*", "*snap.licdn.com/*", "*ads.linkedin.com/*",
+    "*bat.bing.com/*", "*clarity.ms/*", "*hotjar.com/*", "*fullstory.com/*",
+    "*mixpanel.com/*", "*cdn.segment.com/*", "*api.segment.io/*", "*amplitude.com/*",
+    "*js.hs-analytics.net/*", "*js.hs-banner.com/*", "*analytics.tiktok.com/*",
+    "*static.ads-twitter.com/*", "*criteo.com/*", "*taboola.com/*", "*outbrain.com/*",
+    "*quantserve.com/*", "*scorecardresearch.com/*", "*newrelic.com/*", "*nr-data.net/*",
+]
+
+DEFAULT_LITE_BLOCK_TYPES = ["image", "font", "media"]
+
+
+@dataclass
+class RenderProfile:
+    """What a pooled Chrome is allowed to download
+
+    allow_patterns win over the block lists: any block pattern containing an
+    allowlisted entry (e.g. "googletagmanager.com" on a site that renders
+    through GTM) is dropped, since setBlockedURLs has no allow rules.
+    """
+    name: str = "full"
+    block_types: List[str] = field(default_factory=list)
+    block_patterns: List[str] = field(default_factory=list)
+    allow_patterns: List[str] = field(default_factory=list)
+    block_trackers: bool = False
+
+    @property
+    def is_lite(self) -> bool:
+        return bool(self.blocked_urls())
+
+    def blocked_urls(self) -> List[str]:
+        patterns = []
+        for kind in self.block_types:
+            patterns += RESOURCE_TYPE_PATTERNS.get(kind, [])
+        if self.block_trackers:
+            patterns += TRACKER_PATTERNS
+        patterns += self.block_patterns
+        allowed = [a.strip("*") for a in self.allow_patterns if a.strip("*")]
+        return [p for p in dict.fromkeys(patterns) if not any(a in p for a in allowed)]
+
+    def chrome_prefs(self) -> dict:
+        """Chrome preferences (images are skipped before decoding, too)"""
+        if "image" in self.block_types:
+            return {"profile.managed_default_content_settings.images": 2}
+        return {}
+
+    def apply(self, driver):
+        """Install the block list on a freshly started driver"""
+        blocked = self.blocked_urls()
+        if not blocked:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+        except Exception as e:
+            logger.warning("Could not install %s render profile: %s", self.name, e)
+
+
+def _env_list(name: str, default: Optional[List[str]] = None) -> List[str]:
+    value = os.getenv(name)
+    if value is None:
+        return list(default or [])
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def get_render_profile() -> RenderProfile:
+    """Profile selected by RENDER_PROFILE (full | lite) and the LITE_* settings"""
+    if os.getenv("RENDER_PROFILE", "full").lower() != "lite":
+        return RenderProfile()
+    return RenderProfile(
+        name="lite",
+        block_types=_env_list("LITE_BLOCK_TYPES", DEFAULT_LITE_BLOCK_TYPES),
+        block_patterns=_env_list("LITE_BLOCK_PATTERNS"),
+        allow_patterns=_env_list("LITE_ALLOW_PATTERNS"),
+        block_trackers=os.getenv("LITE_BLOCK_TRACKERS", "true").lower() != "false",
+    )
+
+
+@dataclass
+class NetworkUsage:
+    """Network activity of one page load"""
+    bytes_received: int = 0
+    requests: int = 0
+    blocked: int = 0
+    document_status: Optional[int] = None
+    retry_after: Optional[str] = None
+
+
+def drain_network_log(driver):
+    """Discard buffered performance log entries (e.g. before a navigation)"""
+    try:
+        driver.get_log("performance")
+    except Exception:
+        pass
+
+
+def read_network_usage(driver) -> Optional[NetworkUsage]:
+    """Sum the network events logged since the last drain (None if logging is off)"""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    usage = NetworkUsage()
+    for entry in entries:
+        message = entry.get("message", "")
+        if ('"Network.loading' not in message and '"Network.requestWillBeSent"' not in message
+                and '"Network.responseReceived"' not in message):
+            continue  # skip the JSON decode for unrelated events
+        try:
+            event = json.loads(message)["message"]
+        except (ValueError, KeyError):
+            continue
+        method, params = event.get("method"), event.get("params", {})
+        if method == "Network.requestWillBeSent":
+            usage.requests += 1
+        elif method == "Network.loadingFinished":
+            usage.bytes_received += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            usage.blocked += 1
+        elif (method == "Network.responseReceived" and params.get("type") == "Document"
+                and usage.document_status is None):
+            # First document response after redirects is the page itself
+            response = params.get("response", {})
+            usage.document_status = int(response.get("status") or 0) or None
+            headers = {k.lower(): v for k, v in response.get("headers", {}).items()}
+            usage.retry_after = headers.get("retry-after")
+    return usage
@@ -0,0 +1,255 @@
+"""
+Retries and per-host circuit breaking for page fetches
+
+Transient failures (timeouts, connection resets, 429 and 5xx responses) are
+retried with jittered exponential backoff; anything else fails at once. A
+host that keeps failing trips its circuit breaker: further requests to it
+fail fast until a cool-down has passed, then a single probe decides whether
+the host is back.
+"""
+
+import logging
+import os
+import re
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from .politeness import parse_retry_after
+from .urls import url_host
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Responses worth another attempt
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Chrome network errors that mean the origin (not the page) is in trouble
+CHROME_NET_ERROR = re.compile(
+    r"net::ERR_(TIMED_OUT|CONNECTION_\w+|EMPTY_RESPONSE|NAME_NOT_RESOLVED"
+    r"|ADDRESS_UNREACHABLE|NETWORK_CHANGED|SSL_PROTOCOL_ERROR)"
+)
+
+
+class RetryableStatus(Exception):
+    """A response with a status from RETRY_STATUS"""
+
+    def __init__(self, status: int, retry_after: Optional[str] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Exception):
+    """The host's circuit breaker is open; the request was not sent"""
+
+
+def classify(error: BaseException) -> Optional[str]:
+    """Failure kind for a retryable error ("timeout", "throttled", "server",
+    "connection"), or None if retrying would not help"""
+    if isinstance(error, RetryableStatus):
+        return "throttled" if error.status == 429 else "server"
+    if isinstance(error, (TimeoutException, httpx.TimeoutException, TimeoutError)):
+        return "timeout"
+    if isinstance(error, httpx.TransportError) or isinstance(error, ConnectionError):
+        return "connection"
+    if isinstance(error, WebDriverException):
+        match = CHROME_NET_ERROR.search(str(error))
+        if match:
+            return "timeout" if match.group(1) == "TIMED_OUT" else "connection"
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how long to retry (full-jitter exponential backoff)"""
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based)"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        server = parse_retry_after(retry_after)
+        if server is not None:
+            return min(self.max_delay, max(server, backoff))
+        return backoff
+
+
+class _Circuit:
+    def __init__(self):
+        self.failures = 0
+        self.opened_until = 0.0
+        self.cooldown = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """Per-host breaker: opens after `threshold` failures in a row
+
+    While open, allow() is False until `cooldown` seconds have passed. Then
+    one request is let through as a probe; success closes the circuit,
+    failure opens it again for twice as long (up to `max_cooldown`).
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 600.0):
+        self.threshold = max(1, threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._hosts: Dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _circuit(self, url: str) -> _Circuit:
+        return self._hosts.setdefault(url_host(url), _Circuit())
+
+    def allow(self, url: str) -> bool:
+        with self._lock:
+            circuit = self._circuit(url)
+            if not circuit.opened_until:
+                return True
+            if circuit.probing or time.monotonic() < circuit.opened_until:
+                self.rejected += 1
+                return False
+            circuit.probing = True
+            return True
+
+    def record_success(self, url: str):
+        with self._lock:
+            circuit = self._circuit(url)
+            if circuit.opened_until:
+                logger.info("Circuit closed for %s", url_host(url))
+            self._hosts[url_host(url)] = _Circuit()
+
+    def record_failure(self, url: str):
+        with self._lock:
+            circuit = self._circuit(url)
+            circuit.failures += 1
+            if circuit.probing or (not circuit.opened_until and circuit.failures >= self.threshold):
+                circuit.cooldown = min(self.max_cooldown, circuit.cooldown * 2 or self.base_cooldown)
+                circuit.opened_until = time.monotonic() + circuit.cooldown
+                circuit.probing = False
+                logger.warning("Circuit open for %s after %d failures - failing fast for %.0fs",
+                               url_host(url), circuit.failures, circuit.cooldown)
+
+    def release_probe(self, url: str):
+        """The probe ended without telling whether the host is healthy"""
+        with self._lock:
+            self._circuit(url).probing = False
+
+    def is_open(self, url: str) -> bool:
+        with self._lock:
+            return bool(self._circuit(url).opened_until)
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+def _on_failure(url: str, error: BaseException, attempt: int,
+                policy: RetryPolicy, breaker: CircuitBreaker, stats=None) -> float:
+    """Record a failed attempt; returns the backoff delay or re-raises"""
+    kind = classify(error)
+    if stats is not None:
+        stats.record_error(kind or error.__class__.__name__)
+    if kind is None:
+        breaker.release_probe(url)
+        raise error
+    breaker.record_failure(url)
+    if attempt + 1 >= policy.max_attempts or breaker.is_open(url):
+        raise error
+    delay = policy.delay(attempt, getattr(error, "retry_after", None))
+    logger.info("%s (%s) on %s - retry %d/%d in %.1fs", kind, error.__class__.__name__, url,
+                attempt + 1, policy.max_attempts - 1, delay)
+    return delay
+
+
+def retry_call(url: str, attempt: Callable[[], T], policy: Optional[RetryPolicy] = None,
+               breaker: Optional[CircuitBreaker] = None, stats=None) -> T:
+    """Run attempt() for `url`, retrying transient failures
+
+    attempt() should raise RetryableStatus for retryable responses. Raises
+    CircuitOpen without calling attempt() while the host's circuit is open,
+    and the last error once retries are used up. Failed attempts are
+    counted in `stats` (a CrawlStats) by class.
+    """
+    policy = policy or get_retry_policy()
+    breaker = breaker or get_circuit_breaker()
+    for n in range(policy.max_attempts):
+        if not breaker.allow(url):
+            raise CircuitOpen(f"Circuit open for {url_host(url)}")
+        probe = breaker.is_open(url)  # let through as the half-open probe
+        try:
+            result = attempt()
+        except Exception as e:
+            time.sleep(_on_failure(url, e, n, policy, breaker, stats))
+        except BaseException:
+            # interrupted: the next request gets to probe instead
+            if probe:
+                breaker.release_probe(url)
+            raise
+        else:
+            breaker.record_success(url)
+            return result
+
+
+async def retry_call_async(url: str, attempt: Callable[[], Awaitable[T]],
+                           policy: Optional[RetryPolicy] = None,
+                           breaker: Optional[CircuitBreaker] = None, stats=None) -> T:
+    """retry_call for coroutines (backs off without blocking the loop)"""
+    policy = policy or get_retry_policy()
+    breaker = breaker or get_circuit_breaker()
+    for n in range(policy.max_attempts):
+        if not breaker.allow(url):
+            raise CircuitOpen(f"Circuit open for {url_host(url)}")
+        probe = breaker.is_open(url)
+        try:
+            result = await attempt()
+        except Exception as e:
+            await asyncio.sleep(_on_failure(url, e, n, policy, breaker, stats))
+        except BaseException:
+            # cancelled (asyncio.CancelledError is not an Exception)
+            if probe:
+                breaker.release_probe(url)
+            raise
+        else:
+            breaker.record_success(url)
+            return result
+
+
+_policy: Optional[RetryPolicy] = None
+_breaker: Optional[CircuitBreaker] = None
+_retry_lock = threading.Lock()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Process-wide retry policy, configured from the environment"""
+    global _policy
+    with _retry_lock:
+        if _policy is None:
+            _policy = RetryPolicy(
+                max_attempts=max(1, int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))),
+                base_delay=float(os.getenv("RETRY_BASE_DELAY", "1")),
+                max_delay=float(os.getenv("RETRY_MAX_DELAY", "30")),
+            )
+        return _policy
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Process-wide per-host circuit breaker, configured from the environment"""
+    global _breaker
+    with _retry_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                cooldown=float(os.getenv("CIRCUIT_COOLDOWN_SECONDS", "30")),
+                max_cooldown=float(os.getenv("CIRCUIT_MAX_COOLDOWN_SECONDS", "600")),
+            )
+        return _breaker
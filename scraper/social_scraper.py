@@ -3,6 +3,7 @@ Social Media Scraper Module
 Supports Instagram, Facebook (public pages), and more
 """
 
+import logging
 import os
 import time
 import json
@@ -15,6 +16,10 @@ from datetime import datetime
 from dotenv import load_dotenv
 from bs4 import BeautifulSoup
 
+from .readiness import wait_for_page_ready
+
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 # Instagram credentials (optional, for private accounts)
@@ -145,9 +150,9 @@ class InstagramScraper:
                 try:
                     self.loader.login(INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD)
                 except Exception as e:
-                    print(f"Instagram login failed: {e}")
+                    logger.warning("Instagram login failed: %s", e)
         except ImportError:
-            print("Instaloader not installed. Run: pip install instaloader")
+            logger.warning("Instaloader not installed. Run: pip install instaloader")
             self.loader = None
     
     def get_profile(self, username: str) -> Optional[SocialProfile]:
@@ -178,7 +183,7 @@ class InstagramScraper:
                 }
             )
         except Exception as e:
-            print(f"Error fetching Instagram profile: {e}")
+            logger.error("Error fetching Instagram profile: %s", e)
             return None
     
     def get_posts(self, username: str, max_posts: int = 10) -> List[SocialPost]:
@@ -191,7 +196,7 @@ class InstagramScraper:
             profile = instaloader.Profile.from_username(self.loader.context, username)
             
             if profile.is_private:
-                print(f"Profile @{username} is private")
+                logger.info("Profile @%s is private", username)
                 return []
             
             posts = []
@@ -230,7 +235,7 @@ class InstagramScraper:
             return posts
             
         except Exception as e:
-            print(f"Error fetching Instagram posts: {e}")
+            logger.error("Error fetching Instagram posts: %s", e)
             return []
 
 
@@ -241,23 +246,17 @@ class FacebookScraper:
         self.driver = None
     
     def _init_driver(self):
-        """Initialize Selenium WebDriver"""
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
+        """Borrow a WebDriver from the shared pool with a random user agent"""
         from fake_useragent import UserAgent
+        from .driver_pool import get_driver_pool
         
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument(f"user-agent={UserAgent().random}")
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = get_driver_pool().acquire(user_agent=UserAgent().random)
     
     def _close_driver(self):
-        """Close the WebDriver"""
+        """Return the WebDriver to the pool"""
         if self.driver:
-            self.driver.quit()
+            from .driver_pool import get_driver_pool
+            get_driver_pool().release(self.driver)
             self.driver = None
     
     def get_page_info(self, page_url: str) -> Optional[SocialProfile]:
@@ -265,7 +264,7 @@ class FacebookScraper:
         try:
             self._init_driver()
             self.driver.get(page_url)
-            time.sleep(3)  # Wait for page to load
+            wait_for_page_ready(self.driver, max_wait=5)
             
             html = self.driver.page_source
             soup = BeautifulSoup(html, "html.parser")
@@ -288,7 +287,7 @@ class FacebookScraper:
             )
             
         except Exception as e:
-            print(f"Error fetching Facebook page: {e}")
+            logger.error("Error fetching Facebook page: %s", e)
             return None
         finally:
             self._close_driver()
@@ -301,23 +300,17 @@ class TwitterScraper:
         self.driver = None
     
     def _init_driver(self):
-        """Initialize Selenium WebDriver"""
-        from selenium import webdriver
-        from selenium.webdriver.chrome.options import Options
+        """Borrow a WebDriver from the shared pool with a random user agent"""
         from fake_useragent import UserAgent
+        from .driver_pool import get_driver_pool
         
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument(f"user-agent={UserAgent().random}")
-        
-        self.driver = webdriver.Chrome(options=options)
+        self.driver = get_driver_pool().acquire(user_agent=UserAgent().random)
     
     def _close_driver(self):
-        """Close the WebDriver"""
+        """Return the WebDriver to the pool"""
         if self.driver:
-            self.driver.quit()
+            from .driver_pool import get_driver_pool
+            get_driver_pool().release(self.driver)
             self.driver = None
     
     def get_profile(self, username: str) -> Optional[SocialProfile]:
@@ -326,7 +319,7 @@ class TwitterScraper:
             self._init_driver()
             url = f"https://twitter.com/{username}"
             self.driver.get(url)
-            time.sleep(5)  # Twitter needs more time to load
+            wait_for_page_ready(self.driver, max_wait=8)  # Twitter is a heavy SPA
             
             html = self.driver.page_source
             soup = BeautifulSoup(html, "html.parser")
@@ -348,7 +341,7 @@ class TwitterScraper:
             )
             
         except Exception as e:
-            print(f"Error fetching Twitter profile: {e}")
+            logger.error("Error fetching Twitter profile: %s", e)
             return None
         finally:
             self._close_driver()
@@ -0,0 +1,218 @@
+"""
+Crawl statistics
+
+Counters plus per-stage timing spans for one crawl, exportable as JSON or
+as Prometheus text exposition format.
+"""
+
+import json
+import math
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+# Fixed sleeps _load_page used to spend on every page (2 s + 1 s + 0.5 s)
+FIXED_WAIT_SECONDS = 3.5
+
+# Per-page stages, in pipeline order
+STAGES = ("driver_start", "fetch", "render_wait", "browser_extract", "page_source",
+          "parse", "extract", "links")
+
+# Histogram bucket upper bounds (seconds) for the Prometheus export
+SPAN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+@dataclass
+class StageTiming:
+    """Count, total, max and bucketed durations of one stage"""
+    count: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * len(SPAN_BUCKETS))
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        index = bisect.bisect_left(SPAN_BUCKETS, seconds)
+        if index < len(SPAN_BUCKETS):
+            self.buckets[index] += 1
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.seconds / self.count if self.count else 0.0
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding that fraction of spans (at most max_seconds)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(fraction * self.count))
+        cumulative = 0
+        for bound, count in zip(SPAN_BUCKETS, self.buckets):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def to_dict(self) -> dict:
+        return {"count": self.count, "seconds": round(self.seconds, 4),
+                "avg_seconds": round(self.avg_seconds, 4),
+                "p50_seconds": round(self.percentile(0.5), 4),
+                "p95_seconds": round(self.percentile(0.95), 4),
+                "max_seconds": round(self.max_seconds, 4)}
+
+
+@dataclass
+class CrawlStats:
+    """Counters for one crawl, safe to update from worker threads"""
+    pages_loaded: int = 0
+    render_wait_seconds: float = 0.0
+    load_seconds: float = 0.0
+    network_pages: int = 0
+    bytes_received: int = 0
+    requests: int = 0
+    blocked_requests: int = 0
+    html_bytes: int = 0
+    stages: Dict[str, StageTiming] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record_render_wait(self, seconds: float):
+        with self._lock:
+            self.pages_loaded += 1
+            self.render_wait_seconds += seconds
+        self.record_span("render_wait", seconds)
+
+    def record_page_load(self, seconds: float, usage=None):
+        """Navigation + readiness time and, if logged, network usage (NetworkUsage)"""
+        with self._lock:
+            self.load_seconds += seconds
+            if usage is not None:
+                self.network_pages += 1
+                self.bytes_received += usage.bytes_received
+                self.requests += usage.requests
+                self.blocked_requests += usage.blocked
+
+    def record_span(self, stage: str, seconds: float):
+        with self._lock:
+            timing = self.stages.get(stage)
+            if timing is None:
+                timing = self.stages[stage] = StageTiming()
+            timing.add(seconds)
+
+    @contextmanager
+    def span(self, stage: str):
+        """Time a with-block as one `stage` span"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(stage, time.perf_counter() - started)
+
+    def record_html(self, size: int):
+        """Size of a page's HTML (or in-browser extract) as handed to the parser"""
+        with self._lock:
+            self.html_bytes += size
+
+    def record_error(self, kind: str):
+        """Count a failure by class (retry.classify kind or exception name)"""
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    @property
+    def avg_render_wait(self) -> float:
+        return self.render_wait_seconds / self.pages_loaded if self.pages_loaded else 0.0
+
+    @property
+    def time_saved_seconds(self) -> float:
+        """Wait time saved compared to the old fixed sleeps"""
+        return self.pages_loaded * FIXED_WAIT_SECONDS - self.render_wait_seconds
+
+    @property
+    def avg_time_saved_per_page(self) -> float:
+        return FIXED_WAIT_SECONDS - self.avg_render_wait if self.pages_loaded else 0.0
+
+    @property
+    def avg_load_seconds(self) -> float:
+        return self.load_seconds / self.pages_loaded if self.pages_loaded else 0.0
+
+    @property
+    def avg_bytes_per_page(self) -> float:
+        return self.bytes_received / self.network_pages if self.network_pages else 0.0
+
+    @property
+    def avg_blocked_per_page(self) -> float:
+        return self.blocked_requests / self.network_pages if self.network_pages else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "pages_loaded": self.pages_loaded,
+            "render_wait_seconds": round(self.render_wait_seconds, 3),
+            "avg_render_wait": round(self.avg_render_wait, 3),
+            "time_saved_seconds": round(self.time_saved_seconds, 3),
+            "avg_time_saved_per_page": round(self.avg_time_saved_per_page, 3),
+            "avg_load_seconds": round(self.avg_load_seconds, 3),
+            "bytes_received": self.bytes_received,
+            "avg_bytes_per_page": round(self.avg_bytes_per_page),
+            "requests": self.requests,
+            "blocked_requests": self.blocked_requests,
+            "html_bytes": self.html_bytes,
+            "stages": {stage: timing.to_dict() for stage, timing in self._ordered_stages()},
+            "errors": dict(self.errors),
+        }
+
+    def _ordered_stages(self) -> list:
+        with self._lock:
+            stages = dict(self.stages)
+        order = {stage: i for i, stage in enumerate(STAGES)}
+        return sorted(stages.items(), key=lambda item: (order.get(item[0], len(order)), item[0]))
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_prometheus(self, prefix: str = "scraper") -> str:
+        """Prometheus text exposition format (stages as a seconds histogram)"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per crawl stage",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for stage, timing in self._ordered_stages():
+            cumulative = 0
+            for bound, count in zip(SPAN_BUCKETS, timing.buckets):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {timing.count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {timing.seconds:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {timing.count}')
+
+        counters = [
+            ("pages_loaded_total", "Pages loaded in the browser", self.pages_loaded),
+            ("html_bytes_total", "Bytes of HTML handed to the parser", self.html_bytes),
+            ("network_bytes_total", "Bytes received by the browser (when logged)", self.bytes_received),
+            ("network_requests_total", "Requests made by the browser (when logged)", self.requests),
+            ("blocked_requests_total", "Requests blocked by the render profile", self.blocked_requests),
+        ]
+        for name, help_text, value in counters:
+            lines += [f"# HELP {prefix}_{name} {help_text}", f"# TYPE {prefix}_{name} counter",
+                      f"{prefix}_{name} {value}"]
+
+        lines += [f"# HELP {prefix}_errors_total Fetch failures by class",
+                  f"# TYPE {prefix}_errors_total counter"]
+        with self._lock:
+            errors = sorted(self.errors.items())
+        for kind, count in errors:
+            lines.append(f'{prefix}_errors_total{{kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        text = (f"render wait {self.avg_render_wait:.2f}s/page, "
+                f"saved {self.avg_time_saved_per_page:.2f}s/page "
+                f"({self.time_saved_seconds:.1f}s total)")
+        if self.network_pages:
+            text += (f", load {self.avg_load_seconds:.2f}s/page, "
+                     f"{self.avg_bytes_per_page / 1024:.0f} KB/page, "
+                     f"{self.avg_blocked_per_page:.1f} requests blocked/page")
+        return text
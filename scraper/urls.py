@@ -0,0 +1,195 @@
+"""
+URL canonicalization and seen-URL tracking
+
+Canonical URLs make "/about", "/about/", "/About?utm_source=x" and
+"HTTPS://Example.com:443/about" the same frontier entry. Seen-URL sets stay
+exact (a Python set) for normal crawls and switch to a fixed-size Bloom
+filter for very large ones.
+"""
+
+import logging
+import re
+import math
+import string
+import hashlib
+from typing import Iterable, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode, quote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# Query parameters that only track the visitor, never change the page
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_ga", "_gl", "_hsenc", "_hsmi", "mkt_tok",
+    "ref", "ref_src", "spm", "sessionid", "phpsessid", "jsessionid",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "oly_")
+
+_MULTI_SLASH = re.compile(r"/{2,}")
+_ESCAPE = re.compile(r"%([0-9A-Fa-f]{2})")
+_STRAY_PERCENT = re.compile(r"%(?![0-9A-Fa-f]{2})")
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+
+
+def _is_tracking(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _remove_dot_segments(path: str) -> str:
+    segments = []
+    for segment in path.split("/"):
+        if segment == "..":
+            if len(segments) > 1:
+                segments.pop()
+        elif segment != ".":
+            segments.append(segment)
+    if path.endswith(("/.", "/..")):
+        segments.append("")
+    return "/".join(segments)
+
+
+def _normalize_escape(match: re.Match) -> str:
+    char = chr(int(match.group(1), 16))
+    return char if char in _UNRESERVED else "%" + match.group(1).upper()
+
+
+def _normalize_path(path: str) -> str:
+    # "%7e", "~" and "%7E" compare equal, but reserved escapes like %2F
+    # stay escaped ("a%2Fb" is one path segment, "a/b" two)
+    path = _STRAY_PERCENT.sub("%25", path)
+    path = quote(path, safe="/:@!$&'()*+,;=-._~%")
+    path = _ESCAPE.sub(_normalize_escape, path)
+    path = _MULTI_SLASH.sub("/", path)
+    path = _remove_dot_segments(path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return path
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> str:
+    """Canonical form of a URL (optionally relative to `base`)
+
+    Lowercases scheme and host, drops default ports, fragments, tracking
+    parameters and trailing slashes, resolves dot segments and sorts the
+    remaining query parameters.
+    """
+    if base:
+        url = urljoin(base, url)
+    parts = urlsplit(url.strip())
+
+    scheme = (parts.scheme or "https").lower()
+    host = (parts.hostname or "").lower().rstrip(".")
+    if ":" in host:
+        host = f"[{host}]"  # IPv6 literal
+    try:
+        port = parts.port
+    except ValueError:
+        # Malformed port (":abc", ":99999"): keep it as written
+        port = parts.netloc.rpartition("@")[2].rpartition(":")[2]
+    netloc = host
+    if port and str(port) != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+
+    path = _normalize_path(parts.path)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if not _is_tracking(k)]
+    query = urlencode(sorted(query))
+
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def url_host(url: str) -> str:
+    """Canonical host[:port] of a URL, for same-site checks"""
+    return urlsplit(canonicalize_url(url)).netloc
+
+
+class BloomFilter:
+    """Fixed-memory probabilistic set (false positives, no false negatives)"""
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class SeenURLs:
+    """Seen-URL set: exact up to `bloom_threshold` URLs, then a Bloom filter
+
+    Past the threshold a URL may very rarely be reported as seen when it is
+    not (error_rate), which only means that page is skipped.
+    """
+
+    def __init__(self, bloom_threshold: int = 100_000, bloom_capacity: int = 10_000_000,
+                 error_rate: float = 0.001):
+        self.bloom_threshold = bloom_threshold
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self._set = set()
+        self._bloom: Optional[BloomFilter] = None
+
+    @property
+    def is_bloom(self) -> bool:
+        return self._bloom is not None
+
+    def add(self, url: str):
+        if self._bloom is not None:
+            self._bloom.add(url)
+            return
+        self._set.add(url)
+        if len(self._set) > self.bloom_threshold:
+            logger.info("Seen-URL set passed %s URLs - switching to Bloom filter", f"{self.bloom_threshold:,}")
+            self._bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+            for seen in self._set:
+                self._bloom.add(seen)
+            self._set = set()
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def __contains__(self, url: str) -> bool:
+        if self._bloom is not None:
+            return url in self._bloom
+        return url in self._set
+
+    def __len__(self) -> int:
+        return len(self._bloom) if self._bloom is not None else len(self._set)
+
+    def __iter__(self):
+        """Exact URLs only (empty once switched to the Bloom filter)"""
+        return iter(self._set)
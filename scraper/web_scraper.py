@@ -2,22 +2,42 @@
 Simple Working Web Scraper
 """
 
+import logging
 import os
 import time
-from urllib.parse import urljoin, urlparse
-from typing import Dict, Optional, Callable, Set
-from dataclasses import dataclass
+import queue
+import threading
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from typing import Dict, Iterator, Optional, Callable, Set
+from dataclasses import dataclass, asdict
 
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import httpx
 from bs4 import BeautifulSoup
-import requests
 from dotenv import load_dotenv
 
+from .checkpoint import CrawlCheckpoint
+from .driver_pool import get_browser_pool, DEFAULT_USER_AGENT
+from .browser_extract import RenderedPage, extract_in_browser
+from .cdp_backend import CDPTab
+from .extraction import body_word_count, parse_html, parse_rendered
+from .extract_pool import get_extraction_pool
+from .fetch_strategy import get_fetch_verdicts, js_signals, says_about_domain
+from .frontier import CrawlFrontier
+from .http_cache import get_http_cache, cached_get
+from .proxy_fetch import get_proxy_fetcher
+from .incremental import CrawlState, CrawlDiff, content_fingerprint
+from .urls import canonicalize_url, url_host
+from .politeness import get_scheduler
+from .sitemap import SitemapReader, lastmod_boost
+from .readiness import wait_for_page_ready
+from .retry import CircuitOpen, RetryableStatus, RETRY_STATUS, retry_call
+from .render_profile import drain_network_log, read_network_usage
+from .stats import CrawlStats
+
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 @dataclass
@@ -54,275 +74,671 @@ def get_page_type(url: str) -> tuple:
         return 'other', 0.5
 
 
+# Anchor text words that point at high-value pages, scored like get_page_type
+ANCHOR_HINTS = {
+    'about': 0.9, 'team': 0.9, 'company': 0.9,
+    'service': 0.9, 'solution': 0.9,
+    'product': 0.9, 'feature': 0.9,
+    'pricing': 0.85, 'plans': 0.85,
+    'contact': 0.8,
+}
+DEPTH_PENALTY = 0.05
+
+
+def link_priority(url: str, anchor_text: str = "", depth: int = 0) -> float:
+    """Crawl priority of a link: page-type score, anchor hints, then depth"""
+    _, score = get_page_type(url)
+    text = anchor_text.lower()
+    for word, hint in ANCHOR_HINTS.items():
+        if hint > score and word in text:
+            score = hint
+    return score - DEPTH_PENALTY * depth
+
+
 class SmartWebScraper:
-    def __init__(self):
+    def __init__(self, max_links_per_page: Optional[int] = None,
+                 extraction: Optional[str] = None,
+                 browser_backend: Optional[str] = None):
         self.driver = None
+        # "selenium" (chromedriver) or "cdp" (DevTools websocket, several tabs per Chrome)
+        self.browser_backend = (browser_backend or os.getenv("BROWSER_BACKEND", "selenium")).lower()
+        self.max_links_per_page = max_links_per_page
+        # "browser": extract text and links in the page; "html": transfer page_source
+        self.extraction = (extraction or os.getenv("EXTRACTION_MODE", "browser")).lower()
+        # Worker processes parsing HTML during big crawls (see _start_crawl)
+        self.extraction_pool = None
+        # This crawl's Scrape.do budget and stats (the fetcher's default run outside crawls)
+        self.proxy_run = None
+        self.frontier: Optional[CrawlFrontier] = None
         self.scraped_pages: Dict[str, ScrapedPage] = {}
         self.visited: Set[str] = set()
         self.base_domain = ""
+        self._driver_pages = 0
+        self._pages_lock = threading.Lock()
+        self.crawl_stats = CrawlStats()
+        self.incremental = False
+        self.use_sitemaps = False
+        self.crawl_state: Optional[CrawlState] = None
+        self.last_diff: Optional[CrawlDiff] = None
+        self.checkpoint: Optional[CrawlCheckpoint] = None
+        self.crawl_id: Optional[str] = None
+        self._checkpointing = False
+        self._crawl_settings: dict = {}
+        self._resume_from: Optional[CrawlCheckpoint] = None
+    
+    def browser_pool(self):
+        """Shared pool of the configured browser backend"""
+        return get_browser_pool(self.browser_backend)
     
     def _create_driver(self):
-        """Create new browser instance with optional proxy support"""
-        options = Options()
-        options.add_argument("--headless=new")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-        
-        # Proxy support (if configured)
-        proxy_server = os.getenv("PROXY_SERVER")
-        if proxy_server:
-            options.add_argument(f"--proxy-server={proxy_server}")
-            print(f"  Using proxy: {proxy_server}")
-        
-        # For Streamlit Cloud compatibility
-        chromium_path = "/usr/bin/chromium"
-        if os.path.exists(chromium_path):
-            options.binary_location = chromium_path
-        
-        driver = webdriver.Chrome(options=options)
-        driver.set_page_load_timeout(30)
-        return driver
+        """Borrow a browser from the shared driver pool"""
+        self._driver_pages = 0
+        with self.crawl_stats.span("driver_start"):
+            return self.browser_pool().acquire()
     
     def _close_driver(self):
-        """Close browser"""
+        """Return browser to the pool"""
         if self.driver:
-            try:
-                self.driver.quit()
-            except:
-                pass
+            self.browser_pool().release(self.driver, pages=max(1, self._driver_pages))
             self.driver = None
     
-    def _load_page(self, url: str, use_proxy: bool = False) -> Optional[str]:
-        """Load a page and return HTML with smart proxy fallback"""
+    def _proxy(self):
+        """Scrape.do access for this crawl (a ProxyRun), or the shared fetcher"""
+        return self.proxy_run or get_proxy_fetcher()
+    
+    def _load_page(self, url: str, use_proxy: bool = False, driver=None):
+        """Load a page with smart proxy fallback
+        
+        Returns its HTML, or with browser extraction a RenderedPage (text and
+        links only), or None. _build_page accepts either.
+        """
+        driver = driver or self.driver
+        
+        cache = get_http_cache()
+        extract = self.extraction == "browser"
+        
+        # Recrawls: reuse a fresh (or revalidated) copy of the rendered page
+        if cache and not use_proxy:
+            cached = cache.lookup(url, kind="extracted" if extract else "rendered",
+                                  headers={"User-Agent": DEFAULT_USER_AGENT})
+            if cached:
+                logger.debug("Cache hit: %s", url)
+                return RenderedPage.from_json(cached) if extract else cached
         
-        # Try with Scrape.do if use_proxy=True
+        # Scrape.do only if use_proxy=True (concurrency and quota are budgeted).
+        # This is the fallback after the browser failed, so don't render again
         if use_proxy:
-            scrape_do_token = os.getenv("SCRAPE_DO_TOKEN")
-            if scrape_do_token:
-                try:
-                    print(f"  Loading with Scrape.do proxy: {url}")
-                    proxy_url = f"http://api.scrape.do?token={scrape_do_token}&url={url}"
-                    response = requests.get(proxy_url, timeout=30)
-                    if response.status_code == 200:
-                        print(f"  Got HTML via proxy: {len(response.text)} chars")
-                        return response.text
-                    else:
-                        print(f"  Proxy failed with status {response.status_code}")
-                except Exception as e:
-                    print(f"  Proxy error: {e}")
-        
-        # Regular Selenium scraping (default method)
+            cached = cache.lookup(url, kind="proxy") if cache else None
+            if cached:
+                logger.debug("Cache hit (saved a Scrape.do request): %s", url)
+                return cached
+            with self.crawl_stats.span("fetch"):
+                html = self._proxy().fetch(url)
+            if html and cache:
+                cache.put(url, html, kind="proxy")
+            return html or None
+        
+        # Regular Selenium scraping (default method), retrying transient failures
         try:
-            print(f"  Loading: {url}")
-            self.driver.get(url)
-            
-            # Wait for page
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            # Wait for content to load
-            time.sleep(2)
-            
-            # Scroll to trigger lazy loading
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
-            self.driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(0.5)
-            
-            html = self.driver.page_source
-            print(f"  Got HTML: {len(html)} chars")
-            return html
-            
+            html = retry_call(url, lambda: self._render(url, driver), stats=self.crawl_stats)
+        except CircuitOpen as e:
+            self.crawl_stats.record_error("circuit_open")
+            logger.warning("%s - skipping %s", e, url)
+            return None
         except Exception as e:
-            print(f"  Direct scraping failed: {e}")
+            logger.warning("Direct scraping failed for %s: %s", url, e)
             
             # Smart fallback - try with proxy if direct scraping failed
-            scrape_do_token = os.getenv("SCRAPE_DO_TOKEN")
-            if scrape_do_token and not use_proxy:
-                print(f"  Retrying with Scrape.do proxy...")
-                return self._load_page(url, use_proxy=True)
+            if self._proxy().available and not use_proxy:
+                logger.info("Retrying with Scrape.do proxy: %s", url)
+                return self._load_page(url, use_proxy=True, driver=driver)
             
             return None
+        
+        if cache:
+            # Validators and freshness come from a raw HTTP fetch of the same URL, if any
+            raw = cache.get(url)
+            validators = {"etag": raw.etag, "last-modified": raw.last_modified} if raw else {}
+            if raw and raw.max_age is not None:
+                validators["cache-control"] = f"max-age={raw.max_age:.0f}"
+            if not any(validators.values()):
+                # Nothing to revalidate with: keep it briefly, not for the whole cache TTL
+                validators = {"cache-control": "max-age=" + os.getenv("HTTP_CACHE_RENDERED_TTL", "600")}
+            if isinstance(html, RenderedPage):
+                cache.put(url, html.to_json(), validators, kind="extracted")
+            else:
+                cache.put(url, html, validators, kind="rendered")
+        return html
     
-    def _extract_text(self, html: str, url: str) -> tuple:
-        """Extract text from HTML"""
-        soup = BeautifulSoup(html, "html.parser")
-        
-        # Get title
-        title_tag = soup.find("title")
-        title = title_tag.get_text().strip() if title_tag else "Untitled"
-        title = title[:100]  # Limit length
-        
-        # Remove unwanted elements
-        for tag in soup.find_all(['script', 'style', 'nav', 'header', 'footer', 
-                                   'noscript', 'iframe', 'svg', 'form']):
-            tag.decompose()
-        
-        # Get text
-        body = soup.find('body')
-        if body:
-            text = body.get_text(separator='\n', strip=True)
+    def _render(self, url: str, driver):
+        """One browser page load; raises RetryableStatus on 429/5xx responses"""
+        logger.debug("Loading: %s", url)
+        if driver is self.driver:
+            self._driver_pages += 1
+        stats = self.crawl_stats
+        if isinstance(driver, CDPTab):
+            # Load and network idle come from DevTools events, not polling
+            started = time.time()
+            with stats.span("fetch"):
+                driver.get(url)
+            waited = driver.wait_until_idle()
+            usage = driver.network_usage()
         else:
-            text = soup.get_text(separator='\n', strip=True)
-        
-        # Clean text
-        lines = []
-        for line in text.split('\n'):
-            line = line.strip()
-            if len(line) > 5:
-                lines.append(line)
+            drain_network_log(driver)
+            started = time.time()
+            with stats.span("fetch"):
+                driver.get(url)
+            
+            # Wait until loaded, network idle and lazy content settled
+            waited = wait_for_page_ready(driver)
+            usage = read_network_usage(driver)
+        stats.record_render_wait(waited)
+        stats.record_page_load(time.time() - started, usage)
         
-        content = '\n'.join(lines)
+        if usage:
+            # Throttling responses pause the host when the caller's slot is released
+            get_scheduler().record_response(usage.document_status, usage.retry_after)
+        if usage and usage.document_status in RETRY_STATUS:
+            raise RetryableStatus(usage.document_status, usage.retry_after)
         
-        # Add page context
-        full_content = f"=== {title} ===\nURL: {url}\n\n{content}"
+        if self.extraction == "browser":
+            with stats.span("browser_extract"):
+                page = extract_in_browser(driver, url, self.base_domain)
+            if page:
+                logger.debug("Extracted in browser: %d chars, %d links (ready in %.2fs)",
+                             len(page.text), len(page.links), waited)
+                return page
         
-        return title, full_content
+        with stats.span("page_source"):
+            html = driver.page_source
+        logger.debug("Got HTML: %d chars (ready in %.2fs)", len(html), waited)
+        return html
     
-    def _find_links(self, html: str, current_url: str) -> list:
-        """Find internal links"""
-        soup = BeautifulSoup(html, "html.parser")
-        links = []
+    def _parse(self, html, url: str, spans: Optional[dict] = None) -> tuple:
+        """Parse a page once into (title, content, {link: anchor_text}, canonical_url)"""
+        if isinstance(html, RenderedPage):
+            return parse_rendered(html, url, self.base_domain, spans=spans)
+        if self.extraction_pool:
+            return self.extraction_pool.parse(html, url, self.base_domain, spans=spans)
+        return parse_html(html, url, self.base_domain, spans=spans)
+    
+    def _extract_text(self, html, url: str) -> tuple:
+        """Extract title and text from HTML (or a RenderedPage)"""
+        title, content, _, _ = self._parse(html, url)
+        return title, content
+    
+    def _select_links(self, anchors: Dict[str, str]) -> list:
+        """Unvisited, robots-allowed links as (url, anchor_text), most promising first"""
+        allowed = get_scheduler().allowed
+        links = [(url, text) for url, text in anchors.items()
+                 if url not in self.visited and allowed(url)]
+        links.sort(key=lambda l: link_priority(*l), reverse=True)
+        if self.max_links_per_page:
+            links = links[:self.max_links_per_page]
+        return links
+    
+    def _is_unchanged(self, url: str, html) -> bool:
+        """Incremental crawls: same content as last time (nothing is recorded)"""
+        state = self.crawl_state
+        if not state:
+            return False
+        rendered = isinstance(html, RenderedPage)
+        return state.is_unchanged(url, content_fingerprint(html.to_json() if rendered else html))
+    
+    def _duplicate_of(self, url: str, canonical: Optional[str]) -> Optional[str]:
+        """The already scraped page this one is a canonical duplicate of, if any"""
+        if canonical and canonical != url and canonical in self.scraped_pages:
+            return canonical
+        return None
+    
+    def _build_page(self, url: str, html, parsed: Optional[tuple] = None) -> tuple:
+        """Turn loaded HTML (or a RenderedPage) into a ScrapedPage plus the links found on it
         
-        for a in soup.find_all('a', href=True):
-            href = a['href'].strip()
-            
-            if not href or href.startswith('#') or href.startswith('javascript:'):
-                continue
-            if href.startswith('mailto:') or href.startswith('tel:'):
-                continue
-            
-            # Make absolute
-            full_url = urljoin(current_url, href)
-            parsed = urlparse(full_url)
-            
-            # Same domain only
-            if parsed.netloc != self.base_domain:
-                continue
-            
-            # Skip files
-            path = parsed.path.lower()
-            if any(path.endswith(ext) for ext in ['.pdf', '.jpg', '.png', '.gif', '.css', '.js']):
-                continue
-            
-            # Clean URL
-            clean = f"https://{parsed.netloc}{parsed.path.rstrip('/')}"
-            if clean and clean not in self.visited and clean not in links:
-                links.append(clean)
+        `parsed` is an earlier (title, content, anchors, canonical, spans) of the
+        same HTML, to avoid parsing it again. Incremental state is recorded
+        here, so call this once per page, with the HTML the page is kept from.
+        """
+        rendered = isinstance(html, RenderedPage)
+        state = self.crawl_state
         
-        return links[:20]  # Limit links per page
+        # Extract content and links from a single parse
+        if parsed:
+            title, content, anchors, canonical, spans = parsed
+        else:
+            spans = {}
+            title, content, anchors, canonical = self._parse(html, url, spans)
+        started = time.perf_counter()
+        links = self._select_links(anchors)
+        spans["links"] = spans.get("links", 0.0) + time.perf_counter() - started
+        self.crawl_stats.record_html(html.size if rendered else len(html))
+        for stage, seconds in spans.items():
+            self.crawl_stats.record_span(stage, seconds)
+        word_count = len(content.split())
+        
+        if canonical and canonical != url:
+            if self._duplicate_of(url, canonical):
+                logger.info("%s is a duplicate of %s - skipping", url, canonical)
+                return None, []
+            if self.frontier:
+                self.frontier.mark_seen(canonical)
+        
+        logger.debug("Title: %s, words: %d", title, word_count)
+        
+        if word_count < 20:
+            logger.info("Too short - skipping %s", url)
+            return None, []
+        
+        # Get page type
+        page_type, score = get_page_type(url)
+        logger.debug("Type: %s", page_type)
+        
+        logger.debug("Found %d links", len(links))
+        
+        page = ScrapedPage(
+            url=url,
+            title=title,
+            content=content,
+            content_type=page_type,
+            word_count=word_count,
+            links_found=len(links),
+            scraped_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+            value_score=score
+        )
+        if state:
+            state.record(url, content_fingerprint(html.to_json() if rendered else html), asdict(page))
+        return page, links
     
     def scrape_website(self, start_url: str, max_pages: int = 10, 
-                       progress_callback: Callable = None) -> Dict[str, ScrapedPage]:
-        """Scrape multiple pages from a website"""
+                       progress_callback: Callable = None,
+                       with_stats: bool = False,
+                       **options):
+        """Scrape multiple pages from a website (see iter_scrape_website for options)
+        
+        Returns scraped pages by URL, or (pages, CrawlStats) with with_stats=True.
+        """
+        for _ in self.iter_scrape_website(start_url, max_pages, progress_callback, **options):
+            pass
+        if with_stats:
+            return self.scraped_pages, self.crawl_stats
+        return self.scraped_pages
+    
+    def iter_scrape_website(self, start_url: str, max_pages: int = 10,
+                            progress_callback: Callable = None,
+                            engine: Optional[str] = None,
+                            concurrency: int = 10,
+                            per_host_limit: int = 4,
+                            workers: Optional[int] = None,
+                            incremental: bool = False,
+                            use_sitemaps: Optional[bool] = None,
+                            checkpoint: Optional[bool] = None) -> Iterator[ScrapedPage]:
+        """Scrape multiple pages from a website, yielding each page once extracted
+        
+        Pages are also collected in self.scraped_pages. Stopping early
+        (break / close()) returns the browsers and leaves the crawl's
+        checkpoint resumable.
+        
+        engine="browser" renders every page in Chrome, using `workers`
+        browsers in parallel (default CRAWL_WORKERS, then 1). engine="auto"
+        (or "async") fetches pages concurrently over HTTP and only renders
+        pages that need JavaScript, remembering per domain which sites need
+        the browser. engine defaults to the CRAWL_ENGINE env var, then "auto".
+        
+        With incremental=True, self.last_diff lists the pages added, changed,
+        removed and unchanged since the last crawl of the site.
+        
+        Unless use_sitemaps=False (or SITEMAP_DISCOVERY=false), the frontier
+        is seeded from robots.txt/sitemap.xml before the first page loads.
+        robots.txt Disallow rules are honoured throughout.
+        
+        Unless checkpoint=False (or CRAWL_CHECKPOINTS=false), crawls of
+        CRAWL_CHECKPOINT_MIN_PAGES pages or more save their progress as they
+        run; self.crawl_id can be passed to resume() to continue an
+        interrupted crawl. checkpoint=True checkpoints any crawl.
+        """
+        self.incremental = incremental
+        if use_sitemaps is None:
+            use_sitemaps = os.getenv("SITEMAP_DISCOVERY", "true").lower() != "false"
+        self.use_sitemaps = use_sitemaps
+        engine = engine or os.getenv("CRAWL_ENGINE", "auto")
+        workers = workers or int(os.getenv("CRAWL_WORKERS", "1"))
+        if checkpoint is None:
+            checkpoint = (os.getenv("CRAWL_CHECKPOINTS", "true").lower() != "false"
+                          and max_pages >= int(os.getenv("CRAWL_CHECKPOINT_MIN_PAGES", "20")))
+        self._checkpointing = checkpoint
+        self._crawl_settings = {
+            "start_url": start_url, "max_pages": max_pages, "engine": engine,
+            "concurrency": concurrency, "per_host_limit": per_host_limit,
+            "workers": workers, "incremental": incremental, "use_sitemaps": use_sitemaps,
+        }
+        try:
+            yield from self._crawl(start_url, max_pages, progress_callback, engine,
+                                   concurrency, per_host_limit, workers)
+        finally:
+            # Stopped early: write buffered checkpoint pages so resume() has them
+            if self.checkpoint:
+                self.checkpoint.flush()
+    
+    def _crawl(self, start_url: str, max_pages: int, progress_callback: Optional[Callable],
+               engine: str, concurrency: int, per_host_limit: int,
+               workers: int) -> Iterator[ScrapedPage]:
+        """Run the crawl with the chosen engine (see iter_scrape_website)"""
+        if engine in ("auto", "async"):
+            from .async_engine import AsyncCrawlEngine
+            crawler = AsyncCrawlEngine(self, concurrency=concurrency,
+                                       per_host_limit=per_host_limit)
+            yield from crawler.iter_pages(start_url, max_pages, progress_callback)
+            return
+        
+        # Browser extraction reads rendered pages, so there's no HTML to parse
+        frontier = self._start_crawl(start_url, max_pages,
+                                     parses_html=self.extraction == "html")
+        
+        logger.info("Starting scrape of %s (max pages: %d, workers: %d)",
+                    self.base_domain, max_pages, workers)
+        
+        if workers > 1:
+            yield from self._scrape_parallel(frontier, workers, progress_callback)
+        elif self.extraction_pool:
+            yield from self._scrape_pipelined(frontier, progress_callback)
+        else:
+            try:
+                self.driver = self._create_driver()
+                
+                while True:
+                    url = frontier.pop()
+                    if not url:
+                        break
+                    
+                    logger.info("[%d/%d] %s", frontier.page_count, max_pages, url)
+                    
+                    if progress_callback:
+                        progress_callback(url, frontier.page_count - 1, len(frontier), max_pages)
+                    
+                    page = None
+                    try:
+                        page = self._scrape_url(url, frontier)
+                    except Exception as e:
+                        logger.warning("Error on %s: %s", url, e)
+                    finally:
+                        frontier.done(url)
+                    if page:
+                        yield page
+            finally:
+                self._close_driver()
         
-        # Parse start URL
-        parsed = urlparse(start_url)
+        self._finish_crawl()
+        logger.info("Scrape complete: %d pages", len(self.scraped_pages))
+        logger.info("Stats: %s", self.crawl_stats.summary())
+    
+    def resume(self, crawl_id: str, progress_callback: Callable = None,
+               max_pages: Optional[int] = None) -> Dict[str, ScrapedPage]:
+        """Continue a checkpointed crawl where it stopped
+        
+        Pages scraped before the interruption are restored, and the crawl
+        goes on with its original settings (optionally a larger max_pages).
+        """
+        checkpoint = CrawlCheckpoint.open(crawl_id)
+        if max_pages:
+            checkpoint.update_settings(max_pages=max_pages)
+        self._resume_from = checkpoint
+        return self.scrape_website(progress_callback=progress_callback, checkpoint=True,
+                                   **checkpoint.settings)
+    
+    def _start_crawl(self, start_url: str, max_pages: int,
+                     parses_html: bool = True) -> CrawlFrontier:
+        """Reset crawl state and seed a frontier with the site's homepage
+        
+        When resuming, the frontier and pages come from the checkpoint instead.
+        parses_html=False means no raw HTML will be parsed, so no extraction
+        pool is started.
+        """
+        if "://" not in start_url:
+            start_url = f"https://{start_url}"
+        parsed = urlparse(canonicalize_url(start_url))
         self.base_domain = parsed.netloc
-        homepage = f"https://{self.base_domain}"
+        homepage = f"{parsed.scheme}://{self.base_domain}/"
+        resume_from, self._resume_from = self._resume_from, None
+        
+        from .page_store import new_page_store
+        self.scraped_pages = new_page_store()
+        self.crawl_stats = CrawlStats()
+        # Worker processes only pay off once there are enough pages to parse
+        big_crawl = max_pages >= int(os.getenv("EXTRACTION_POOL_MIN_PAGES", "50"))
+        self.extraction_pool = get_extraction_pool() if big_crawl and parses_html else None
+        self.proxy_run = get_proxy_fetcher().start_run()
+        self.frontier = CrawlFrontier(max_pages, score_fn=link_priority)
+        self.visited = self.frontier.visited
+        self.crawl_state = CrawlState(self.base_domain) if self.incremental else None
+        self.last_diff = None
+        
+        if resume_from:
+            self.checkpoint = resume_from
+            pages = resume_from.restore(self.frontier)
+            for url, page in pages.items():
+                self.scraped_pages[url] = ScrapedPage(**page)
+            logger.info("Resumed crawl %s: %d pages done, %d queued",
+                        resume_from.crawl_id, len(pages), len(self.frontier))
+            if self.crawl_state:
+                # Pages scraped before the restart were never fingerprinted
+                logger.info("Change tracking is not available for resumed crawls")
+                self.crawl_state = None
+        else:
+            self.frontier.add(homepage)
+            if self.use_sitemaps:
+                self._seed_from_sitemaps(f"{parsed.scheme}://{self.base_domain}")
+            self.checkpoint = (CrawlCheckpoint.create(self._crawl_settings, domain=self.base_domain)
+                               if self._checkpointing else None)
+        self.crawl_id = self.checkpoint.crawl_id if self.checkpoint else None
+        return self.frontier
+    
+    def _seed_from_sitemaps(self, origin: str):
+        """Queue robots-allowed sitemap URLs, recently modified ones first"""
+        scheduler = get_scheduler()
+        reader = SitemapReader(robots=scheduler.robots,
+                               max_urls=int(os.getenv("SITEMAP_MAX_URLS", "5000")))
+        seeded = 0
+        for loc, lastmod in reader.iter_urls(origin):
+            try:
+                url = canonicalize_url(loc)
+            except ValueError:
+                continue
+            if url_host(url) != self.base_domain or not scheduler.allowed(url):
+                continue
+            seeded += self.frontier.add(url, depth=1, boost=lastmod_boost(lastmod))
+        logger.info("Seeded %d URLs from sitemaps", seeded)
+    
+    def _finish_crawl(self):
+        """Save incremental crawl state and report what changed"""
+        run = self._proxy()
+        proxy = run.stats() if run.available else {}
+        if proxy.get("run_calls") or proxy.get("refused"):
+            logger.info("Scrape.do: %d calls this crawl (%d refused), %d/%d used this month",
+                        proxy["run_calls"], proxy["refused"], proxy["month_used"], proxy["monthly_quota"])
+        if self.extraction_pool:
+            logger.info("Extraction pool: %s", self.extraction_pool.stats())
+        if self.checkpoint:
+            self.checkpoint.finish(self.frontier)
+        if self.crawl_state:
+            complete = not self.frontier.exhausted
+            self.last_diff = self.crawl_state.finish(self.visited, complete)
+            logger.info("Changes since last crawl: %s", self.last_diff.summary())
+    
+    def _scrape_url(self, url: str, frontier: CrawlFrontier, driver=None) -> Optional[ScrapedPage]:
+        """Load, extract and store one page, queueing the links it finds"""
+        with get_scheduler().slot(url):
+            html = self._load_page(url, driver=driver)
+        if not html:
+            logger.warning("Failed to load %s - skipping", url)
+            return None
+        return self._extract_page(url, html, frontier)
+    
+    def _extract_page(self, url: str, html, frontier: CrawlFrontier) -> Optional[ScrapedPage]:
+        """Extract and store a loaded page, queueing the links it finds"""
+        page, links = self._build_page(url, html)
+        if page:
+            page = self._store_page(url, page, links, frontier)
+        return page
+    
+    def _store_page(self, url: str, page: ScrapedPage, links: list,
+                    frontier: CrawlFrontier) -> ScrapedPage:
+        """Keep a scraped page, checkpoint it and queue its links
+        
+        Returns the stored page (without its content in RAM when the page
+        store spills to disk).
+        """
+        if self.checkpoint:
+            self.checkpoint.record_page(url, asdict(page), links, frontier.depths.get(url, 0))
+        with self._pages_lock:
+            self.scraped_pages[url] = page
+            page = self.scraped_pages[url]
+        frontier.add_many(links, parent=url)
+        if self.checkpoint:
+            self.checkpoint.maybe_save(frontier)
+        return page
+    
+    def _scrape_pipelined(self, frontier: CrawlFrontier,
+                          progress_callback: Callable = None) -> Iterator[ScrapedPage]:
+        """Crawl with one browser that loads the next page while earlier ones are extracted
         
-        # Initialize
-        self.scraped_pages = {}
-        self.visited = set()
-        queue = deque([homepage])
+        Loaded pages go to the extraction pool; once max_pending of them are
+        waiting, the browser stops until the oldest is done. Pages are
+        yielded in the order they were loaded.
+        """
+        max_pending = self.extraction_pool.max_pending
+        extractor = ThreadPoolExecutor(max_pending, thread_name_prefix="extract")
+        pending = deque()
         
-        print(f"\n=== Starting scrape of {self.base_domain} ===")
-        print(f"Max pages: {max_pages}\n")
+        def finish():
+            url, future = pending.popleft()
+            try:
+                return future.result()
+            except Exception as e:
+                logger.warning("Extraction failed for %s: %s", url, e)
+            finally:
+                frontier.done(url)
         
         try:
             self.driver = self._create_driver()
             
-            page_count = 0
-            while queue and page_count < max_pages:
-                url = queue.popleft()
+            while True:
+                while pending and (pending[0][1].done() or len(pending) >= max_pending):
+                    page = finish()
+                    if page:
+                        yield page
                 
-                if url in self.visited:
+                url = frontier.pop()
+                if not url:
+                    if not pending:
+                        break
+                    page = finish()  # its links may refill the frontier
+                    if page:
+                        yield page
                     continue
                 
-                self.visited.add(url)
-                page_count += 1
-                
-                print(f"\n[{page_count}/{max_pages}] {url}")
-                
+                logger.info("[%d/%d] %s", frontier.page_count, frontier.max_pages, url)
                 if progress_callback:
-                    progress_callback(url, page_count - 1, len(queue), max_pages)
+                    progress_callback(url, frontier.page_count - 1, len(frontier), frontier.max_pages)
                 
-                # Load page
-                html = self._load_page(url)
+                with get_scheduler().slot(url):
+                    html = self._load_page(url)
                 if not html:
-                    print("  FAILED - skipping")
+                    logger.warning("Failed to load %s - skipping", url)
+                    frontier.done(url)
                     continue
-                
-                # Extract content
-                title, content = self._extract_text(html, url)
-                word_count = len(content.split())
-                
-                print(f"  Title: {title}")
-                print(f"  Words: {word_count}")
-                
-                if word_count < 20:
-                    print("  Too short - skipping")
-                    continue
-                
-                # Get page type
-                page_type, score = get_page_type(url)
-                print(f"  Type: {page_type}")
-                
-                # Find links
-                links = self._find_links(html, url)
-                print(f"  Found {len(links)} links")
-                
-                # Store page
-                page = ScrapedPage(
-                    url=url,
-                    title=title,
-                    content=content,
-                    content_type=page_type,
-                    word_count=word_count,
-                    links_found=len(links),
-                    scraped_at=time.strftime("%Y-%m-%d %H:%M:%S"),
-                    value_score=score
-                )
-                self.scraped_pages[url] = page
-                
-                # Add new links to queue
-                for link in links:
-                    if link not in self.visited:
-                        queue.append(link)
-                
-                # Delay between pages
-                time.sleep(1)
-            
-            print(f"\n=== Scrape complete: {len(self.scraped_pages)} pages ===\n")
-            return self.scraped_pages
-            
+                pending.append((url, extractor.submit(self._extract_page, url, html, frontier)))
         finally:
             self._close_driver()
+            extractor.shutdown(wait=True, cancel_futures=True)
     
-    def scrape_single_page(self, url: str) -> Optional[ScrapedPage]:
-        """Scrape just one page"""
-        print(f"\nScraping single page: {url}")
+    def _scrape_parallel(self, frontier: CrawlFrontier, workers: int,
+                         progress_callback: Callable = None) -> Iterator[ScrapedPage]:
+        """Crawl with several pooled browsers pulling from one frontier
         
-        parsed = urlparse(url)
-        self.base_domain = parsed.netloc
+        Pages are yielded and progress_callback is called from the calling
+        thread (Streamlit can only update the page from its script thread).
+        """
+        events = queue.Queue()
+        pool = self.browser_pool()
+        if workers > pool.max_size:
+            logger.info("Limiting workers to driver pool size (%d)", pool.max_size)
+            workers = pool.max_size
+        
+        def worker():
+            driver = None
+            pages = 0
+            try:
+                with self.crawl_stats.span("driver_start"):
+                    driver = pool.acquire()
+                while True:
+                    url = frontier.next()
+                    if not url:
+                        break
+                    events.put(("progress", url, frontier.page_count, len(frontier)))
+                    logger.info("[%d/%d] %s", frontier.page_count, frontier.max_pages, url)
+                    try:
+                        pages += 1
+                        page = self._scrape_url(url, frontier, driver=driver)
+                        if page:
+                            events.put(("page", page))
+                    except Exception as e:
+                        logger.warning("Worker error on %s: %s", url, e)
+                    finally:
+                        frontier.done(url)
+            except Exception as e:
+                logger.error("Worker failed: %s", e)
+            finally:
+                if driver:
+                    pool.release(driver, pages=max(1, pages))
+                events.put(None)
+        
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        
+        finished = 0
+        try:
+            while finished < workers:
+                event = events.get()
+                if event is None:
+                    finished += 1
+                elif event[0] == "page":
+                    yield event[1]
+                elif progress_callback:
+                    _, url, count, queued = event
+                    progress_callback(url, count - 1, queued, frontier.max_pages)
+        finally:
+            if finished < workers:
+                frontier.stop()  # consumer stopped early
+            for t in threads:
+                t.join()
+    
+    def scrape_single_page(self, url: str, engine: Optional[str] = None) -> Optional[ScrapedPage]:
+        """Scrape just one page
+        
+        With engine="auto" (the CRAWL_ENGINE default) the page is fetched
+        over plain HTTP first and only loaded in Chrome if it needs JavaScript.
+        """
+        logger.info("Scraping single page: %s", url)
+        
+        self.base_domain = url_host(url)
+        
+        if (engine or os.getenv("CRAWL_ENGINE", "auto")) in ("auto", "async"):
+            page = self._scrape_single_http(url)
+            if page:
+                return page
         
         try:
             self.driver = self._create_driver()
             
-            html = self._load_page(url)
+            with get_scheduler().slot(url):
+                html = self._load_page(url)
             if not html:
                 return None
             
             title, content = self._extract_text(html, url)
             page_type, score = get_page_type(url)
             
-            print(f"  Title: {title}")
-            print(f"  Words: {len(content.split())}")
+            logger.debug("Title: %s, words: %d", title, len(content.split()))
             
             return ScrapedPage(
                 url=url,
@@ -338,12 +754,81 @@ class SmartWebScraper:
         finally:
             self._close_driver()
     
-    def get_all_content(self) -> str:
-        """Get all scraped content as one string"""
+    def _scrape_single_http(self, url: str) -> Optional[ScrapedPage]:
+        """Fetch a page without the browser; None if it needs rendering"""
+        verdicts = get_fetch_verdicts()
+        domain = url_host(url)
+        if verdicts.use_browser(domain):
+            logger.debug("%s needs JavaScript - using browser", domain)
+            return None
+        
+        def attempt():
+            with get_scheduler().slot(url) as slot, self.crawl_stats.span("fetch"):
+                response = cached_get(url, timeout=15, headers={"User-Agent": DEFAULT_USER_AGENT})
+                slot.record(response.status_code, response.headers.get("retry-after"))
+            if response.status_code in RETRY_STATUS:
+                raise RetryableStatus(response.status_code, response.headers.get("retry-after"))
+            return response
+        
+        try:
+            response = retry_call(url, attempt, stats=self.crawl_stats)
+        except (httpx.HTTPError, RetryableStatus, CircuitOpen) as e:
+            logger.info("%s - using browser for %s", e, url)
+            return None
+        if response.status_code != 200 or "html" not in response.headers.get("content-type", "html"):
+            logger.info("HTTP %s - using browser for %s", response.status_code, url)
+            return None
+        
+        title, content = self._extract_text(response.text, url)
+        word_count = len(content.split())
+        signals = js_signals(response.text, body_word_count(content))
+        needed_js = bool(signals)
+        if says_about_domain(signals):
+            verdicts.record(domain, needed_js)
+        if needed_js:
+            logger.info("Needs JavaScript - using browser for %s", url)
+            return None
+        
+        logger.debug("Title: %s, words: %d", title, word_count)
+        page_type, score = get_page_type(url)
+        return ScrapedPage(
+            url=url,
+            title=title,
+            content=content,
+            content_type=page_type,
+            word_count=word_count,
+            links_found=0,
+            scraped_at=time.strftime("%Y-%m-%d %H:%M:%S"),
+            value_score=score
+        )
+    
+    def get_changed_content(self) -> str:
+        """Content of pages added or changed since the last incremental crawl"""
+        if not self.last_diff:
+            return self.get_all_content()
+        urls = set(self.last_diff.added) | set(self.last_diff.changed)
+        parts = []
+        for page in sorted(self.scraped_pages.values(), key=lambda x: x.value_score, reverse=True):
+            if page.url in urls:
+                parts.append(page.content)
+                parts.append("\n" + "="*60 + "\n")
+        return "\n".join(parts)
+    
+    def get_all_content(self, max_chars: Optional[int] = None) -> str:
+        """Get all scraped content as one string, best pages first
+        
+        With max_chars, stops reading pages (from disk) once that much
+        content has been collected.
+        """
         parts = []
+        size = 0
         for page in sorted(self.scraped_pages.values(), key=lambda x: x.value_score, reverse=True):
-            parts.append(page.content)
+            if max_chars is not None and size >= max_chars:
+                break
+            content = page.content
+            parts.append(content)
             parts.append("\n" + "="*60 + "\n")
+            size += len(content) + 62
         return "\n".join(parts)
 
 
@@ -353,7 +838,7 @@ class QuickScraper:
     def scrape(self, url: str) -> tuple:
         try:
             headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            r = requests.get(url, timeout=10, headers=headers)
+            r = cached_get(url, timeout=10, headers=headers)
             soup = BeautifulSoup(r.text, "html.parser")
             
             title = soup.find("title")
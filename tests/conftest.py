@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep ledgers, caches and checkpoints out of the working tree"""
+    monkeypatch.setenv("HTTP_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
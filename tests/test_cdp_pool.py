@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+pytest.importorskip("websocket")
+
+from scraper import cdp_backend
+from scraper.cdp_backend import CDPBrowser, CDPError, CDPPool, get_cdp_pool
+
+
+class FakeBrowser:
+    def __init__(self, closed=False):
+        self.closed = closed
+        self.opening = 0
+        self.quits = 0
+        self._tabs = {}
+
+    @property
+    def tab_count(self):
+        return len(self._tabs) + self.opening
+
+    def quit(self):
+        self.quits += 1
+        self.closed = True
+
+
+def test_dead_browsers_are_quit_when_reaped():
+    pool = CDPPool(idle_timeout=0)
+    dead, live = FakeBrowser(closed=True), FakeBrowser()
+    pool._browsers = [dead, live]
+    pool.reap_idle()
+    assert pool._browsers == [live]
+    assert dead.quits == 1 and live.quits == 0
+
+
+def test_dead_browsers_are_quit_before_opening_tabs():
+    pool = CDPPool(idle_timeout=0, tabs_per_browser=2)
+    dead, live = FakeBrowser(closed=True), FakeBrowser()
+    live.new_tab = lambda user_agent: "tab"
+    pool._browsers = [dead, live]
+    assert pool._open_tab(None) == "tab"
+    assert pool._browsers == [live]
+    assert dead.quits == 1
+    assert live.opening == 0
+
+
+class FailedCall:
+    def wait(self, timeout):
+        raise CDPError("Page.enable: target crashed")
+
+
+def test_tab_that_fails_setup_is_closed_and_forgotten():
+    browser = CDPBrowser.__new__(CDPBrowser)  # no Chrome: commands are faked
+    browser._lock = threading.Lock()
+    browser._tabs = {}
+    browser.tabs_opened = 0
+    browser.profile = type("Profile", (), {"blocked_urls": lambda self: []})()
+    sent = []
+
+    def send(method, params=None, session_id=None, timeout=30):
+        sent.append(method)
+        return {"browserContextId": "ctx", "targetId": "target", "sessionId": "session"}
+
+    browser.send = send
+    browser.post = lambda method, params=None, session_id=None: FailedCall()
+
+    with pytest.raises(CDPError):
+        browser.new_tab()
+    assert browser._tabs == {}
+    assert sent[-2:] == ["Target.closeTarget", "Target.disposeBrowserContext"]
+
+
+def test_pool_size_has_its_own_browser_count(monkeypatch):
+    monkeypatch.setattr(cdp_backend, "_pool", None)
+    monkeypatch.setenv("DRIVER_POOL_MAX", "4")
+    monkeypatch.setenv("CDP_MAX_BROWSERS", "2")
+    monkeypatch.setenv("CDP_TABS_PER_BROWSER", "3")
+    pool = get_cdp_pool()
+    assert pool.max_size == 6
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from scraper.checkpoint import CrawlCheckpoint, list_checkpoints, prune_checkpoints
+from scraper.frontier import CrawlFrontier
+
+
+def page(url):
+    return {"url": url, "title": url, "content": "text"}
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite3")
+    return CrawlCheckpoint.create({"start_url": "https://example.com", "max_pages": 10},
+                                  domain="example.com", path=path, commit_pages=2)
+
+
+def stored_pages(checkpoint):
+    db = sqlite3.connect(checkpoint.path)
+    return db.execute("SELECT COUNT(*) FROM pages WHERE crawl_id = ?",
+                      (checkpoint.crawl_id,)).fetchone()[0]
+
+
+def test_open_unknown_crawl(checkpoint):
+    with pytest.raises(KeyError):
+        CrawlCheckpoint.open("missing", path=checkpoint.path)
+    assert CrawlCheckpoint.open(checkpoint.crawl_id, path=checkpoint.path).settings["max_pages"] == 10
+
+
+def test_pages_are_written_in_batches(checkpoint):
+    checkpoint.record_page("a", page("a"), [])
+    assert stored_pages(checkpoint) == 0
+    checkpoint.record_page("b", page("b"), [])
+    assert stored_pages(checkpoint) == 2
+    checkpoint.record_page("c", page("c"), [])
+    checkpoint.flush()
+    assert stored_pages(checkpoint) == 3
+
+
+def test_restore_requeues_unfinished_work(checkpoint):
+    frontier = CrawlFrontier(10)
+    frontier.add_many(["home", "a", "b"])
+    assert frontier.pop() == "home"
+    assert frontier.pop() == "a"
+    checkpoint.record_page("home", page("home"), [("c", "link text")], depth=0)
+    checkpoint.save(frontier)
+    # found after the snapshot: its links are not in the saved frontier
+    checkpoint.record_page("b", page("b"), [("d", "")], depth=1)
+    checkpoint.flush()
+
+    restored = CrawlFrontier(10)
+    pages = CrawlCheckpoint.open(checkpoint.crawl_id, path=checkpoint.path).restore(restored)
+    assert set(pages) == {"home", "b"}
+    queued = set()
+    while (url := restored.pop()) is not None:
+        queued.add(url)
+    assert queued == {"a", "c", "d"}  # "a" was in flight without a saved page
+
+
+def test_finish_drops_pages(checkpoint):
+    frontier = CrawlFrontier(10)
+    checkpoint.record_page("a", page("a"), [])
+    checkpoint.finish(frontier)
+    checkpoint.flush()
+    assert stored_pages(checkpoint) == 0
+    assert list_checkpoints(path=checkpoint.path) == []
+    finished, = list_checkpoints(status="complete", path=checkpoint.path)
+    assert finished["crawl_id"] == checkpoint.crawl_id
+
+
+def test_prune_old_checkpoints(checkpoint):
+    checkpoint.record_page("a", page("a"), [])
+    checkpoint.flush()
+    assert prune_checkpoints(3600, path=checkpoint.path) == 0
+    assert prune_checkpoints(0, path=checkpoint.path) == 1
+    assert list_checkpoints(status=None, path=checkpoint.path) == []
+    assert stored_pages(checkpoint) == 0
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from scraper import coordinator as coordinator_module
+from scraper.coordinator import (
+    MAX_ATTEMPTS,
+    CrawlCoordinator,
+    FrontierBackend,
+    SQLiteFrontierBackend,
+    run_local_workers,
+)
+
+
+@pytest.fixture
+def crawl(tmp_path):
+    backend = SQLiteFrontierBackend(str(tmp_path / "coordinator.sqlite3"))
+    return CrawlCoordinator.start("Example.com", max_pages=3, backend=backend)
+
+
+def test_start_queues_homepage(crawl):
+    assert crawl.settings["base_domain"] == "example.com"
+    assert crawl.status()["queued"] == 1
+    assert crawl.backend.claim(crawl.crawl_id, "w1", 5, 60) == [("https://example.com/", 0)]
+
+
+def test_claim_respects_budget_and_priority(crawl):
+    crawl.add_links([("https://example.com/about", "About us"),
+                     ("https://example.com/tag/x", ""),
+                     "https://example.com/pricing"], depth=1)
+    assert crawl.add_links(["https://example.com/pricing"], depth=1) == 0  # already queued
+    claimed = crawl.backend.claim(crawl.crawl_id, "w1", 10, 60)
+    assert len(claimed) == 3  # max_pages
+    assert crawl.backend.claim(crawl.crawl_id, "w2", 10, 60) == []
+
+
+def test_complete_requires_live_lease(crawl):
+    backend, crawl_id = crawl.backend, crawl.crawl_id
+    (url, _), = backend.claim(crawl_id, "w1", 1, 60)
+    assert not backend.complete(crawl_id, "w2", url, {"url": url})
+    assert backend.complete(crawl_id, "w1", url, {"url": url})
+    assert list(backend.pages(crawl_id)) == [{"url": url}]
+    assert not backend.complete(crawl_id, "w1", url, {"url": url})  # already done
+
+
+def test_expired_lease_is_reclaimed_and_late_result_dropped(crawl):
+    backend, crawl_id = crawl.backend, crawl.crawl_id
+    (url, _), = backend.claim(crawl_id, "w1", 1, 0.01)
+    time.sleep(0.02)
+    assert crawl.status()["expired"] == 1
+    assert backend.claim(crawl_id, "w2", 1, 60) == [(url, 0)]
+    assert not backend.complete(crawl_id, "w1", url, {"url": url, "by": "w1"})
+    assert backend.complete(crawl_id, "w2", url, {"url": url, "by": "w2"})
+    assert [page["by"] for page in backend.pages(crawl_id)] == ["w2"]
+
+
+def test_heartbeat_extends_only_own_leases(crawl):
+    backend, crawl_id = crawl.backend, crawl.crawl_id
+    (url, _), = backend.claim(crawl_id, "w1", 1, 0.05)
+    assert backend.heartbeat(crawl_id, "w2", [url], 60) == 0
+    assert backend.heartbeat(crawl_id, "w1", [url], 60) == 1
+    time.sleep(0.06)
+    assert crawl.status()["expired"] == 0
+
+
+def test_url_fails_after_max_attempts(crawl):
+    backend, crawl_id = crawl.backend, crawl.crawl_id
+    for _ in range(MAX_ATTEMPTS):
+        assert backend.claim(crawl_id, "w1", 1, 0.001)
+        time.sleep(0.005)
+    assert backend.claim(crawl_id, "w1", 1, 60) == []
+    assert crawl.status()["failed"] == 1
+    assert crawl.finished()
+
+
+def test_release_requeues(crawl):
+    backend, crawl_id = crawl.backend, crawl.crawl_id
+    (url, _), = backend.claim(crawl_id, "w1", 1, 60)
+    backend.release(crawl_id, "w1", [url])
+    assert crawl.status()["queued"] == 1
+    assert not crawl.finished()
+
+
+def test_run_local_workers_refuses_inside_worker(crawl, monkeypatch):
+    monkeypatch.setattr(coordinator_module.multiprocessing, "parent_process", lambda: object())
+    with pytest.raises(RuntimeError, match="__main__"):
+        run_local_workers(crawl)
+
+
+def test_backend_must_implement_every_method():
+    class PartialBackend(FrontierBackend):
+        def create_crawl(self, crawl_id, settings):
+            pass
+
+    with pytest.raises(TypeError, match="abstract"):
+        PartialBackend()
@@ -0,0 +1,138 @@
+"""Crawl, resume and incremental recrawl against the synthetic benchmark site
+
+Every page is static HTML, so the async engine never needs a browser.
+"""
+
+import pytest
+
+from benchmarks.synthetic_site import SiteConfig, SyntheticSite, server_url
+from scraper import politeness
+from scraper.checkpoint import list_checkpoints
+from scraper.politeness import PolitenessScheduler
+from scraper.web_scraper import SmartWebScraper
+
+PAGES = 30
+
+
+@pytest.fixture(scope="module")
+def site():
+    site = SyntheticSite(SiteConfig(pages=PAGES, js_fraction=0, slow_fraction=0,
+                                    huge_fraction=0, words_per_page=120))
+    server = site.serve()
+    site.url = server_url(server)
+    yield site
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def crawl_env(monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE", "false")
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    monkeypatch.setenv("PAGE_STORE", "memory")
+    monkeypatch.setattr(politeness, "_scheduler", PolitenessScheduler(delay=0, max_in_flight=8))
+
+
+def crawl(site, max_pages, **options):
+    options = {"engine": "async", "use_sitemaps": False, "checkpoint": False, **options}
+    scraper = SmartWebScraper()
+    pages = scraper.scrape_website(site.url, max_pages, **options)
+    return scraper, pages
+
+
+def test_crawl_follows_links_within_budget(site):
+    _, pages = crawl(site, 12)
+    assert len(pages) == 12
+    paths = {url[len(site.url):] or "/" for url in pages}
+    assert paths <= set(site.paths())
+    assert "/" in paths
+    page = pages[site.url + "/"]
+    assert page.title == "Blog page 0"
+    assert page.word_count > 50
+
+
+def test_crawl_covers_whole_site(site):
+    _, pages = crawl(site, PAGES + 10)
+    assert len(pages) == PAGES
+
+
+def test_interrupted_crawl_resumes(site):
+    scraper = SmartWebScraper()
+    crawl_iter = scraper.iter_scrape_website(site.url, 20, engine="async", use_sitemaps=False,
+                                             checkpoint=True)
+    first = [next(crawl_iter).url for _ in range(6)]
+    crawl_iter.close()  # stopped early, like a Streamlit rerun
+
+    crawl_id = scraper.crawl_id
+    saved = {c["crawl_id"]: c for c in list_checkpoints()}
+    assert saved[crawl_id]["pages"] >= len(first)
+
+    resumed = SmartWebScraper().resume(crawl_id)
+    assert len(resumed) == 20
+    assert set(first) <= set(resumed)
+    assert crawl_id not in {c["crawl_id"] for c in list_checkpoints()}  # finished
+
+
+def test_incremental_recrawl_reports_changes(site, monkeypatch):
+    scraper, _ = crawl(site, PAGES, incremental=True)
+    assert len(scraper.last_diff.added) == PAGES
+
+    scraper, pages = crawl(site, PAGES, incremental=True)
+    assert not scraper.last_diff.has_changes
+    assert len(scraper.last_diff.unchanged) == PAGES
+    assert len(pages) == PAGES
+
+    changed_path, removed_path = site.paths()[3], site.paths()[5]
+    original_page = site.page
+
+    def page(path):
+        path = path.split("?", 1)[0]
+        if path == removed_path:
+            return 404, {"Content-Type": "text/html"}, b"<html><body>Not found</body></html>"
+        status, headers, body = original_page(path)
+        if path == changed_path:
+            body = body.replace(b"</main>", b"<p>Fresh news paragraph.</p></main>")
+        return status, headers, body
+
+    monkeypatch.setattr(site, "page", page)
+    scraper, pages = crawl(site, PAGES, incremental=True)
+    diff = scraper.last_diff
+    assert diff.changed == [site.url + changed_path]
+    assert diff.removed == [site.url + removed_path]
+    assert "Fresh news paragraph." in pages[site.url + changed_path].content
+
+
+def test_browser_crawl_survives_a_failing_page(site):
+    """One page blowing up mid-crawl skips that page, not the rest of the crawl"""
+    scraper = SmartWebScraper(extraction="html")
+    scraper._create_driver = lambda: None
+    loaded = []
+
+    def load(url, **kwargs):
+        loaded.append(url)
+        if len(loaded) == 3:
+            raise RuntimeError("renderer crashed")
+        return site.page(url[len(site.url):] or "/")[2].decode()
+
+    scraper._load_page = load
+    pages = scraper.scrape_website(site.url, 10, engine="browser", use_sitemaps=False,
+                                   checkpoint=False, incremental=True)
+    assert len(loaded) == 10
+    assert len(pages) == 9 and loaded[2] not in pages
+    assert scraper.last_diff is not None  # _finish_crawl ran
+
+
+def test_extraction_pool_only_when_html_is_parsed(site, monkeypatch):
+    from scraper import web_scraper
+    started = []
+    monkeypatch.setattr(web_scraper, "get_extraction_pool", lambda: started.append(1) or "pool")
+
+    scraper = SmartWebScraper(extraction="browser")
+    scraper._start_crawl(site.url, 100, parses_html=False)
+    assert scraper.extraction_pool is None and not started
+
+    scraper._start_crawl(site.url, 10)
+    assert scraper.extraction_pool is None  # too small to pay for the workers
+
+    scraper._start_crawl(site.url, 100)
+    assert scraper.extraction_pool == "pool"
@@ -0,0 +1,118 @@
+import threading
+
+import pytest
+
+pytest.importorskip("selenium")
+
+from scraper import driver_pool
+from scraper.driver_pool import DEFAULT_USER_AGENT, DriverPool
+
+
+class FakeDriver:
+    """Stands in for a Chrome WebDriver; `broken` makes every command fail"""
+
+    def __init__(self):
+        self.broken = False
+        self.quits = 0
+        self.commands = []
+
+    def execute_cdp_cmd(self, cmd, params):
+        if self.broken:
+            raise RuntimeError("chrome not reachable")
+        self.commands.append((cmd, params))
+
+    def get(self, url):
+        if self.broken:
+            raise RuntimeError("chrome not reachable")
+
+    def get_log(self, kind):
+        return []
+
+    def quit(self):
+        self.quits += 1
+
+
+@pytest.fixture
+def started(monkeypatch):
+    drivers = []
+
+    def new_driver():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    monkeypatch.setattr(driver_pool, "new_chrome_driver", new_driver)
+    return drivers
+
+
+def test_released_driver_is_reused(started):
+    pool = DriverPool(max_size=2, idle_timeout=0)
+    first = pool.acquire()
+    pool.release(first)
+    assert pool.acquire() is first
+    assert len(started) == 1
+    assert pool.stats["created"] == 1 and pool.stats["reused"] == 1
+    assert ("Network.clearBrowserCookies", {}) in first.commands
+
+
+def test_user_agent_override_is_undone_on_release(started):
+    pool = DriverPool(idle_timeout=0)
+    driver = pool.acquire(user_agent="Bot/1.0")
+    pool.release(driver)
+    overrides = [params["userAgent"] for cmd, params in driver.commands
+                 if cmd == "Network.setUserAgentOverride"]
+    assert overrides == ["Bot/1.0", DEFAULT_USER_AGENT]
+
+
+def test_acquire_waits_for_a_driver_when_full(started):
+    pool = DriverPool(max_size=1, idle_timeout=0)
+    driver = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+
+    threading.Timer(0.05, pool.release, args=(driver,)).start()
+    assert pool.acquire(timeout=5) is driver
+    assert len(started) == 1
+
+
+def test_driver_is_recycled_after_max_pages(started):
+    pool = DriverPool(idle_timeout=0, max_pages_per_driver=3)
+    driver = pool.acquire()
+    pool.release(driver, pages=2)
+    assert pool.acquire() is driver
+    pool.release(driver, pages=1)
+    assert driver.quits == 1 and pool.stats["recycled"] == 1
+    assert pool.acquire() is not driver
+    assert len(started) == 2
+
+
+def test_broken_driver_is_discarded(started):
+    pool = DriverPool(idle_timeout=0)
+    driver = pool.acquire()
+    driver.broken = True
+    pool.release(driver)
+    assert driver.quits == 1 and pool.stats["discarded"] == 1
+    assert pool.size == 0
+    assert pool.acquire() is not driver
+
+
+def test_idle_drivers_are_reaped_down_to_min_size(started):
+    pool = DriverPool(min_size=1, max_size=3, idle_timeout=0)
+    drivers = [pool.acquire() for _ in range(3)]
+    for driver in drivers:
+        pool.release(driver)
+    assert pool.size == 3
+
+    pool.reap_idle()
+    assert pool.size == 1
+    assert pool.stats["reaped"] == 2
+    assert sum(driver.quits for driver in started) == 2
+
+
+def test_shutdown_quits_idle_drivers_and_refuses_borrows(started):
+    pool = DriverPool(idle_timeout=0)
+    driver = pool.acquire()
+    pool.release(driver)
+    pool.shutdown()
+    assert driver.quits == 1
+    with pytest.raises(RuntimeError):
+        pool.acquire()
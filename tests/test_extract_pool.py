@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from scraper import extract_pool
+from scraper.extract_pool import ExtractionPool, get_extraction_pool
+from scraper.extraction import parse_html
+
+DOMAIN = "example.com"
+
+
+def page(n: int) -> str:
+    return (f"<html><head><title>Page {n}</title></head><body><main>"
+            f"<p>Paragraph number {n} with some words.</p>"
+            f'<a href="/next-{n}">next</a></main></body></html>')
+
+
+@pytest.fixture
+def pool():
+    pool = ExtractionPool(workers=1, max_pending=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_results_keep_submission_order_under_backpressure(pool):
+    futures = [pool.submit(page(n), f"https://{DOMAIN}/{n}", DOMAIN) for n in range(6)]
+    titles = [future.result(timeout=60)[0][0] for future in futures]
+    assert titles == [f"Page {n}" for n in range(6)]
+    stats = pool.stats()
+    assert stats["submitted"] == 6 and stats["fallbacks"] == 0
+    assert stats["blocked_seconds"] > 0  # submits 3-6 waited for a free slot
+
+
+def test_parse_matches_in_process_parsing(pool):
+    url = f"https://{DOMAIN}/1"
+    spans = {}
+    assert pool.parse(page(1), url, DOMAIN, spans=spans) == parse_html(page(1), url, DOMAIN)
+    assert spans
+
+
+def test_parse_falls_back_after_worker_dies(pool):
+    killed = pool._executor.submit(os._exit, 1)
+    with pytest.raises(Exception):
+        killed.result(timeout=60)
+
+    url = f"https://{DOMAIN}/2"
+    assert pool.parse(page(2), url, DOMAIN) == parse_html(page(2), url, DOMAIN)
+    assert pool.stats()["fallbacks"] == 1
+    # The pool was restarted, so the next page goes to a worker again
+    assert pool.parse(page(3), url, DOMAIN)[0] == "Page 3"
+    assert pool.stats()["fallbacks"] == 1
+
+
+class UnstartableExecutor:
+    def submit(self, *args):
+        raise OSError("cannot start worker")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_parse_falls_back_when_workers_cannot_start(monkeypatch):
+    monkeypatch.setattr(ExtractionPool, "_new_executor", lambda self: UnstartableExecutor())
+    pool = ExtractionPool(workers=1, max_pending=1)
+    url = f"https://{DOMAIN}/4"
+    for _ in range(3):  # the slot is released each time, so this never blocks
+        assert pool.parse(page(4), url, DOMAIN) == parse_html(page(4), url, DOMAIN)
+    assert pool.stats()["fallbacks"] == 3
+
+
+def test_no_pool_when_it_cannot_be_created(monkeypatch):
+    def fail(self):
+        raise OSError("no semaphores")
+
+    monkeypatch.setattr(extract_pool, "_pool", None)
+    monkeypatch.setattr(ExtractionPool, "_new_executor", fail)
+    monkeypatch.setenv("EXTRACTION_WORKERS", "2")
+    assert get_extraction_pool() is None
+
+
+def test_no_pool_when_disabled(monkeypatch):
+    monkeypatch.setattr(extract_pool, "_pool", None)
+    monkeypatch.setenv("EXTRACTION_WORKERS", "0")
+    assert get_extraction_pool() is None
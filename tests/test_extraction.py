@@ -0,0 +1,67 @@
+import pytest
+
+from scraper import extraction
+from scraper.browser_extract import extract_in_browser
+from scraper.extraction import parse_html, parse_rendered
+
+PAGE = """<html><head><title> Widgets </title>
+<link rel="{rel}" href="/widgets/">
+</head><body>
+<nav><a href="/home">Home</a></nav>
+<p>Our widgets are great.</p>
+<a href="/widgets/blue?utm_source=x">Blue widget</a>
+<a href="https://other.com/">Elsewhere</a>
+<script>var hidden = 1;</script>
+</body></html>"""
+
+
+@pytest.mark.parametrize("rel", ["canonical", "Canonical", "CANONICAL alternate"])
+def test_canonical_is_case_insensitive(rel):
+    html = PAGE.format(rel=rel)
+    for parse in (extraction._parse_lxml, extraction._parse_bs4):
+        _, _, _, canonical = parse(html, "https://example.com/widgets?x=1", "example.com")
+        assert canonical == "https://example.com/widgets"
+
+
+def test_parse_html():
+    title, text, anchors, canonical = parse_html(PAGE.format(rel="canonical"),
+                                                 "https://example.com/widgets", "example.com")
+    assert title == "Widgets"
+    assert "Our widgets are great." in text
+    assert "hidden" not in text
+    assert list(anchors) == ["https://example.com/home", "https://example.com/widgets/blue"]
+    assert anchors["https://example.com/widgets/blue"] == "Blue widget"
+
+
+# What EXTRACT_SCRIPT returns for PAGE in Chrome: trimmed text nodes outside
+# SKIP_TAGS, resolved same-host hrefs with their text, the resolved canonical
+RENDERED_PAGE = {
+    "title": "Widgets",
+    "text": "Our widgets are great.\nBlue widget\nElsewhere",
+    "links": [["https://example.com/home", "Home"],
+              ["https://example.com/widgets/blue?utm_source=x", "Blue widget"]],
+    "canonical": "https://example.com/widgets/",
+}
+
+
+class ScriptDriver:
+    def execute_script(self, script, *args):
+        return RENDERED_PAGE
+
+
+@pytest.mark.parametrize("lxml", [True, False])
+def test_rendered_page_parses_like_its_html(lxml, monkeypatch):
+    if not lxml:
+        monkeypatch.setattr(extraction, "HAS_LXML", False)
+    url = "https://example.com/widgets"
+    page = extract_in_browser(ScriptDriver(), url, "example.com")
+    assert parse_rendered(page, url, "example.com") == parse_html(PAGE.format(rel="canonical"),
+                                                                   url, "example.com")
+
+
+@pytest.mark.parametrize("href", ["http://example.com:abc/x", "//example.com:99999/y", "http://[::1/z"])
+def test_malformed_links_are_dropped(href):
+    html = f'<html><body><a href="{href}">bad</a><a href="/ok">ok</a></body></html>'
+    for parse in (extraction._parse_lxml, extraction._parse_bs4):
+        _, _, anchors, _ = parse(html, "https://example.com/", "example.com")
+        assert list(anchors) == ["https://example.com/ok"]
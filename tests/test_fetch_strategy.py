@@ -0,0 +1,62 @@
+from scraper.extraction import body_word_count, parse_html
+from scraper.fetch_strategy import FetchVerdicts, js_signals, needs_javascript, says_about_domain
+
+BUNDLE = '<script src="/_next/static/chunks/main-abc123.js"></script>'
+
+
+def words(n: int) -> str:
+    return " ".join(f"word{i}" for i in range(n))
+
+
+def body_words(html: str) -> int:
+    _, content, _, _ = parse_html(html, "https://example.com/", "example.com")
+    return body_word_count(content)
+
+
+def test_spa_shell_needs_javascript():
+    html = f'<html><head><title>App</title>{BUNDLE}</head><body><div id="root"></div></body></html>'
+    signals = js_signals(html, body_words(html))
+    assert signals == ["thin-text", "spa-root", "framework-bundle"]
+    assert says_about_domain(signals)
+
+
+def test_noscript_notice_needs_javascript():
+    html = (f"<html><body><noscript>Please enable JavaScript to use this site.</noscript>"
+            f"<p>{words(80)}</p></body></html>")
+    signals = js_signals(html, body_words(html))
+    assert signals == ["noscript"]
+    assert needs_javascript(html, body_words(html))
+
+
+def test_short_static_page_is_rendered_but_says_nothing_about_the_site():
+    html = f"<html><head><title>Contact</title></head><body><p>{words(20)}</p></body></html>"
+    signals = js_signals(html, body_words(html))
+    assert signals == ["thin-text"]
+    assert not says_about_domain(signals)
+
+
+def test_long_page_needs_no_javascript_even_with_markers():
+    html = (f"<html><head>{BUNDLE}</head><body><div id='root'></div>"
+            f"<noscript>Please enable JavaScript.</noscript><p>{words(300)}</p></body></html>")
+    assert js_signals(html, body_words(html)) == []
+    assert says_about_domain([])
+
+
+def test_word_count_ignores_title_and_url_header():
+    title = words(30)
+    html = f"<html><head><title>{title}</title></head><body><p>{words(40)}</p></body></html>"
+    _, content, _, _ = parse_html(html, "https://example.com/a-long/page/url", "example.com")
+    assert len(content.split()) >= 50
+    assert body_word_count(content) == 40
+    assert js_signals(html, body_word_count(content)) == ["thin-text"]
+
+
+def test_domain_verdict_follows_most_pages(tmp_path):
+    verdicts = FetchVerdicts(path=str(tmp_path / "verdicts.sqlite3"), probe_every=3)
+    verdicts.record("spa.example", True)
+    verdicts.record("spa.example", True)
+    verdicts.record("spa.example", False)
+    assert verdicts.get("spa.example").needs_browser
+    # Every third page is still tried over HTTP first
+    assert [verdicts.use_browser("spa.example") for _ in range(3)] == [True, True, False]
+    assert not verdicts.use_browser("other.example")
@@ -0,0 +1,82 @@
+import threading
+
+from scraper.frontier import CrawlFrontier
+
+
+def test_fifo_without_score_fn():
+    frontier = CrawlFrontier(10)
+    for url in ("a", "b", "c"):
+        frontier.add(url)
+    assert [frontier.pop() for _ in range(4)] == ["a", "b", "c", None]
+
+
+def test_best_first_and_priority_raise():
+    scores = {"low": 1.0, "mid": 2.0, "high": 3.0}
+    frontier = CrawlFrontier(10, score_fn=lambda url, text, depth: scores[url])
+    for url in ("low", "mid", "high"):
+        assert frontier.add(url)
+    assert not frontier.add("low", boost=5.0)  # already queued, but now ranks first
+    assert len(frontier) == 3
+    assert [frontier.pop() for _ in range(3)] == ["low", "high", "mid"]
+
+
+def test_each_url_handed_out_once():
+    frontier = CrawlFrontier(10)
+    frontier.add("a")
+    assert frontier.pop() == "a"
+    assert not frontier.add("a")
+    frontier.mark_seen("b")
+    assert not frontier.add("b")
+    assert frontier.pop() is None
+
+
+def test_page_budget():
+    frontier = CrawlFrontier(2)
+    frontier.add_many(["a", "b", "c"])
+    assert frontier.pop() == "a" and frontier.pop() == "b"
+    assert frontier.exhausted
+    assert frontier.pop() is None
+
+
+def test_depths_follow_parents():
+    frontier = CrawlFrontier(10)
+    frontier.add("home")
+    frontier.add_many([("child", "text")], parent="home")
+    frontier.add_many(["grandchild"], parent="child")
+    assert frontier.depths == {"home": 0, "child": 1, "grandchild": 2}
+
+
+def test_next_waits_for_in_flight_pages():
+    frontier = CrawlFrontier(10)
+    frontier.add("a")
+    assert frontier.next() == "a"
+
+    def finish():
+        frontier.add("b")
+        frontier.done("a")
+
+    threading.Timer(0.05, finish).start()
+    assert frontier.next(timeout=2) == "b"
+    frontier.done("b")
+    assert frontier.next(timeout=2) is None
+
+
+def test_stop():
+    frontier = CrawlFrontier(10)
+    frontier.add_many(["a", "b"])
+    frontier.pop()
+    frontier.stop()
+    assert frontier.pop() is None
+
+
+def test_snapshot_and_restore():
+    frontier = CrawlFrontier(10)
+    frontier.add_many(["a", "b", "c"])
+    claimed = frontier.pop()
+    snapshot = frontier.snapshot()
+    assert snapshot["in_flight"] == [(claimed, 0.0, 0)]
+    assert snapshot["page_count"] == 1
+
+    restored = CrawlFrontier(10)
+    restored.restore(snapshot["queued"] + snapshot["in_flight"], [], 0)
+    assert sorted(restored.pop() for _ in range(3)) == ["a", "b", "c"]
@@ -0,0 +1,149 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper import http_cache
+from scraper.http_cache import HttpCache, cached_get, freshness_lifetime, storable
+
+
+class Origin:
+    """Local origin whose per-path response headers the tests set"""
+
+    def __init__(self):
+        self.pages = {}
+        self.requests = []
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                origin.requests.append((self.path, self.headers.get("If-None-Match")))
+                headers = dict(origin.pages[self.path])
+                etag = headers.get("ETag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                body = f"<html><body>{self.path}</body></html>".encode()
+                self.send_response(200)
+                headers.setdefault("Content-Type", "text/html; charset=utf-8")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def hits(self, path):
+        return [r for r in self.requests if r[0] == path]
+
+
+@pytest.fixture
+def origin(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, "_cache", HttpCache(str(tmp_path / "cache.sqlite3"), ttl=3600))
+    server = Origin()
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def test_freshness_lifetime():
+    assert freshness_lifetime({"cache-control": "public, max-age=60"}) == 60
+    assert freshness_lifetime({"cache-control": "no-cache"}) == 0
+    assert freshness_lifetime({"expires": "Thu, 01 Jan 1970 00:00:00 GMT"}) == 0
+    assert freshness_lifetime({"date": "Mon, 01 Jan 2024 00:00:00 GMT",
+                               "expires": "Mon, 01 Jan 2024 00:02:00 GMT"}) == 120
+    assert freshness_lifetime({}) is None
+
+
+def test_storable():
+    assert storable({"content-type": "text/html; charset=utf-8"})
+    assert not storable({"content-type": "text/html"}, status=404)
+    assert not storable({"content-type": "application/json"})
+    assert not storable({"content-type": "text/html", "cache-control": "no-store"})
+    assert not storable({"content-type": "text/html", "cache-control": "private, max-age=60"})
+
+
+def test_max_age_served_from_cache(origin):
+    origin.pages["/fresh"] = {"Cache-Control": "max-age=600"}
+    first = cached_get(origin.url + "/fresh")
+    second = cached_get(origin.url + "/fresh")
+    assert not first.from_cache and second.from_cache
+    assert second.text == first.text
+    assert len(origin.hits("/fresh")) == 1
+
+
+def test_no_store_and_private_not_cached(origin):
+    origin.pages["/secret"] = {"Cache-Control": "no-store"}
+    origin.pages["/mine"] = {"Cache-Control": "private, max-age=600"}
+    for path in ("/secret", "/mine"):
+        cached_get(origin.url + path)
+        assert not cached_get(origin.url + path).from_cache
+        assert len(origin.hits(path)) == 2
+
+
+def test_non_html_not_cached(origin):
+    origin.pages["/data"] = {"Content-Type": "application/json", "Cache-Control": "max-age=600"}
+    cached_get(origin.url + "/data")
+    assert not cached_get(origin.url + "/data").from_cache
+    assert http_cache._cache.get(origin.url + "/data") is None
+
+
+def test_validators_without_max_age_revalidate(origin):
+    origin.pages["/etag"] = {"ETag": '"v1"'}
+    cached_get(origin.url + "/etag")
+    second = cached_get(origin.url + "/etag")
+    assert second.from_cache
+    assert origin.hits("/etag") == [("/etag", None), ("/etag", '"v1"')]
+    assert http_cache._cache.revalidated == 1
+
+
+def test_no_validators_no_max_age_uses_ttl(origin):
+    origin.pages["/plain"] = {}
+    cached_get(origin.url + "/plain")
+    assert cached_get(origin.url + "/plain").from_cache
+    assert len(origin.hits("/plain")) == 1
+
+
+def test_opens_cache_file_without_max_age_column(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute("""CREATE TABLE responses (key TEXT PRIMARY KEY, url TEXT NOT NULL,
+                  body BLOB NOT NULL, etag TEXT, last_modified TEXT, status INTEGER NOT NULL,
+                  fetched_at REAL NOT NULL, accessed_at REAL NOT NULL, size INTEGER NOT NULL)""")
+    db.commit()
+    db.close()
+    cache = HttpCache(path)
+    cache.put("https://example.com/", "<html></html>", {"Cache-Control": "max-age=5"})
+    assert cache.get("https://example.com/").max_age == 5
+
+
+def rendered_entry(origin, path, monkeypatch):
+    from scraper.web_scraper import SmartWebScraper
+    scraper = SmartWebScraper(extraction="html")
+    monkeypatch.setattr(scraper, "_render", lambda url, driver: "<html><body>rendered</body></html>")
+    assert scraper._load_page(origin.url + path)
+    return http_cache._cache.get(origin.url + path, kind="rendered")
+
+
+def test_rendered_page_without_validators_is_kept_briefly(origin, monkeypatch):
+    monkeypatch.setenv("HTTP_CACHE_RENDERED_TTL", "120")
+    entry = rendered_entry(origin, "/app", monkeypatch)
+    assert entry.max_age == 120 and http_cache._cache.is_fresh(entry)
+    entry.fetched_at -= 121
+    assert not http_cache._cache.is_fresh(entry)  # not served for the 1 h cache TTL
+
+
+def test_rendered_page_keeps_validators_of_raw_response(origin, monkeypatch):
+    origin.pages["/etag"] = {"ETag": '"v1"'}
+    cached_get(origin.url + "/etag")
+    entry = rendered_entry(origin, "/etag", monkeypatch)
+    assert entry.etag == '"v1"' and entry.max_age is None
@@ -0,0 +1,98 @@
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper import http_client
+from scraper.http_client import DNSCache, build_async_client
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_port
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    calls = []
+    real = socket.getaddrinfo
+
+    def counting(host, *args, **kwargs):
+        calls.append(host)
+        return real(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, "getaddrinfo", counting)
+    return calls
+
+
+def test_cache_hits_until_ttl(lookups):
+    cache = DNSCache(ttl=0.05)
+    assert cache.lookup("localhost", 80)
+    cache.lookup("localhost", 80)
+    assert lookups == ["localhost"]
+    time.sleep(0.06)
+    cache.lookup("localhost", 80)
+    assert lookups == ["localhost", "localhost"]
+
+
+def test_cache_is_bounded(lookups):
+    cache = DNSCache(max_entries=2)
+    for port in (1, 2, 3):
+        cache.lookup("localhost", port)
+    assert len(cache) == 2
+    assert cache.cached("localhost", 1) is None
+    assert cache.cached("localhost", 3)
+
+
+def test_failed_lookups_are_not_cached():
+    cache = DNSCache()
+    with pytest.raises(OSError):
+        cache.lookup("nonexistent.invalid", 80)
+    assert len(cache) == 0
+
+
+def test_clients_use_cache_without_patching_socket(server, lookups, monkeypatch):
+    cache = DNSCache()
+    monkeypatch.setattr(http_client, "_dns_cache", cache)
+    original = socket.getaddrinfo
+    client = http_client._cache_dns(http_client.httpx.Client())
+    try:
+        for _ in range(2):
+            assert client.get(f"http://localhost:{server}/", headers={"Connection": "close"}).text == "ok"
+    finally:
+        client.close()
+    assert socket.getaddrinfo is original
+    # connecting to the cached address only "resolves" the numeric IP
+    assert lookups.count("localhost") == 1
+    assert cache.cached("localhost", server)
+
+
+def test_async_client_uses_cache(server, lookups, monkeypatch):
+    cache = DNSCache()
+    monkeypatch.setattr(http_client, "_dns_cache", cache)
+
+    async def main():
+        async with build_async_client(4) as client:
+            for _ in range(2):
+                response = await client.get(f"http://localhost:{server}/", headers={"Connection": "close"})
+                assert response.text == "ok"
+
+    asyncio.run(main())
+    assert lookups.count("localhost") == 1
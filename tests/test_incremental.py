@@ -0,0 +1,79 @@
+import json
+
+from scraper.incremental import CrawlState, content_fingerprint
+
+PAGE = {"url": "https://example.com/", "title": "Home", "content": "Lots of page text " * 500,
+        "content_type": "homepage", "word_count": 2000, "links_found": 3,
+        "scraped_at": "2026-01-01 00:00:00", "value_score": 1.0}
+
+
+def test_state_keeps_metadata_but_not_content(tmp_path):
+    state = CrawlState("example.com", state_dir=str(tmp_path))
+    state.record(PAGE["url"], "fp-1", PAGE)
+    state.finish(attempted={PAGE["url"]}, complete=True)
+
+    with open(state.path, encoding="utf-8") as f:
+        saved = json.load(f)["pages"][PAGE["url"]]
+    assert saved["fingerprint"] == "fp-1"
+    assert saved["page"]["title"] == "Home" and saved["page"]["word_count"] == 2000
+    assert "content" not in saved["page"] and "links" not in saved
+
+
+def test_old_state_with_content_is_loaded_without_it(tmp_path):
+    path = tmp_path / "example.com.json"
+    path.write_text(json.dumps({"pages": {PAGE["url"]: {
+        "fingerprint": "fp-1", "page": PAGE, "links": [["https://example.com/a", "A"]]}}}))
+    state = CrawlState("example.com", state_dir=str(tmp_path))
+    assert state.previous == {PAGE["url"]: {"fingerprint": "fp-1",
+                                            "page": {k: v for k, v in PAGE.items() if k != "content"}}}
+    assert state.is_unchanged(PAGE["url"], "fp-1")
+
+
+def test_fingerprint_ignores_volatile_markup():
+    page = '<html><head><style>a{color:red}</style></head><body><p>Hello   world</p></body></html>'
+    same = ('<html><head><style>a{color:blue}</style><script nonce="abc">track(1)</script>'
+            '</head><body><!-- rendered 12:00 --><p>Hello\n world</p></body></html>')
+    assert content_fingerprint(page) == content_fingerprint(same)
+    assert content_fingerprint(
+        '<meta name="csrf" csrf-token="x1"><p>Hi</p>') == content_fingerprint(
+        '<meta name="csrf" csrf-token="y2"><p>Hi</p>')
+    assert content_fingerprint(page) != content_fingerprint(page.replace("world", "there"))
+    assert content_fingerprint(page) != content_fingerprint(page.replace("<p>", '<p class="new">'))
+
+
+def previous_crawl(tmp_path, urls):
+    state = CrawlState("example.com", state_dir=str(tmp_path))
+    for url in urls:
+        state.record(url, f"fp-{url}", {"url": url, "content": "text"})
+    state.finish(attempted=set(urls), complete=True)
+    return CrawlState("example.com", state_dir=str(tmp_path))
+
+
+def test_finish_removes_pages_that_failed_this_crawl(tmp_path):
+    a, b, c = "https://example.com/a", "https://example.com/b", "https://example.com/c"
+    state = previous_crawl(tmp_path, [a, b, c])
+    state.record(a, f"fp-{a}", {"url": a})
+    state.record(b, "fp-new", {"url": b})
+    diff = state.finish(attempted={a, b, c}, complete=False)
+    assert (diff.unchanged, diff.changed, diff.removed, diff.added) == ([a], [b], [c], [])
+    assert set(CrawlState("example.com", state_dir=str(tmp_path)).previous) == {a, b}
+
+
+def test_finish_carries_over_pages_the_budget_never_reached(tmp_path):
+    a, b = "https://example.com/a", "https://example.com/b"
+    state = previous_crawl(tmp_path, [a, b])
+    state.record(a, f"fp-{a}", {"url": a})
+    diff = state.finish(attempted={a}, complete=False)
+    assert diff.removed == [] and not diff.has_changes
+    saved = CrawlState("example.com", state_dir=str(tmp_path)).previous
+    assert saved[b]["fingerprint"] == f"fp-{b}"
+
+
+def test_finish_removes_unseen_pages_after_a_complete_crawl(tmp_path):
+    a, b, new = "https://example.com/a", "https://example.com/b", "https://example.com/new"
+    state = previous_crawl(tmp_path, [a, b])
+    state.record(a, f"fp-{a}", {"url": a})
+    state.record(new, "fp-new", {"url": new})
+    diff = state.finish(attempted={a, new}, complete=True)
+    assert diff.removed == [b] and diff.added == [new]
+    assert set(CrawlState("example.com", state_dir=str(tmp_path)).previous) == {a, new}
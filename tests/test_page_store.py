@@ -0,0 +1,50 @@
+import dataclasses
+import os
+
+from scraper.page_store import PageStore, new_page_store
+from scraper.web_scraper import ScrapedPage
+
+
+def make_page(url, content):
+    return ScrapedPage(url=url, title=url, content=content, content_type="page",
+                       word_count=len(content.split()), links_found=0,
+                       scraped_at="2024-01-01 00:00:00", value_score=1)
+
+
+def test_content_round_trips_through_disk(tmp_path):
+    store = PageStore(directory=str(tmp_path), cache_pages=1)
+    for i in range(5):
+        store.add(make_page(f"u{i}", f"page {i} " * 100))
+    assert len(store) == 5 and "u3" in store
+    assert store["u3"].content == "page 3 " * 100
+    assert store["u0"].content == "page 0 " * 100
+    assert dataclasses.asdict(store["u1"])["content"] == "page 1 " * 100
+    assert "content" not in store["u1"].__dict__  # metadata only in memory
+    assert store.disk_bytes() > 0
+
+
+def test_segments_roll_over_and_close_removes_them(tmp_path):
+    store = PageStore(directory=str(tmp_path), segment_bytes=64)
+    for i in range(4):
+        store[f"u{i}"] = make_page(f"u{i}", os.urandom(64).hex())
+    assert len(os.listdir(store.directory)) == 4
+    assert store["u2"].title == "u2"
+    directory = store.directory
+    store.close()
+    assert not os.path.exists(directory)
+
+
+def test_content_can_be_replaced(tmp_path):
+    store = PageStore(directory=str(tmp_path))
+    stored = store.add(make_page("u", "old"))
+    stored.content = "new"
+    assert store["u"].content == "new"
+    del store["u"]
+    assert "u" not in store
+
+
+def test_memory_mode(monkeypatch):
+    monkeypatch.setenv("PAGE_STORE", "memory")
+    assert new_page_store() == {}
+    monkeypatch.setenv("PAGE_STORE", "disk")
+    assert isinstance(new_page_store(), PageStore)
@@ -0,0 +1,81 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper.politeness import PolitenessScheduler, RobotsCache, parse_retry_after
+
+
+@pytest.fixture
+def robots_server():
+    """Origin whose robots.txt status the test sets"""
+    state = {"status": 200, "body": "User-agent: *\nDisallow: /private\n"}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = state["body"].encode()
+            self.send_response(state["status"])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", state
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_robots_rules(robots_server):
+    origin, _ = robots_server
+    robots = RobotsCache()
+    assert robots.can_fetch(origin + "/page")
+    assert not robots.can_fetch(origin + "/private/page")
+
+
+@pytest.mark.parametrize("status, allowed", [(401, False), (403, False), (404, True), (500, True)])
+def test_robots_status(robots_server, status, allowed):
+    origin, state = robots_server
+    state["status"] = status
+    assert RobotsCache().can_fetch(origin + "/page") is allowed
+
+
+def test_slot_passes_recorded_status_to_release():
+    scheduler = PolitenessScheduler(delay=0, respect_robots=False)
+    url = "https://example.com/page"
+    with scheduler.slot(url) as slot:
+        slot.record(429, "60")
+    assert scheduler._state(url).blocked_until > time.monotonic() + 50
+
+
+def test_record_response_reaches_enclosing_slot():
+    scheduler = PolitenessScheduler(delay=0, respect_robots=False)
+    url = "https://example.com/page"
+
+    def load():  # e.g. the browser reporting the document's status
+        scheduler.record_response(503)
+
+    with scheduler.slot(url):
+        load()
+    assert scheduler._state(url).blocked_until > time.monotonic()
+    # outside a slot it is a no-op
+    scheduler.record_response(429, "60")
+
+
+def test_slot_limits_in_flight():
+    scheduler = PolitenessScheduler(delay=0, max_in_flight=2, respect_robots=False)
+    url = "https://example.com/page"
+    with scheduler.slot(url), scheduler.slot(url):
+        assert scheduler._state(url).in_flight == 2
+    assert scheduler._state(url).in_flight == 0
@@ -0,0 +1,200 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from scraper.proxy_fetch import ProxyFetcher, QuotaExceeded, QuotaLedger
+
+
+class StubScrapeDo:
+    """Local stand-in for the Scrape.do API: echoes the target URL as HTML
+
+    Targets containing "fail" get a 500 until `healed` is set.
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.healed = False
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                target = parse_qs(urlparse(self.path).query)["url"][0]
+                with stub.lock:
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.in_flight -= 1
+                status = 500 if "fail" in target and not stub.healed else 200
+                body = f"<html><body>{target}</body></html>".encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubScrapeDo()
+    yield server
+    server.close()
+
+
+def make_fetcher(stub, tmp_path, **kwargs):
+    kwargs.setdefault("monthly_quota", 100)
+    return ProxyFetcher(token="t", base_url=stub.url,
+                        ledger=QuotaLedger(str(tmp_path / "ledger.sqlite3")), **kwargs)
+
+
+def test_fetch_returns_html_and_records_call(stub, tmp_path):
+    fetcher = make_fetcher(stub, tmp_path)
+    run = fetcher.start_run()
+    assert run.fetch("https://example.com/a") == "<html><body>https://example.com/a</body></html>"
+    assert run.fetch("https://example.com/fail") is None
+    stats = run.stats()
+    assert stats["run_calls"] == 2
+    assert stats["run_succeeded"] == 1
+    assert stats["month_used"] == 2
+
+
+def test_no_token_makes_no_calls(stub, tmp_path):
+    fetcher = make_fetcher(stub, tmp_path)
+    fetcher.token = None
+    assert fetcher.fetch("https://example.com/a") is None
+    assert fetcher.ledger.month_used() == 0
+
+
+def test_fetch_many_respects_max_concurrent(tmp_path):
+    stub = StubScrapeDo(delay=0.1)
+    try:
+        fetcher = make_fetcher(stub, tmp_path, max_concurrent=3)
+        results = fetcher.start_run().fetch_many(f"https://example.com/{i}" for i in range(9))
+    finally:
+        stub.close()
+    assert all(html is not None for html in results.values())
+    assert len(results) == 9
+    assert 1 < stub.max_in_flight <= 3
+
+
+def test_run_budgets_are_per_run(stub, tmp_path):
+    fetcher = make_fetcher(stub, tmp_path, run_budget=2)
+    first, second = fetcher.start_run(), fetcher.start_run()
+    assert first.fetch("https://example.com/1") is not None
+    assert first.fetch("https://example.com/2") is not None
+    assert first.fetch("https://example.com/3") is None
+    # a second crawl on the same fetcher has its own budget and refusal count
+    assert second.fetch("https://example.com/3") is not None
+    assert first.stats()["refused"] == 1
+    assert second.stats()["refused"] == 0
+    assert first.stats()["run_budget_left"] == 0
+    assert second.stats()["run_budget_left"] == 1
+
+
+def test_monthly_quota_refuses(stub, tmp_path):
+    fetcher = make_fetcher(stub, tmp_path, monthly_quota=1)
+    assert fetcher.fetch("https://example.com/1") is not None
+    assert fetcher.start_run().fetch("https://example.com/2") is None
+    assert fetcher.ledger.month_used() == 1
+    assert fetcher.ledger.deferred() == []
+
+
+def test_queue_and_retry_deferred(stub, tmp_path):
+    fetcher = make_fetcher(stub, tmp_path, run_budget=1, on_budget="queue")
+    run = fetcher.start_run()
+    assert run.fetch("https://example.com/1") is not None
+    assert run.fetch("https://example.com/2") is None
+    assert fetcher.ledger.deferred() == ["https://example.com/2"]
+
+    # still over this run's budget: the URL stays queued
+    assert run.retry_deferred() == {"https://example.com/2": None}
+    assert fetcher.ledger.deferred() == ["https://example.com/2"]
+
+    assert fetcher.start_run().retry_deferred() == {
+        "https://example.com/2": "<html><body>https://example.com/2</body></html>"}
+    assert fetcher.ledger.deferred() == []
+
+
+def test_retry_deferred_keeps_failed_fetches(stub, tmp_path):
+    fetcher = make_fetcher(stub, tmp_path, on_budget="queue")
+    fetcher.ledger.defer("https://example.com/fail", "test")
+
+    assert fetcher.start_run().retry_deferred() == {"https://example.com/fail": None}
+    assert fetcher.ledger.deferred() == ["https://example.com/fail"]
+
+    stub.healed = True
+    assert fetcher.start_run().retry_deferred()["https://example.com/fail"] is not None
+    assert fetcher.ledger.deferred() == []
+
+
+def test_ledger_shared_between_fetchers(stub, tmp_path):
+    first = make_fetcher(stub, tmp_path, monthly_quota=2)
+    second = make_fetcher(stub, tmp_path, monthly_quota=2)
+    assert first.fetch("https://example.com/1") is not None
+    assert second.fetch("https://example.com/2") is not None
+    assert first.fetch("https://example.com/3") is None
+
+
+def test_ledger_reserves_against_quota_and_run_budget(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "ledger.sqlite3"))
+    first = ledger.reserve("https://example.com/1", "run-a", monthly_quota=3, run_budget=2)
+    ledger.finish(first, 200, 0.5)
+    ledger.reserve("https://example.com/2", "run-a", monthly_quota=3, run_budget=2)
+    with pytest.raises(QuotaExceeded, match="run budget"):
+        ledger.reserve("https://example.com/3", "run-a", monthly_quota=3, run_budget=2)
+    ledger.reserve("https://example.com/3", "run-b", monthly_quota=3, run_budget=2)
+    with pytest.raises(QuotaExceeded, match="monthly quota"):
+        ledger.reserve("https://example.com/4", "run-c", monthly_quota=3, run_budget=None)
+    assert ledger.month_used() == 3
+    assert ledger.month_used("1999-01") == 0
+    # unfinished reservations count as calls, not successes
+    assert ledger.run_summary("run-a") == {"calls": 2, "succeeded": 1, "seconds": 0.5}
+
+
+def test_ledger_deferred_queue(tmp_path):
+    ledger = QuotaLedger(str(tmp_path / "ledger.sqlite3"))
+    ledger.defer("https://example.com/1", "over budget")
+    ledger.defer("https://example.com/2", "over budget")
+    ledger.defer("https://example.com/1", "over budget")  # requeued, not duplicated
+    assert ledger.deferred() == ["https://example.com/2", "https://example.com/1"]
+    ledger.undefer("https://example.com/2")
+    assert ledger.deferred() == ["https://example.com/1"]
+
+
+def test_failed_proxy_fallback_does_not_render_again(stub, tmp_path, monkeypatch):
+    from scraper import retry
+    from scraper.retry import CircuitBreaker, RetryableStatus, RetryPolicy
+    from scraper.web_scraper import SmartWebScraper
+
+    monkeypatch.setenv("HTTP_CACHE", "false")
+    monkeypatch.setattr(retry, "_policy", RetryPolicy(max_attempts=2, base_delay=0, max_delay=0))
+    monkeypatch.setattr(retry, "_breaker", CircuitBreaker())
+    scraper = SmartWebScraper(extraction="html")
+    scraper.proxy_run = make_fetcher(stub, tmp_path).start_run()
+    renders = []
+
+    def render(url, driver):
+        renders.append(url)
+        raise RetryableStatus(503)
+
+    scraper._render = render
+    assert scraper._load_page("https://example.com/fail") is None
+    assert len(renders) == 2  # one retry_call, not a second one after the proxy
+    assert scraper.proxy_run.stats()["run_calls"] == 1
@@ -0,0 +1,118 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from scraper.retry import (
+    CircuitBreaker,
+    CircuitOpen,
+    RetryableStatus,
+    RetryPolicy,
+    classify,
+    retry_call,
+    retry_call_async,
+)
+
+URL = "https://example.com/page"
+NO_WAIT = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+
+def open_circuit(breaker: CircuitBreaker):
+    for _ in range(breaker.threshold):
+        breaker.record_failure(URL)
+    assert breaker.is_open(URL)
+
+
+def test_classify():
+    assert classify(RetryableStatus(429)) == "throttled"
+    assert classify(RetryableStatus(503)) == "server"
+    assert classify(httpx.ReadTimeout("slow")) == "timeout"
+    assert classify(httpx.ConnectError("refused")) == "connection"
+    assert classify(ValueError("bug")) is None
+
+
+def test_policy_delay_bounds():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    assert all(0 <= policy.delay(n) <= 5 for n in range(10))
+    assert policy.delay(0, retry_after="3") >= 3
+
+
+def test_retry_call_retries_transient_failures():
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RetryableStatus(503)
+        return "ok"
+
+    assert retry_call(URL, attempt, NO_WAIT, CircuitBreaker()) == "ok"
+    assert len(calls) == 3
+
+
+def test_retry_call_raises_permanent_failures_at_once():
+    calls = []
+
+    def attempt():
+        calls.append(1)
+        raise ValueError("bug")
+
+    with pytest.raises(ValueError):
+        retry_call(URL, attempt, NO_WAIT, CircuitBreaker())
+    assert len(calls) == 1
+
+
+def test_circuit_opens_and_probe_closes_it():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05)
+    open_circuit(breaker)
+    with pytest.raises(CircuitOpen):
+        retry_call(URL, lambda: "ok", NO_WAIT, breaker)
+    time.sleep(0.06)
+    assert breaker.allow(URL)
+    assert not breaker.allow(URL)  # only one probe at a time
+    breaker.record_success(URL)
+    assert not breaker.is_open(URL)
+
+
+def test_failed_probe_doubles_cooldown():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.05)
+    open_circuit(breaker)
+    time.sleep(0.06)
+    assert breaker.allow(URL)
+    breaker.record_failure(URL)
+    time.sleep(0.06)
+    assert not breaker.allow(URL)
+
+
+def test_cancelled_probe_releases_circuit():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    open_circuit(breaker)
+    time.sleep(0.02)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(retry_call_async(URL, hang, NO_WAIT, breaker))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    # the next request gets to probe instead of the circuit staying open
+    assert breaker.allow(URL)
+
+
+def test_interrupted_probe_releases_circuit():
+    breaker = CircuitBreaker(threshold=1, cooldown=0.01)
+    open_circuit(breaker)
+    time.sleep(0.02)
+
+    def interrupted():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        retry_call(URL, interrupted, NO_WAIT, breaker)
+    assert breaker.allow(URL)
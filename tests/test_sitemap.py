@@ -0,0 +1,154 @@
+import gzip
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper import politeness
+from scraper.frontier import CrawlFrontier
+from scraper.politeness import PolitenessScheduler, RobotsCache
+from scraper.sitemap import SitemapReader, lastmod_boost, parse_lastmod
+from scraper.web_scraper import SmartWebScraper, link_priority
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*entries) -> bytes:
+    items = "".join(f"<url><loc>{loc}</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "")
+                    + "</url>" for loc, lastmod in entries)
+    return f'<?xml version="1.0" encoding="UTF-8"?><urlset {NS}>{items}</urlset>'.encode()
+
+
+def index(*locs) -> bytes:
+    items = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+    return f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex {NS}>{items}</sitemapindex>'.encode()
+
+
+class Site:
+    """Local site serving the files the test puts in .files"""
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                site.requests.append(self.path)
+                if self.path not in site.files:
+                    self.send_error(404)
+                    return
+                body, content_type = site.files[self.path]
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def add(self, path: str, body: bytes, content_type: str = "application/xml"):
+        self.files[path] = (body, content_type)
+
+    def robots(self, *sitemaps: str):
+        lines = ["User-agent: *", "Allow: /"] + [f"Sitemap: {self.url}{path}" for path in sitemaps]
+        self.add("/robots.txt", "\n".join(lines).encode(), "text/plain")
+
+
+@pytest.fixture
+def site():
+    site = Site()
+    yield site
+    site.server.shutdown()
+    site.server.server_close()
+
+
+def read(site, **options):
+    return list(SitemapReader(robots=RobotsCache(), **options).iter_urls(site.url))
+
+
+def days_ago(days: float) -> str:
+    return datetime.fromtimestamp(time.time() - days * 86400, timezone.utc).strftime("%Y-%m-%d")
+
+
+def test_gzipped_sitemap_from_robots(site):
+    site.robots("/pages.xml.gz")
+    site.add("/pages.xml.gz", gzip.compress(urlset((f"{site.url}/a", "2024-05-01"),
+                                                   (f"{site.url}/b", None))),
+             "application/gzip")
+    assert read(site) == [(f"{site.url}/a", parse_lastmod("2024-05-01")), (f"{site.url}/b", None)]
+
+
+def test_default_location_without_robots_sitemaps(site):
+    site.add("/sitemap.xml", urlset((f"{site.url}/only", None)))
+    assert read(site) == [(f"{site.url}/only", None)]
+
+
+def test_index_recursion_stops_at_max_depth(site):
+    site.robots("/index.xml")
+    site.add("/index.xml", index(f"{site.url}/level1.xml", f"{site.url}/pages0.xml"))
+    site.add("/pages0.xml", urlset((f"{site.url}/p0", None)))
+    site.add("/level1.xml", index(f"{site.url}/level2.xml", f"{site.url}/pages1.xml"))
+    site.add("/pages1.xml", urlset((f"{site.url}/p1", None)))
+    site.add("/level2.xml", index(f"{site.url}/index.xml", f"{site.url}/pages2.xml"))
+    site.add("/pages2.xml", urlset((f"{site.url}/p2", None)))
+
+    assert [url for url, _ in read(site, max_depth=1)] == [f"{site.url}/p0"]
+    assert "/pages1.xml" not in site.requests
+
+    urls = [url for url, _ in read(site, max_depth=2)]
+    assert urls == [f"{site.url}/p0", f"{site.url}/p1"]
+    assert "/pages2.xml" not in site.requests
+
+    # Deeper, the loop back to index.xml is fetched only once
+    urls = [url for url, _ in read(site, max_depth=5)]
+    assert urls == [f"{site.url}/p0", f"{site.url}/p1", f"{site.url}/p2"]
+
+
+def test_max_urls_stops_reading(site):
+    site.robots("/a.xml", "/b.xml")
+    site.add("/a.xml", urlset(*[(f"{site.url}/a{i}", None) for i in range(5)]))
+    site.add("/b.xml", urlset((f"{site.url}/b", None)))
+    assert len(read(site, max_urls=3)) == 3
+    assert "/b.xml" not in site.requests
+
+
+def test_malformed_sitemap_keeps_urls_read_so_far(site):
+    site.robots("/broken.xml", "/html.xml", "/good.xml")
+    broken = urlset((f"{site.url}/before", None), (f"{site.url}/cut-off", None))
+    site.add("/broken.xml", broken[:broken.index(b"cut-off")])
+    site.add("/html.xml", b"<html><body>Not a sitemap<br></body></html>", "text/html")
+    site.add("/good.xml", urlset((f"{site.url}/after", None)))
+    assert [url for url, _ in read(site)] == [f"{site.url}/before", f"{site.url}/after"]
+
+
+def test_parse_lastmod_formats():
+    assert parse_lastmod("2024-05-01") == datetime(2024, 5, 1, tzinfo=timezone.utc).timestamp()
+    assert parse_lastmod("2024-05") == datetime(2024, 5, 1, tzinfo=timezone.utc).timestamp()
+    assert parse_lastmod("2024-05-01T10:00:00Z") == parse_lastmod("2024-05-01T12:00:00+02:00")
+    assert parse_lastmod("yesterday") is None and parse_lastmod(None) is None
+
+
+def test_recently_modified_pages_are_seeded_first(site, monkeypatch):
+    monkeypatch.setattr(politeness, "_scheduler", PolitenessScheduler(delay=0))
+    site.robots("/sitemap.xml")
+    site.add("/sitemap.xml", urlset((f"{site.url}/blog/old", "2015-01-01"),
+                                    (f"{site.url}/blog/undated", None),
+                                    (f"{site.url}/blog/this-year", days_ago(200)),
+                                    (f"{site.url}/blog/new", days_ago(3))))
+    assert lastmod_boost(parse_lastmod(days_ago(3))) > lastmod_boost(parse_lastmod(days_ago(200))) > 0
+
+    scraper = SmartWebScraper()
+    scraper.base_domain = site.url.split("://", 1)[1]
+    scraper.frontier = CrawlFrontier(10, score_fn=link_priority)
+    scraper._seed_from_sitemaps(site.url)
+    order = [scraper.frontier.pop() for _ in range(4)]
+    assert order[:2] == [f"{site.url}/blog/new", f"{site.url}/blog/this-year"]
+    assert set(order[2:]) == {f"{site.url}/blog/old", f"{site.url}/blog/undated"}
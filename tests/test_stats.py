@@ -0,0 +1,79 @@
+import json
+import re
+
+from scraper.stats import SPAN_BUCKETS, CrawlStats, StageTiming
+
+
+def sample_stats() -> CrawlStats:
+    stats = CrawlStats()
+    for seconds in (0.02, 0.03, 0.2, 0.2, 4.0):
+        stats.record_span("fetch", seconds)
+    stats.record_span("parse", 0.004)
+    stats.record_span("custom", 0.5)
+    stats.record_html(2048)
+    stats.record_error("timeout")
+    stats.record_error("timeout")
+    stats.record_error("http_503")
+    return stats
+
+
+def test_percentiles_come_from_histogram_buckets():
+    timing = StageTiming()
+    assert timing.percentile(0.5) == 0.0
+    for seconds in (0.02, 0.03, 0.2, 0.2, 4.0):
+        timing.add(seconds)
+    assert timing.percentile(0.2) == 0.025
+    assert timing.percentile(0.5) == 0.25
+    assert timing.percentile(0.95) == 4.0  # bucket bound 5, capped at the slowest span
+    assert timing.percentile(1.0) == timing.max_seconds == 4.0
+
+
+def test_percentile_beyond_last_bucket_is_the_max():
+    timing = StageTiming()
+    timing.add(SPAN_BUCKETS[-1] * 2)
+    assert timing.buckets == [0] * len(SPAN_BUCKETS)
+    assert timing.percentile(0.5) == SPAN_BUCKETS[-1] * 2
+
+
+def test_json_export():
+    data = json.loads(sample_stats().to_json())
+    assert list(data["stages"]) == ["fetch", "parse", "custom"]  # pipeline order, unknown last
+    assert data["stages"]["fetch"] == {"count": 5, "seconds": 4.45, "avg_seconds": 0.89,
+                                       "p50_seconds": 0.25, "p95_seconds": 4.0, "max_seconds": 4.0}
+    assert data["html_bytes"] == 2048
+    assert data["errors"] == {"timeout": 2, "http_503": 1}
+
+
+def test_prometheus_export():
+    text = sample_stats().to_prometheus(prefix="crawl")
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    sample = re.compile(r'^crawl_[a-z_]+(\{[a-z]+="[^"]*"(,[a-z]+="[^"]*")*\})? \S+$')
+    for line in lines:
+        assert line.startswith("# HELP crawl_") or line.startswith("# TYPE crawl_") or sample.match(line), line
+
+    assert "# TYPE crawl_stage_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith('crawl_stage_seconds_bucket{stage="fetch"')]
+    assert len(buckets) == len(SPAN_BUCKETS) + 1
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts)  # cumulative
+    assert 'crawl_stage_seconds_bucket{stage="fetch",le="0.025"} 1' in lines
+    assert 'crawl_stage_seconds_bucket{stage="fetch",le="0.25"} 4' in lines
+    assert 'crawl_stage_seconds_bucket{stage="fetch",le="+Inf"} 5' in lines
+    assert 'crawl_stage_seconds_sum{stage="fetch"} 4.450000' in lines
+    assert 'crawl_stage_seconds_count{stage="fetch"} 5' in lines
+
+    assert "# TYPE crawl_html_bytes_total counter" in lines
+    assert "crawl_html_bytes_total 2048" in lines
+    assert 'crawl_errors_total{kind="http_503"} 1' in lines
+    assert 'crawl_errors_total{kind="timeout"} 2' in lines
+
+
+def test_span_context_manager_records_on_error():
+    stats = CrawlStats()
+    try:
+        with stats.span("fetch"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert stats.stages["fetch"].count == 1
@@ -0,0 +1,60 @@
+import pytest
+
+from scraper.urls import BloomFilter, SeenURLs, canonicalize_url, url_host
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("HTTPS://Example.com:443/about/", "https://example.com/about"),
+    ("http://example.com:80/", "http://example.com/"),
+    ("https://example.com:8443/a", "https://example.com:8443/a"),
+    ("https://example.com/a?utm_source=x&b=2&a=1#top", "https://example.com/a?a=1&b=2"),
+    ("https://example.com//a/./b/../c", "https://example.com/a/c"),
+    ("https://example.com/%7euser", "https://example.com/~user"),
+    ("https://example.com/caf%c3%a9", "https://example.com/caf%C3%A9"),
+    ("https://example.com/café", "https://example.com/caf%C3%A9"),
+    ("https://example.com/a b", "https://example.com/a%20b"),
+    ("https://example.com/100%", "https://example.com/100%25"),
+])
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_reserved_escapes_stay_escaped():
+    assert canonicalize_url("https://example.com/a%2fb") == "https://example.com/a%2Fb"
+    assert canonicalize_url("https://example.com/a%2Fb") != canonicalize_url("https://example.com/a/b")
+    assert canonicalize_url("https://example.com/q%3Fx") == "https://example.com/q%3Fx"
+
+
+def test_relative_urls_and_host():
+    assert canonicalize_url("../b", base="https://example.com/a/c/") == "https://example.com/a/b"
+    assert url_host("https://WWW.Example.com:443/x") == "www.example.com"
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    urls = [f"https://example.com/{i}" for i in range(1000)]
+    for url in urls:
+        bloom.add(url)
+    assert all(url in bloom for url in urls)
+    assert 950 <= len(bloom) <= 1000  # additions that looked seen already are not counted
+    false_positives = sum(f"https://example.org/{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_seen_urls_switches_to_bloom():
+    seen = SeenURLs(bloom_threshold=3, bloom_capacity=1000)
+    seen.update(["a", "b", "c"])
+    assert not seen.is_bloom and sorted(seen) == ["a", "b", "c"]
+    seen.add("d")
+    assert seen.is_bloom
+    assert all(url in seen for url in "abcd")
+    assert "zzz" not in seen
+    assert len(seen) == 4
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("http://example.com:abc/x", "http://example.com:abc/x"),
+    ("http://Example.com:99999/x/", "http://example.com:99999/x"),
+])
+def test_malformed_port_is_kept_as_written(url, expected):
+    assert canonicalize_url(url) == expected